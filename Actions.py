@@ -0,0 +1,10 @@
+'''The codes of unit commands and of their outcome.
+
+They are shared by BroodwarInterface, which issues commands, and the modules
+which queue or record them.
+'''
+
+ATTACK, MOVE, STIM = 0, 1, 2
+ACTIONS = (ATTACK, MOVE, STIM)
+
+COMMAND_FAILED, COMMAND_SKIPPED, COMMAND_ISSUED = -1, 0, 1
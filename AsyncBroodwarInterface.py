@@ -0,0 +1,145 @@
+'''An asyncio front end to BroodwarInterface.
+
+BWAPI calls block: connecting polls until StarCraft answers, and every
+update waits for the game to play a frame. AsyncBroodwarInterface runs a
+BroodwarInterface on a dedicated thread so that an event loop can wait on
+one or more games while it runs model inference or other work:
+
+    game = AsyncBroodwarInterface(backend=backend)
+    await game.connect(timeout=60)
+    while not game.interface.is_end():
+        observation = await game.call(game.interface.createFeaturePlanes, ...)
+        actions = await model.predict(observation)
+        await game.call(game.interface.issue_commands, *actions)
+        await game.step()
+
+Calls run one at a time, in the order they are made. Every call accepts a
+timeout in seconds. When a call times out or the awaiting task is cancelled
+a call still waiting for its turn is dropped, while a running call is
+interrupted, see BroodwarInterface.interrupt, and awaited before the
+timeout or cancellation is raised. A call stuck inside BWAPI itself, such as
+an update while StarCraft is hung, cannot be interrupted and is waited for.
+'''
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from BroodwarInterface.BroodwarInterface import BroodwarInterface
+
+
+class AsyncBroodwarInterface(object):
+    '''Await the methods of a BroodwarInterface.
+
+    interface: The BroodwarInterface to drive. One is created from the
+    keyword arguments if it is not given.
+
+    timeout: The timeout of calls which are not given one, None to wait
+    for as long as a call takes.
+
+    frame: The number of the latest frame stepped through, see EventStream.
+    '''
+
+    def __init__(self, interface=None, timeout=None, **kwargs):
+        if interface is None:
+            interface = BroodwarInterface(**kwargs)
+        self.interface = interface
+        self.timeout = timeout
+        self.frame = interface.event_stream.frame
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='BroodwarInterface')
+        self.__lock = None
+        self.__stepped = None
+
+    def __getLock(self):
+        # Created on first use so that they belong to the running event loop.
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+            self.__stepped = asyncio.Condition()
+        return self.__lock
+
+    async def call(self, function, *args, timeout=None, **kwargs):
+        '''Call a function on the interface's thread and await its result.
+
+        function: Usually a method of interface. Every call which touches
+        the interface should go through call, since the interface is not
+        safe to use from more than one thread.
+
+        timeout: The seconds to wait before raising asyncio.TimeoutError,
+        defaulting to the timeout given when created.
+        '''
+        if timeout is None:
+            timeout = self.timeout
+        async with self.__getLock():
+            self.interface.resume()
+            future = self.__executor.submit(function, *args, **kwargs)
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                if not future.cancel():
+                    self.interface.interrupt()
+                    await asyncio.wait([asyncio.wrap_future(future)])
+                raise
+            finally:
+                await self.__advance()
+
+    async def __advance(self):
+        '''Wake the event iterators if the finished call stepped the game.'''
+        frame = self.interface.event_stream.frame
+        if frame == self.frame:
+            return
+        self.frame = frame
+        async with self.__stepped:
+            self.__stepped.notify_all()
+
+    async def connect(self, speedup=True, timeout=None):
+        '''Connect with BWAPI, see BroodwarInterface.connect.'''
+        return await self.call(self.interface.connect, speedup, timeout=timeout)
+
+    async def step(self, number_of_updates=None, timeout=None):
+        '''Step through the game and get the events of the frames stepped through.'''
+        def step():
+            self.interface.update(number_of_updates=number_of_updates)
+            return self.interface.events
+        return await self.call(step, timeout=timeout)
+
+    async def restart(self, timeout=None):
+        '''Restart the current match and wait until the new match has started.'''
+        return await self.call(self.interface.restart, True, timeout=timeout)
+
+    async def set_map(self, map_name, speedup=True, timeout=None):
+        '''Start a match on a map, see BroodwarInterface.set_map.'''
+        return await self.call(self.interface.set_map, map_name, speedup, timeout=timeout)
+
+    async def reset(self, map_name=None, speedup=True, timeout=None):
+        '''Start a new match and wait until it is in game, see BroodwarInterface.reset.'''
+        return await self.call(self.interface.reset, map_name, speedup, timeout=timeout)
+
+    async def events(self, event_types=None, step=False):
+        '''Iterate over events as frames are stepped through.
+
+        Iteration starts with the events of the next frame and never ends on
+        its own. The game is stepped by other tasks awaiting step unless step
+        is True, in which case the iterator steps the game a frame at a time
+        whenever it runs out of events.
+
+        event_types: Only get events of these types if given.
+        '''
+        next_frame = self.frame + 1
+        while True:
+            if self.frame < next_frame:
+                if step is True:
+                    await self.step()
+                else:
+                    self.__getLock()
+                    async with self.__stepped:
+                        await self.__stepped.wait_for(lambda: self.frame >= next_frame)
+            events, next_frame = await self.call(self.__eventsSince, next_frame, event_types)
+            for event in events:
+                yield event
+
+    def __eventsSince(self, frame, event_types):
+        stream = self.interface.event_stream
+        return stream.since(frame, event_types), stream.frame + 1
+
+    def close(self, wait=True):
+        '''Shut down the interface's thread.'''
+        self.__executor.shutdown(wait=wait)
@@ -0,0 +1,23 @@
+'''The game backends a BroodwarInterface can drive.
+
+A backend is any object providing the parts of the cybw module which the
+interface uses:
+-BWAPIClient: The client, with connect() and update() methods.
+-Broodwar: The game, with the methods of BWAPI's Game class.
+-EventType, Flag, UnitTypes, TechTypes, Orders: The BWAPI enumerations.
+-Position: A constructor of pixel positions taking x and y.
+
+The cybw module itself is the default backend. SyntheticBackend provides a
+deterministic stand-in written with NumPy so that the interface can be
+tested and benchmarked without StarCraft.
+'''
+
+
+def getDefaultBackend():
+    '''Get the cybw module.
+
+    cybw is only importable alongside a Broodwar installation, so it is
+    imported when an interface is created rather than when this package is.
+    '''
+    import cybw
+    return cybw
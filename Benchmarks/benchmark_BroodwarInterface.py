@@ -0,0 +1,185 @@
+'''Benchmark the per-frame cost of BroodwarInterface as unit counts grow.
+
+The benchmarks run against SyntheticBackend, so no StarCraft is needed.
+Every API call is timed on a fresh frame, since results are memoized for
+the rest of a frame. The frame is stepped outside of the timed region, so
+the numbers are the cost of a single call on a new frame.
+
+For each API and unit count the latency percentiles are reported along with
+the number of memory blocks allocated and the peak memory traced by
+tracemalloc during a call. update() includes the time the synthetic backend
+spends simulating the frame.
+
+Run the benchmarks and store the results:
+    python benchmark_BroodwarInterface.py --output baseline.json
+
+Compare against stored results, exiting with an error on regressions:
+    python benchmark_BroodwarInterface.py --compare baseline.json
+'''
+
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+
+UNIT_COUNTS = (10, 100, 1000, 10000)
+AREA = 1024
+
+APIS = {
+    'update': lambda interface, center: interface.update(),
+    'getPositions': lambda interface, center: interface.getPositions(),
+    'getHealth': lambda interface, center: interface.getHealth(),
+    'getUnitsInRect': lambda interface, center: interface.getUnitsInRect(center - AREA // 2, AREA, AREA),
+    'createUnitsMap': lambda interface, center: interface.createUnitsMap(center - AREA // 2, AREA, AREA),
+    'createUnitsMapHealth': lambda interface, center: interface.createUnitsMapHealth(center - AREA // 2, AREA, AREA),
+    'createFeaturePlanes': lambda interface, center: interface.createFeaturePlanes(
+        center - AREA // 2, AREA, AREA, ['presence', 'health'], scale=16),
+    'is_visible': lambda interface, center: interface.is_visible(),
+}
+
+
+def create_interface(number_of_units, seed=0):
+    '''Create an interface on a synthetic match with the given number of units.
+
+    The units are split evenly between two players and the map grows with
+    the number of units so that their density stays about the same.
+    '''
+    map_tiles = int(min(256, max(64, np.sqrt(number_of_units) * 4)))
+    allies = number_of_units // 2
+    spawns = [(0, 'Terran_Marine', allies), (1, 'Zerg_Zergling', number_of_units - allies)]
+    backend = SyntheticBackend(spawns=spawns, map_size=(map_tiles, map_tiles), seed=seed,
+                               enemy_attack=False)
+    interface = BroodwarInterface(backend=backend)
+    interface.connect()
+    return interface
+
+
+def time_api(interface, api, center, repeats):
+    '''Time an API call on repeats fresh frames.'''
+    timings = np.zeros(repeats)
+    for i in range(repeats):
+        if api is not APIS['update']:
+            interface.update()
+        begin = perf_counter()
+        api(interface, center)
+        timings[i] = perf_counter() - begin
+    return timings
+
+
+def trace_api(interface, api, center, repeats):
+    '''Get the mean number of blocks allocated and the largest peak memory of a call.'''
+    blocks = []
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            if api is not APIS['update']:
+                interface.update()
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            api(interface, center)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            difference = after.compare_to(before, 'lineno')
+            blocks.append(sum(max(stat.count_diff, 0) for stat in difference))
+            peaks.append(peak - start)
+    finally:
+        tracemalloc.stop()
+    return float(np.mean(blocks)), int(np.max(peaks))
+
+
+def run(unit_counts, apis, repeats, trace_repeats):
+    results = []
+    for number_of_units in unit_counts:
+        interface = create_interface(number_of_units)
+        center = np.array(interface.get_map_dims()) // 2
+        for name in apis:
+            api = APIS[name]
+            timings = time_api(interface, api, center, repeats) * 1000
+            blocks, peak = trace_api(interface, api, center, trace_repeats)
+            result = {
+                'api': name,
+                'units': number_of_units,
+                'repeats': repeats,
+                'mean_ms': float(np.mean(timings)),
+                'p50_ms': float(np.percentile(timings, 50)),
+                'p90_ms': float(np.percentile(timings, 90)),
+                'p99_ms': float(np.percentile(timings, 99)),
+                'max_ms': float(np.max(timings)),
+                'allocated_blocks': blocks,
+                'peak_bytes': peak,
+            }
+            results.append(result)
+            print('{api:>22} {units:>6} units: p50 {p50_ms:9.3f} ms  p90 {p90_ms:9.3f} ms  '
+                  'p99 {p99_ms:9.3f} ms  blocks {allocated_blocks:8.0f}  '
+                  'peak {peak_bytes:>10} B'.format(**result))
+            sys.stdout.flush()
+    return results
+
+
+def compare(results, baseline, tolerance, metric='p50_ms'):
+    '''Find the results which are slower than the baseline by more than tolerance.
+
+    Returns a list of (api, units, baseline value, current value) tuples.
+    '''
+    stored = {(r['api'], r['units']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = stored.get((result['api'], result['units']))
+        if previous is None:
+            continue
+        if result[metric] > previous[metric] * (1 + tolerance):
+            regressions.append((result['api'], result['units'], previous[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--units', type=int, nargs='+', default=list(UNIT_COUNTS),
+                        help='The unit counts to benchmark.')
+    parser.add_argument('--apis', nargs='+', default=list(APIS), choices=list(APIS),
+                        help='The APIs to benchmark.')
+    parser.add_argument('--repeats', type=int, default=50,
+                        help='The number of timed calls per API and unit count.')
+    parser.add_argument('--trace-repeats', type=int, default=3,
+                        help='The number of calls traced for memory per API and unit count.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='A JSON file of results to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='The fraction a p50 latency may grow before it is a regression.')
+    args = parser.parse_args(argv)
+
+    results = run(args.units, args.apis, args.repeats, args.trace_repeats)
+    report = {
+        'metadata': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as stored:
+            baseline = json.load(stored)
+        regressions = compare(results, baseline, args.tolerance)
+        for api, units, previous, current in regressions:
+            print('REGRESSION {} with {} units: p50 {:.3f} ms -> {:.3f} ms'.format(api, units, previous, current))
+        if regressions:
+            return 1
+        print('No regressions against {}'.format(args.compare))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
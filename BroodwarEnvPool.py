@@ -0,0 +1,221 @@
+'''Step many games in parallel, each in a worker process.
+
+Every worker creates its own BroodwarInterface, connects it and then waits
+for commands. A step sends each worker its action, lets every game advance
+at the same time, and gathers the observations into a single array:
+
+    def create():
+        return BroodwarInterface(backend=SyntheticBackend())
+
+    def observe(interface):
+        return interface.createUnitsMap(...)
+
+    with BroodwarEnvPool(create, 8, observe, frames_per_step=4) as pool:
+        observations = pool.reset()
+        while training:
+            observations, dones = pool.step(actions)
+
+A game whose match ended returns its final observation with its done flag
+set and then restarts straight away, while the learner is busy with the
+batch. Its action on the next step is ignored and the first observation of
+the new match is returned instead, so a slow restart overlaps with the
+other games rather than stalling the batch.
+
+The functions given to the pool are sent to the workers, so with the spawn
+start method they must be picklable, such as functions defined at the top
+level of a module.
+'''
+
+import multiprocessing
+import traceback
+
+import numpy as np
+
+STEP, RESET, CALL, CLOSE = 0, 1, 2, 3
+
+
+def issueCommands(interface, action):
+    '''Issue an action of (unit IDs, actions, positions), see issue_commands.
+
+    None issues no commands.
+    '''
+    if action is not None:
+        interface.issue_commands(*action)
+
+
+class _Environment(object):
+    '''The game of a worker process.'''
+
+    def __init__(self, create_interface, observe, act, frames_per_step, map_name):
+        self.interface = create_interface()
+        self.observe = observe
+        self.act = act
+        self.frames_per_step = frames_per_step
+        self.map_name = map_name
+        self.interface.connect()
+        if map_name is not None:
+            self.interface.set_map(map_name)
+        # Whether the match has started and not been stepped yet.
+        self.fresh = True
+
+    def reset(self):
+        if not self.fresh:
+            self.__restart()
+        self.fresh = False
+        return self.observe(self.interface)
+
+    def __restart(self):
+        self.interface.reset(self.map_name)
+
+    def step(self, action):
+        '''Returns the observation and whether the match ended.'''
+        if self.fresh:
+            return self.reset(), False
+        self.act(self.interface, action)
+        self.interface.update(number_of_updates=self.frames_per_step)
+        return self.observe(self.interface), self.interface.is_end()
+
+    def restartEarly(self):
+        '''Restart a finished match before the learner asks for its next step.'''
+        self.__restart()
+        self.fresh = True
+
+
+def _work(connection, create_interface, observe, act, frames_per_step, map_name):
+    '''The loop of a worker process.'''
+    try:
+        environment = _Environment(create_interface, observe, act, frames_per_step, map_name)
+        connection.send((True, None))
+        while True:
+            command, argument = connection.recv()
+            if command == STEP:
+                observation, done = environment.step(argument)
+                connection.send((True, (observation, done)))
+                if done:
+                    environment.restartEarly()
+            elif command == RESET:
+                connection.send((True, environment.reset()))
+            elif command == CALL:
+                name, args, kwargs = argument
+                connection.send((True, getattr(environment.interface, name)(*args, **kwargs)))
+            elif command == CLOSE:
+                environment.interface.quit()
+                break
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class BroodwarEnvPool(object):
+    '''Games stepped in parallel by worker processes.
+
+    create_interface: A function returning a new BroodwarInterface, called
+    once in every worker.
+
+    number_of_envs: The number of games.
+
+    observe: A function of an interface returning its observation. Every
+    game's observation must have the same shape.
+
+    act: A function of an interface and an action issuing the action,
+    issueCommands by default.
+
+    frames_per_step: The number of frames each step advances.
+
+    map_name: The map of every match. Finished matches are restarted with
+    reset, which only loads the map once.
+
+    context: The multiprocessing start method, the platform's default if
+    None.
+    '''
+
+    def __init__(self, create_interface, number_of_envs, observe, act=issueCommands,
+                 frames_per_step=1, map_name=None, context=None):
+        context = multiprocessing.get_context(context)
+        self.number_of_envs = number_of_envs
+        self.closed = False
+        self.__connections = []
+        self.__processes = []
+        for _ in range(number_of_envs):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_work, daemon=True,
+                                      args=(worker_connection, create_interface, observe, act,
+                                            frames_per_step, map_name))
+            process.start()
+            worker_connection.close()
+            self.__connections.append(connection)
+            self.__processes.append(process)
+        try:
+            self.__receive()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def __send(self, command, arguments):
+        for connection, argument in zip(self.__connections, arguments):
+            connection.send((command, argument))
+
+    def __receive(self):
+        '''Gather one reply from every worker, raising if any of them failed.'''
+        replies = []
+        failures = []
+        for index, connection in enumerate(self.__connections):
+            try:
+                succeeded, reply = connection.recv()
+            except EOFError:
+                succeeded, reply = False, 'The worker process exited.'
+            if not succeeded:
+                failures.append('Environment {} failed:\n{}'.format(index, reply))
+            replies.append(reply)
+        if failures:
+            raise RuntimeError('\n'.join(failures))
+        return replies
+
+    def reset(self):
+        '''Restart every match and get the stacked first observations.'''
+        self.__send(RESET, [None] * self.number_of_envs)
+        return np.stack(self.__receive())
+
+    def step(self, actions):
+        '''Act in and step every game.
+
+        actions: One action per game, passed to act.
+
+        Returns the stacked observations and an array of done flags.
+        '''
+        if len(actions) != self.number_of_envs:
+            raise ValueError('Expected {} actions, got {}.'.format(self.number_of_envs, len(actions)))
+        self.__send(STEP, actions)
+        observations, dones = zip(*self.__receive())
+        return np.stack(observations), np.array(dones, dtype=bool)
+
+    def call(self, name, *args, **kwargs):
+        '''Call a method of every game's interface and get the results.'''
+        self.__send(CALL, [(name, args, kwargs)] * self.number_of_envs)
+        return self.__receive()
+
+    def close(self):
+        '''Leave every match and stop the workers.'''
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.__connections:
+            try:
+                connection.send((CLOSE, None))
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        for process in self.__processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.__connections:
+            connection.close()
@@ -15,6 +15,8 @@ documentation: https://bwapi.github.io/namespace_b_w_a_p_i.html
  
 The actual python interface is
 here: https://bitbucket.org/ratiotile/cybw
+It is the default backend. Any object with the same attributes can be used
+instead, see Backend and SyntheticBackend.
 The python interface has no documentation so in order to learn about the functions
 you must read the bwapi documentation or read the cybw cython code.
  
@@ -23,10 +25,37 @@ may be functions that don't work.
 '''
 
 import numpy as np
-from time import sleep, time
+from time import time, perf_counter
+from threading import Event
 
-import cybw
+from BroodwarInterface.Backend import getDefaultBackend
+from BroodwarInterface.UnitSnapshot import UnitSnapshot
+from BroodwarInterface.UnitFilter import UnitFilter
+from BroodwarInterface.SpatialIndex import UnitGrid
+from BroodwarInterface.FeaturePlanes import renderFeaturePlanes
+from BroodwarInterface.UnitTypeTable import UnitTypeTable
+from BroodwarInterface.UnitTable import UnitTable
+from BroodwarInterface.EventStream import EventStream, HISTORY
+from BroodwarInterface.Rasterize import rasterizePyramid, getMargin
+from BroodwarInterface.MapData import getMapData, getDefaultCacheDirectory
+from BroodwarInterface.FrameDiff import FrameDiff
+from BroodwarInterface.FogOfWar import FogOfWar
+from BroodwarInterface.CommandQueue import CommandQueue
+from BroodwarInterface.Actions import (ATTACK, MOVE, STIM, ACTIONS, COMMAND_FAILED,
+                                       COMMAND_SKIPPED, COMMAND_ISSUED)
+from BroodwarInterface.FrameStepper import StepTimings
 
+# The local speed and frame skip used by connect and set_map.
+SPEED_PRESETS = {True: (0, 0), False: (167, 24)}
+
+class Interrupted(Exception):
+    '''A blocking call was stopped by BroodwarInterface.interrupt.'''
+
+def readOnly(array):
+    '''Mark an array memoized for the frame as read only and return it.'''
+    array.flags.writeable = False
+    return array
+    
 def withinBounds(array, lower, upper):
     withinLowerBound = array > lower
     withinUpperBound = array < upper
@@ -37,27 +66,164 @@ def getCenterPosition(unit):
     X = position.x
     Y = position.y
     return np.array([X, Y])
+    
+def pairwiseDistances(origins, targets, metric='euclidean'):
+    '''Get the distance between every origin and every target.
+    
+    origins: An (M, 2) array of positions.
+    
+    targets: An (N, 2) array of positions.
+    
+    metric: Either 'euclidean', 'squared' for the squared euclidean distance
+    or 'chebyshev' for the largest difference along either axis.
+    
+    Returns an (M, N) array of distances.
+    '''
+    origins = np.asarray(origins, dtype=np.float64).reshape((-1, 2))
+    targets = np.asarray(targets, dtype=np.float64).reshape((-1, 2))
+    difference = origins[:, np.newaxis, :] - targets[np.newaxis, :, :]
+    if metric == 'euclidean':
+        return np.hypot(difference[..., 0], difference[..., 1])
+    elif metric == 'squared':
+        return np.einsum('ijk,ijk->ij', difference, difference)
+    elif metric == 'chebyshev':
+        return np.max(np.abs(difference), axis=2)
+    raise ValueError('Unknown distance metric: {}'.format(metric))
+    
+def nearestColumns(distances, k=1):
+    '''Get the k smallest entries of each row of a distance matrix.
+    
+    Returns the column indices and distances as two (M, k) arrays ordered
+    from closest to farthest. k is reduced to the number of columns when
+    there are fewer than k.
+    '''
+    k = min(k, distances.shape[1])
+    if k == 0:
+        empty = np.zeros((distances.shape[0], 0))
+        return empty.astype(np.intp), empty
+    if k == 1:
+        columns = np.argmin(distances, axis=1)[:, np.newaxis]
+    else:
+        columns = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest = np.take_along_axis(distances, columns, axis=1)
+        columns = np.take_along_axis(columns, np.argsort(nearest, axis=1), axis=1)
+    return columns, np.take_along_axis(distances, columns, axis=1)
 
     
 class BroodwarInterface(object):
 
-    def __init__(self):
-        self.__client = cybw.BWAPIClient
-        self.__Broodwar = cybw.Broodwar
+    def __init__(self, incremental=False, backend=None, event_history=HISTORY,
+                 map_cache=None, profiler=None, command_budget=None):
+        if backend is None:
+            backend = getDefaultBackend()
+        if profiler is not None:
+            backend = profiler.wrapBackend(backend)
+            profiler.instrument(self)
+        self.__backend = backend
+        self.__client = backend.BWAPIClient
+        self.__Broodwar = backend.Broodwar
         self.events = []
-        self.__SPECIAL_UNITS = [cybw.UnitTypes.Special_Map_Revealer]
+        self.event_stream = EventStream(event_history)
+        self.timings = None
+        self.recorder = None
+        self.reset_timings = StepTimings()
+        self.commands = CommandQueue(command_budget)
+        if map_cache is None:
+            map_cache = getDefaultCacheDirectory()
+        self.__map_cache = None if map_cache is False else map_cache
+        self.__map_data = None
+        self.__map_size = None
+        self.__map_name = None
+        self.__previous_units = None
+        self.__diff_start = None
+        self.__fog_of_war = None
+        self.__fog_start = 0
+        self.__interrupted = Event()
+        self.__update_start = 0
+        self.__SPECIAL_UNITS = [backend.UnitTypes.Special_Map_Revealer]
+        self.__NOT_SPECIAL = ~UnitFilter(types=self.__SPECIAL_UNITS)
+        self.__snapshot = None
+        self.__unit_types = UnitTypeTable()
+        self.__unit_types.addAll(backend.UnitTypes)
+        self.__unit_table = UnitTable() if incremental else None
+        self.__unit_table_stale = True
+        self.__unit_table_refreshed = False
+        if incremental is True:
+            self.__subscribeUnitTable(backend.EventType)
+        
+    def getSnapshot(self):
+        '''Get the columnar snapshot of all units for the current frame.
         
+        The snapshot is read from BWAPI the first time it is needed after
+        each update and reused by every query until the next update.
         
-    def __getUnitsFiltered(self, function, players=None, types=None, units=None):
-        '''Get units based on criteria given.
+        When the interface is incremental the snapshot is taken from the
+        unit table instead, see getUnitTable.
+        '''
+        if self.__snapshot is None:
+            if self.__unit_table is None:
+                all_units = self.__Broodwar.getAllUnits()
+                self.__snapshot = UnitSnapshot.fromUnits(all_units)
+            else:
+                self.__snapshot = self.getUnitTable().snapshot()
+        return self.__snapshot
+        
+    def getUnitTable(self):
+        '''Get the persistent unit table of an incremental interface.
+        
+        The table is filled from Broodwar.getAllUnits() at the start of each
+        match and afterwards only changed by unit events. The dynamic columns
+        are read again once per frame. Returns None when the interface is
+        not incremental.
+        '''
+        table = self.__unit_table
+        if table is None:
+            return None
+        if self.__unit_table_stale is True:
+            table.reset(self.__Broodwar.getAllUnits())
+            self.__unit_table_stale = False
+        elif self.__unit_table_refreshed is False:
+            table.refresh()
+        self.__unit_table_refreshed = True
+        return table
+        
+    def getUnitRow(self, unit_id):
+        '''Get the unit table row of a unit ID.
+        
+        The row stays the same for as long as the unit exists. Returns None if
+        the unit is not in the table or the interface is not incremental.
+        '''
+        table = self.getUnitTable()
+        if table is None:
+            return None
+        return table.rowOf(unit_id)
+        
+    def __subscribeUnitTable(self, EventType):
+        '''Keep the unit table up to date with the unit events of each frame.'''
+        def restart(frame, event):
+            self.__unit_table_stale = True
+        def add(frame, event):
+            if self.__unit_table_stale is False:
+                self.__unit_table.add(event.getUnit())
+        def remove(frame, event):
+            if self.__unit_table_stale is False:
+                self.__unit_table.remove(event.getUnit().getID())
+        subscribe = self.event_stream.subscribe
+        subscribe(restart, EventType.MatchStart)
+        for eventType in (EventType.UnitCreate, EventType.UnitDiscover,
+                          EventType.UnitShow, EventType.UnitMorph,
+                          EventType.UnitRenegade):
+            subscribe(add, eventType)
+        for eventType in (EventType.UnitDestroy, EventType.UnitEvade):
+            subscribe(remove, eventType)
+        
+    def __getUnitsFiltered(self, players=None, types=None, units=None, unit_filter=None):
+        '''Get the snapshot and the rows of units based on criteria given.
         
         This function is a base function used to generalize gathering info from
         units based on criteria, such as if the unit is owned by a certain player
         or is a certain unit type.
         
-        function: A lambda function which is used to gather a particular element
-        such as unit health or position.
-        
         players: A list of player IDs used to select units belonging to units
         from one of the player IDs in the list.
         
@@ -66,35 +232,39 @@ class BroodwarInterface(object):
         
         units: A list of unit IDs used to select particular units.
         
-        Will need a test to ensure consistency of behaviour for all combinations of inputs.
+        unit_filter: A UnitFilter which selected units must also match. This
+        allows for negations and combinations of criteria.
+        
+        Special units, such as map revealers, are never selected.
         '''
-        if function is None:
-            function = lambda x: x
+        condition = self.__getCondition(players, types, units, unit_filter)
+        snapshot = self.getSnapshot()
+        return snapshot, snapshot.select(condition)
         
-        if players is not None:
-            player_condition = lambda x: x.getPlayer().getID() in players
-        else:
-            player_condition = lambda x: True
+    def __getCondition(self, players, types, units, unit_filter):
+        '''Combine the criteria of a query into a single UnitFilter.'''
+        condition = self.__NOT_SPECIAL
+        if players is not None or types is not None or units is not None:
+            condition = UnitFilter(players, types, units) & condition
+        if unit_filter is not None:
+            condition = unit_filter & condition
+        return condition
         
-        if types is not None:
-            type_condition = lambda x: x.getType() in types
-        else:
-            type_condition = lambda x: True
-            
-        if units is not None:
-            unit_condition = lambda x: x.getID() in units
-        else:
-            unit_condition = lambda x: True
-
-        not_special = lambda x: x.getType() not in self.__SPECIAL_UNITS
-            
-        all_conditions = lambda x: player_condition(x) and type_condition(x) and unit_condition(x) and not_special(x)
-            
-        all_units = self.__Broodwar.getAllUnits()
-            
-        resulting_units = [function(u) for u in all_units if all_conditions(u) is True]
+    def getUnitGrid(self):
+        '''Get the spatial index of the units for the current frame.
+        
+        The grid is built once per frame over the pixel space of the map.
+        '''
+        return UnitGrid.fromSnapshot(self.getSnapshot(), self.get_map_dims())
+        
+    def __memoizeFiltered(self, name, function, players, types, units, unit_filter):
+        '''Compute a result over the filtered units once per frame.
         
-        return resulting_units
+        function: A function taking the snapshot and the selected rows.
+        '''
+        snapshot, indices = self.__getUnitsFiltered(players, types, units, unit_filter)
+        key = (name, id(indices))
+        return snapshot.memoize(key, lambda: function(snapshot, indices))
        
     def __getEvents(self):
         '''Gather all events currently held by BWAPI into a list.'''
@@ -105,80 +275,84 @@ class BroodwarInterface(object):
         
         Must be run before accessing other BWAPI functions.
         The speedup parameter allows speedup functions to be disabled if 
-        necessary such as when debugging.
+        necessary such as when debugging. It may also be a pair of a local
+        speed and a frame skip, see set_speed.
+        The time spent is recorded in reset_timings, see reset.
         '''
+        begin = perf_counter()
         while not self.__client.connect():
-            sleep(0.5)
-        events = [e.getType() for e in self.events]
-        while cybw.EventType.MatchStart not in events:
-            self.update()
-            events = [e.getType() for e in self.events]
-        self.__Broodwar.enableFlag(cybw.Flag.CompleteMapInformation)
+            self.__interrupted.wait(0.5)
+            self.__checkInterrupt()
+        # The game may have been started again since a previous connect.
+        self.__map_name = None
+        self.__map_data = None
+        self.__map_size = None
+        self.reset_timings.add('connect', perf_counter() - begin)
+        self.__startMatch(None, False, speedup)
+        return True
+    
+    def set_speed(self, local_speed, frame_skip):
+        '''Set the game speed.
         
-        while not self.isInGame():
-            self.update()
+        local_speed: The number of milliseconds per frame, 0 being as fast as
+        possible.
         
-        if speedup is True:
-            self.__Broodwar.setLocalSpeed(0)
-            #Broodwar.setGUI(False)
-            self.__Broodwar.setFrameSkip(0)
-        else:
-            self.__Broodwar.setLocalSpeed(167)
-            #Broodwar.setGUI(False)
-            self.__Broodwar.setFrameSkip(24)
-        return True
+        frame_skip: The number of frames which are not drawn between drawn
+        frames.
+        '''
+        self.__Broodwar.setLocalSpeed(local_speed)
+        #Broodwar.setGUI(False)
+        self.__Broodwar.setFrameSkip(frame_skip)
     
     def isInGame(self):
         '''Check if the game is currently in a match.'''
         return self.__Broodwar.isInGame()
     
-    def getUnits(self, players=None, types=None, units=None):
+    def getUnits(self, players=None, types=None, units=None, unit_filter=None):
         '''Gathers all units based on criteria.
         
         This function returns a list of unit interfaces which have methods
         described in the BWAPI documentation website.
         '''
-        function = None
+        function = lambda S, I: S.units[I].tolist()
     
-        return self.__getUnitsFiltered(function, players, types, units)
+        return list(self.__memoizeFiltered('units', function, players, types, units, unit_filter))
     
-    def getPositions(self, players=None, types=None, units=None):
+    def getPositions(self, players=None, types=None, units=None, unit_filter=None):
         '''Gather all unit positions that fit the criteria.
         
-        Returns a list of positions where each position is a tuple of two
+        Returns a list of positions where each position is an array of two
         integers.
         '''
-        function = lambda X: getCenterPosition(X)
+        function = lambda S, I: readOnly(S.positions[I])
+        positions = self.__memoizeFiltered('positions', function, players, types, units, unit_filter)
         
-        return list(self.__getUnitsFiltered(function, players, types, units))
+        return list(positions.copy())
     
-    def getHealth(self, players=None, types=None, units=None):
+    def getHealth(self, players=None, types=None, units=None, unit_filter=None):
         '''Gather all unit health that fit the criteria.
         
         Returns the health points of units as an integer that is between 0 and
         the unit types max hitpoints.
         '''
-        function = lambda X: X.getHitPoints()
+        function = lambda S, I: S.data['hp'][I].tolist()
             
-        return list(self.__getUnitsFiltered(function, players, types, units))
+        return list(self.__memoizeFiltered('hp', function, players, types, units, unit_filter))
     
-    def getShields(self, players=None, types=None, units=None):
+    def getShields(self, players=None, types=None, units=None, unit_filter=None):
         '''Gather all unit shields that fit the criteria.
         
         Returns the shield points of units as an integer that is between 0 and
         the unit type's max shield points.
         '''
-        function = lambda X: X.getShields()
+        function = lambda S, I: S.data['shields'][I].tolist()
             
-        return list(self.__getUnitsFiltered(function, players, types, units))
+        return list(self.__memoizeFiltered('shields', function, players, types, units, unit_filter))
         
     def getDistanceFromPositionToUnits(self, position, units):
         '''Get the euclidian distance of all units from a given position.'''
-        function = lambda X: getCenterPosition(X)
-        positions = np.array(self.__getUnitsFiltered(function, units=units))
-        unit_position = position
-        difference = otherUnits_positions - unit_position
-        distance = np.sqrt(np.sum(np.power(difference, 2), axis=1))
+        snapshot, indices = self.__getUnitsFiltered(units=units)
+        distance = pairwiseDistances(position, snapshot.positions[indices])[0]
             
         return distance
         
@@ -187,52 +361,306 @@ class BroodwarInterface(object):
         function = lambda X: getCenterPosition(X)
             
         return self.getDistanceFromPositionToUnits(function(unit), units)
+        
+    def getDistanceMatrix(self, origins=None, targets=None, metric='euclidean'):
+        '''Get the distance from every origin unit to every target unit.
+        
+        origins: A UnitFilter selecting the units distances are measured from.
+        
+        targets: A UnitFilter selecting the units distances are measured to.
+        
+        metric: Either 'euclidean', 'squared' or 'chebyshev'.
+        
+        Returns an (M, N) array where rows follow the order of
+        getUnitIDs(unit_filter=origins) and columns the order of
+        getUnitIDs(unit_filter=targets). The matrix is computed once per frame.
+        '''
+        snapshot, origin_indices = self.__getUnitsFiltered(unit_filter=origins)
+        _, target_indices = self.__getUnitsFiltered(unit_filter=targets)
+        def compute():
+            distances = pairwiseDistances(snapshot.positions[origin_indices],
+                                          snapshot.positions[target_indices],
+                                          metric)
+            distances.flags.writeable = False
+            return distances
+        key = ('distances', id(origin_indices), id(target_indices), metric)
+        return snapshot.memoize(key, compute)
+        
+    def getNearestTargets(self, origins=None, targets=None, k=1, metric='euclidean'):
+        '''Get the k closest target units of every origin unit.
+        
+        Returns the target unit IDs and their distances as two (M, k) arrays
+        ordered from closest to farthest, with rows following the order of
+        getUnitIDs(unit_filter=origins). Fewer than k columns are returned if
+        there are not enough targets.
+        '''
+        distances = self.getDistanceMatrix(origins, targets, metric)
+        columns, nearest = nearestColumns(distances, k)
+        snapshot, target_indices = self.__getUnitsFiltered(unit_filter=targets)
+        target_ids = snapshot.data['id'][target_indices]
+        
+        return target_ids[columns], nearest
     
-    def getUnitsInRect(self, position, width, height, players=None, types=None):
+    def __getUnitsInBounds(self, position, width, height, players, types, unit_filter):
+        '''Get the snapshot rows and offsets of units within a rectangle.
+        
+        Returns the rows of the units inside the rectangle along with their
+        positions relative to the rectangle's corner.
+        '''
+        snapshot = self.getSnapshot()
+        mask = self.__getCondition(players, types, None, unit_filter).mask(snapshot)
+        indices = self.getUnitGrid().rect(position, width, height, mask)
+        difference = snapshot.positions[indices] - position
+        
+        return indices, difference
+    
+    def getUnitsInRect(self, position, width, height, players=None, types=None,
+            unit_filter=None):
         '''Get all units that are within a rectangular area.'''
-        units = np.array(self.getUnits(players, types))
-        unit_positions = self.getPositions(players, types)
-        difference = unit_positions - position
-        in_bounds = withinBounds(difference, np.zeros((1,2)), np.array([width, height]))
-        agents_in_bounds = np.all(in_bounds, axis=1)
+        indices, _ = self.__getUnitsInBounds(position, width, height, players, types, unit_filter)
+        
+        return self.getSnapshot().units[indices].tolist()
+    
+    def getUnitsInRadius(self, position, radius, players=None, types=None,
+            unit_filter=None):
+        '''Get all units whose distance to a position is at most radius.'''
+        snapshot = self.getSnapshot()
+        mask = self.__getCondition(players, types, None, unit_filter).mask(snapshot)
+        indices = self.getUnitGrid().radius(position, radius, mask)
         
-        return units[agents_in_bounds].tolist()
+        return snapshot.units[indices].tolist()
     
-    def createUnitsMap(self, position, width, height, players=None, types=None):
+    def getNearestUnits(self, position, k, players=None, types=None,
+            unit_filter=None):
+        '''Get the k units closest to a position.
+        
+        The units are ordered from closest to farthest. Fewer than k units are
+        returned if not enough units fit the criteria.
+        '''
+        snapshot = self.getSnapshot()
+        mask = self.__getCondition(players, types, None, unit_filter).mask(snapshot)
+        indices = self.getUnitGrid().nearest(position, k, mask)
+        
+        return snapshot.units[indices].tolist()
+    
+    def createUnitsMap(self, position, width, height, players=None, types=None,
+            unit_filter=None, out=None):
         '''Produce a matrix containings positions of units relative to a position.
         
+        The matrix is indexed by row (y) and then column (x).
+        
+        out: An optional preallocated array of shape (height, width) which is
+        filled in place and returned, such as a slot of an ObservationBuffer.
         '''
-        map = np.zeros((height, width))
-        unit_positions = self.getPositions(players, types)
-        if len(unit_positions) == 0:
+        map = self.__createMap(width, height, out)
+        _, difference = self.__getUnitsInBounds(position, width, height, players, types, unit_filter)
+        if len(difference) == 0:
             return map
-        difference = unit_positions - position
-        in_bounds = withinBounds(difference, np.zeros((1,2)), np.array([width, height]))
-        agents_in_bounds = np.all(in_bounds, axis=1)
         
-        y, x = np.hsplit(difference[agents_in_bounds], 2)
+        x, y = np.hsplit(difference.astype(np.intp), 2)
         
         map[y, x] = 1
         
         return map
         
-    def createUnitsMapHealth(self, position, width, height, players=None, types=None):
-        '''Produce a matrix containing the health of units within a rectangular area.'''
-        map = np.zeros((height, width))
-        unit_positions = self.getPositions(players, types)
-        unit_health = np.add(self.getHealth(players, types), self.getShields(players, types)).reshape((-1, 1))
-        if len(unit_positions) == 0:
+    def createUnitsMapHealth(self, position, width, height, players=None, types=None,
+            unit_filter=None, out=None):
+        '''Produce a matrix containing the health of units within a rectangular area.
+        
+        The matrix is indexed by row (y) and then column (x).
+        
+        out: An optional preallocated array of shape (height, width) which is
+        filled in place and returned.
+        '''
+        map = self.__createMap(width, height, out)
+        indices, difference = self.__getUnitsInBounds(position, width, height, players, types, unit_filter)
+        if len(difference) == 0:
             return map
-        difference = unit_positions - position
-        in_bounds = withinBounds(difference, np.zeros((1,2)), np.array([width, height]))
-        agents_in_bounds = np.all(in_bounds, axis=1)
+        data = self.getSnapshot().data[indices]
+        unit_health = np.add(data['hp'], data['shields']).reshape((-1, 1))
         
-        y, x = np.hsplit(difference[agents_in_bounds], 2)
+        x, y = np.hsplit(difference.astype(np.intp), 2)
         
-        map[y, x] = unit_health[agents_in_bounds]
+        map[y, x] = unit_health
         
         return map
     
+    def __createMap(self, width, height, out):
+        if out is None:
+            return np.zeros((height, width))
+        if out.shape != (height, width):
+            raise ValueError('Expected an output buffer of shape {} but got {}'.format((height, width), out.shape))
+        out[...] = 0
+        return out
+    
+    def createFeaturePlanes(self, position, width, height, channels, scale=1,
+            players=None, types=None, unit_filter=None, out=None, dtype=np.float32):
+        '''Produce a stack of feature planes of units within a rectangular area.
+        
+        channels: A list of (kind, unit_filter) pairs where kind is one of
+        'presence', 'health', 'type' or 'player'. See FeaturePlanes.
+        
+        scale: Each cell of a plane covers a scale by scale block of pixels.
+        
+        out: An optional preallocated array of shape (C, H/scale, W/scale)
+        which is filled in place and returned.
+        
+        Returns an array of shape (C, H/scale, W/scale) indexed by channel,
+        row (y) and column (x).
+        '''
+        indices, _ = self.__getUnitsInBounds(position, width, height, players, types, unit_filter)
+        
+        return renderFeaturePlanes(self.getSnapshot(), indices, position, width,
+                                   height, channels, scale, out, dtype)
+    
+    def getUnitTypeTable(self):
+        '''Get the lookup tables of unit type properties.
+        
+        The properties of every unit type in the current frame are read
+        the first time the type is seen.
+        '''
+        snapshot = self.getSnapshot()
+        snapshot.memoize('unit_types', lambda: self.__unit_types.update(snapshot))
+        return self.__unit_types
+    
+    def getHealthFractions(self, players=None, types=None, units=None, unit_filter=None):
+        '''Get the hit points of units as a fraction of their type's most.'''
+        table = self.getUnitTypeTable()
+        function = lambda S, I: readOnly(table.getFractions(S.data[I], 'hp'))
+        
+        return self.__memoizeFiltered('hp_fractions', function, players, types, units, unit_filter)
+    
+    def getShieldFractions(self, players=None, types=None, units=None, unit_filter=None):
+        '''Get the shields of units as a fraction of their type's most.
+        
+        Units without shields have a fraction of 0.
+        '''
+        table = self.getUnitTypeTable()
+        function = lambda S, I: readOnly(table.getFractions(S.data[I], 'shields'))
+        
+        return self.__memoizeFiltered('shield_fractions', function, players, types, units, unit_filter)
+    
+    def getInWeaponRange(self, origins=None, targets=None):
+        '''Check which target units are within weapon range of each origin unit.
+        
+        Distances are measured between the edges of the units' footprints as
+        BWAPI does. See UnitTypeTable.getInWeaponRange.
+        
+        Returns an (M, N) boolean array ordered as getDistanceMatrix.
+        '''
+        table = self.getUnitTypeTable()
+        snapshot, origin_indices = self.__getUnitsFiltered(unit_filter=origins)
+        _, target_indices = self.__getUnitsFiltered(unit_filter=targets)
+        compute = lambda: readOnly(table.getInWeaponRange(snapshot.data[origin_indices],
+                                                          snapshot.data[target_indices]))
+        key = ('in_weapon_range', id(origin_indices), id(target_indices))
+        return snapshot.memoize(key, compute)
+    
+    def getFrameDiff(self):
+        '''Get the changes in the units over the last update, see FrameDiff.
+        
+        The units are compared with the units before the last update, so
+        every frame stepped through by the update is covered. The units
+        before an update are only kept once getFrameDiff has been called, so
+        the first call finds no changes. Nothing changes across the start of
+        a match either.
+        '''
+        snapshot = self.getSnapshot()
+        return snapshot.memoize('frame_diff', lambda: self.__computeFrameDiff(snapshot))
+    
+    def __computeFrameDiff(self, snapshot):
+        EventType = self.__backend.EventType
+        if self.__previous_units is None:
+            self.__previous_units = snapshot.data
+            self.__diff_start = self.event_stream.frame + 1
+        previous = self.__previous_units
+        if self.event_stream.happenedSince(EventType.MatchStart, self.__diff_start):
+            previous = previous[:0]
+        events = self.event_stream.since(self.__diff_start, [EventType.UnitDestroy])
+        
+        return FrameDiff.fromEvents(previous, snapshot.data, events, EventType.UnitDestroy)
+    
+    def getReward(self, spec):
+        '''Get the player's reward over the last update given a RewardSpec.'''
+        return spec.evaluate(self.getFrameDiff(), self.getSelfID())
+    
+    def fillEntityObservation(self, observation):
+        '''Fill an EntityObservation with the units of the current frame.
+        
+        Its rows are cleared whenever a new match has started. Special units
+        are left out of every group.
+        '''
+        snapshot = self.getSnapshot()
+        indices = [self.__getUnitsFiltered(unit_filter=group)[1] for group in observation.groups]
+        match = self.event_stream.lastFrame(self.__backend.EventType.MatchStart)
+        
+        return observation.update(snapshot, self.getUnitTypeTable(), indices, match)
+    
+    def getFogOfWar(self):
+        '''Get the visible, explored and creep tiles of the map, see FogOfWar.
+        
+        The grids are updated from the previous call, only asking BWAPI
+        about tiles near the player's units which moved, and enemy units
+        seen since the match started are remembered until destroyed.
+        '''
+        snapshot = self.getSnapshot()
+        return snapshot.memoize('fog_of_war', lambda: self.__updateFogOfWar(snapshot))
+    
+    def __updateFogOfWar(self, snapshot):
+        width, height = self.__getMapSize()
+        fog = self.__fog_of_war
+        if fog is None or (fog.width, fog.height) != (width, height):
+            fog = self.__fog_of_war = FogOfWar(width, height)
+        EventType = self.__backend.EventType
+        data = snapshot.data[snapshot.data['exists']]
+        friendly = data[data['player'] == self.getSelfID()]
+        enemies = data[np.isin(data['player'], self.getEnemiesID())]
+        destroyed = self.event_stream.since(self.__fog_start, [EventType.UnitDestroy])
+        destroyed_ids = [event.getUnit().getID() for event in destroyed]
+        self.__fog_start = self.event_stream.frame + 1
+        match = self.event_stream.lastFrame(EventType.MatchStart)
+        
+        return fog.update(self.__Broodwar, friendly, enemies, self.getUnitTypeTable(),
+                          self.__Broodwar.getFrameCount(), destroyed_ids, match)
+    
+    def createUnitsPyramid(self, position, width, height, scales=(1, 4, 16),
+            kernel='footprint', value='presence', players=None, types=None,
+            unit_filter=None, dtype=np.float32):
+        '''Produce images of units within a rectangular area at several scales.
+        
+        Each unit covers its footprint, taken from its unit type's
+        dimensions, or a Gaussian blob of the same size when kernel is
+        'gaussian'. Units centered outside of the area are still drawn where
+        they overlap it.
+        
+        scales: The cell size in pixels of each image.
+        
+        value: Either 'presence' to draw the number of units or 'health' to
+        draw the sum of hit points and shields.
+        
+        Returns a list with an image of shape (H/scale, W/scale) for each
+        scale, indexed by row (y) and then column (x).
+        '''
+        extents = self.getUnitTypeTable().dimensions
+        snapshot = self.getSnapshot()
+        mask = self.__getCondition(players, types, None, unit_filter).mask(snapshot)
+        present = extents[snapshot.data['type'][mask]]
+        margin = getMargin(present, kernel) + 1
+        position = np.asarray(position)
+        indices = self.getUnitGrid().rect(position - margin, width + 2 * margin,
+                                          height + 2 * margin, mask)
+        data = snapshot.data[indices]
+        if value == 'presence':
+            values = np.ones(len(indices))
+        elif value == 'health':
+            values = data['hp'] + data['shields']
+        else:
+            raise ValueError('Unknown value: {}'.format(value))
+        offsets = snapshot.positions[indices] - position
+        
+        return rasterizePyramid(offsets, extents[data['type']], values, width,
+                                height, scales, kernel, dtype)
+    
     def getEnemiesID(self):
         '''Gather the IDs of the enemy players.'''
         return [e.getID() for e in self.__Broodwar.enemies()]
@@ -245,59 +673,176 @@ class BroodwarInterface(object):
         '''Leave the current match.'''
         self.__Broodwar.leaveGame()
         
-    def restart(self):
-        '''Restart the currrent match.'''
+    def restart(self, wait=False):
+        '''Restart the currrent match.
+        
+        wait: Step through the game until the new match has started.
+        '''
+        restarted_on = self.event_stream.frame + 1
         self.__Broodwar.restartGame()
+        if wait is True:
+            self.__waitForMatchStart(restarted_on)
         
     def set_map(self, map_name, speedup=True):
-        '''Set the map to the specified map and then start the match.'''
-        self.__Broodwar.setMap(map_name.encode())
-        self.restart()
+        '''Set the map to the specified map and then start the match.
         
-        events = [e.getType() for e in self.events]
-        while cybw.EventType.MatchStart not in events: #not self.isInGame():
-            self.update()
-            events = [e.getType() for e in self.events]
-        self.__Broodwar.enableFlag(cybw.Flag.CompleteMapInformation)
+        The map is only set when it is not the map last set, see reset.
+        '''
+        self.reset(map_name, speedup)
+        
+    def reset(self, map_name=None, speedup=True):
+        '''Start a new match and wait until it is in game.
+        
+        map_name: The map of the new match. The current map is restarted
+        without loading it again if None or the map last set.
+        
+        speedup: As for connect.
         
+        The map size, the snapshot of the units and the unit type table are
+        read before returning, so that the first frame of the match is not
+        slowed down by them. The terrain of MapData is not, as reading it can
+        take over a million BWAPI calls when it is not cached, so it is read
+        by the first getMapData after the map changed. The time spent in
+        each phase is recorded in reset_timings, along with the number of
+        frames stepped through.
+        
+        Returns the timings of the reset.
+        '''
+        return self.__startMatch(map_name, True, speedup)
+        
+    def __startMatch(self, map_name, restart, speedup):
+        '''Set up a match, timing each phase in reset_timings.'''
+        started_on = self.event_stream.frame + 1
+        begin = now = perf_counter()
+        phase = self.__timeResetPhase
+        
+        if map_name is not None and map_name != self.__map_name:
+            self.__Broodwar.setMap(map_name.encode())
+            self.__map_name = map_name
+            self.__map_data = None
+            self.__map_size = None
+            now = phase('set_map', now)
+        if restart:
+            self.__Broodwar.restartGame()
+            now = phase('restart', now)
+        self.__waitForMatchStart(started_on)
+        now = phase('match_start', now)
+        self.__Broodwar.enableFlag(self.__backend.Flag.CompleteMapInformation)
         while not self.isInGame():
             self.update()
-        self.update()
+            self.__checkInterrupt()
+        now = phase('in_game', now)
         
-        if speedup is True:
-            self.__Broodwar.setLocalSpeed(0)
-            #Broodwar.setGUI(False)
-            self.__Broodwar.setFrameSkip(0)
-        else:
-            self.__Broodwar.setLocalSpeed(167)
-            #Broodwar.setGUI(False)
-            self.__Broodwar.setFrameSkip(24)
+        speed = SPEED_PRESETS[speedup] if isinstance(speedup, bool) else speedup
+        self.set_speed(*speed)
+        now = phase('speed', now)
+        self.__getMapSize()
+        self.getSnapshot()
+        self.getUnitTypeTable()
+        now = phase('warm', now)
+        
+        return self.reset_timings.finish(frames=self.event_stream.frame + 1 - started_on,
+                                         total=now - begin)
+        
+    def __timeResetPhase(self, name, begin):
+        '''Add the time since begin to a phase of reset_timings and get the time now.'''
+        now = perf_counter()
+        self.reset_timings.add(name, now - begin)
+        return now
+        
+    def __waitForMatchStart(self, frame):
+        '''Step through the game until a match starts on or after a frame.'''
+        while not self.event_stream.happenedSince(self.__backend.EventType.MatchStart, frame):
+            self.update()
+            self.__checkInterrupt()
+        
+    def interrupt(self):
+        '''Stop a blocking call running on another thread.
+        
+        The next wait for the client to connect or for a match to start, or
+        the next frame of a multi-frame update, raises Interrupted. A call
+        stuck inside BWAPI itself cannot be interrupted.
+        '''
+        self.__interrupted.set()
+        
+    def resume(self):
+        '''Forget an interrupt which no blocking call has noticed.'''
+        self.__interrupted.clear()
+        
+    def __checkInterrupt(self):
+        if self.__interrupted.is_set():
+            self.__interrupted.clear()
+            raise Interrupted()
         
     def get_map_name(self):
         '''Get the current map name.'''
         return self.__Broodwar.mapPathName()
         
-    def update(self, number_of_updates=None, number_of_secs=None):
-        '''Step through the game.
+    def __step(self):
+        '''Advance the game by a single frame and gather its events.
         
-        Allows for stepping multiple times.
+        When timings is set the time spent in client.update and fetching
+        events is added to it.
         '''
-        if number_of_updates is None and number_of_secs is None:
+        timings = self.timings
+        if timings is None:
             self.__client.update()
-            self.events = self.__getEvents()
-        elif number_of_updates is not None and number_of_secs is None:
-            for _ in range(number_of_updates):
-                self.__client.update()
-                self.events = self.__getEvents()
-                if self.is_end() is True:
-                    break
-        elif number_of_updates is None and number_of_secs is not None:
-            stop_on = time() + number_of_secs
-            while time() < stop_on:
-                self.__client.update()
-                self.events = self.__getEvents()
+            self.event_stream.append(self.__getEvents())
         else:
-            assert(False)
+            begin = perf_counter()
+            self.__client.update()
+            updated = perf_counter()
+            self.event_stream.append(self.__getEvents())
+            timings.add('client_update', updated - begin)
+            timings.add('event_fetch', perf_counter() - updated)
+        self.__unit_table_refreshed = False
+        self.__snapshot = None
+        
+    def update(self, number_of_updates=None, number_of_secs=None):
+        '''Step through the game.
+        
+        Allows for stepping multiple times. Afterwards events holds the
+        events of every frame stepped through, see also event_stream.
+        Commands queued with queue_commands are flushed first.
+        '''
+        if self.__previous_units is not None:
+            self.__previous_units = self.getSnapshot().data
+            self.__diff_start = self.event_stream.frame + 1
+        if len(self.commands) > 0:
+            self.flush_commands()
+        self.__update_start = self.event_stream.frame + 1
+        try:
+            if number_of_updates is None and number_of_secs is None:
+                self.__step()
+            elif number_of_updates is not None and number_of_secs is None:
+                for _ in range(number_of_updates):
+                    self.__step()
+                    if self.is_end() is True:
+                        break
+                    self.__checkInterrupt()
+            elif number_of_updates is None and number_of_secs is not None:
+                stop_on = time() + number_of_secs
+                while time() < stop_on:
+                    self.__step()
+                    self.__checkInterrupt()
+            else:
+                assert(False)
+        finally:
+            self.events = self.event_stream.since(self.__update_start)
+        if self.event_stream.happenedSince(self.__backend.EventType.MatchStart, self.__update_start):
+            self.commands.clear()
+        if self.recorder is not None:
+            self.__record()
+            
+    def __record(self):
+        '''Record the update with recorder, starting and ending its episodes.'''
+        EventType = self.__backend.EventType
+        if self.event_stream.happenedSince(EventType.MatchStart, self.__update_start):
+            self.recorder.beginEpisode()
+        if self.recorder.recording or self.isInGame():
+            self.recorder.record(self)
+        if self.is_end():
+            self.recorder.endEpisode()
             
     def get_map_dimensions(self):
         '''Get the dimensions of the current map in Tiles.
@@ -305,50 +850,60 @@ class BroodwarInterface(object):
         Tiles: Broodwar evenly divides the map into tiles. A tile is 32 by 32
         pixels.
         '''
-        width = self.__Broodwar.mapWidth()
-        height = self.__Broodwar.mapHeight()
+        width, height = self.__getMapSize()
         
         return np.array([height, width])
         
-    def is_visible(self, players=None, types=None, units=None):
+    def is_visible(self, players=None, types=None, units=None, unit_filter=None):
         '''Used to detect if units are visible to the player.
         
             Enemy Units may still exist even if they're not visible.
+            See getFogOfWar for the visibility of the map itself.
         '''
         if players is None:
             players = [self.getSelfID()]
         
-        units = self.getUnits(players, types, units)
-        existing_units = [u.exists() for u in units]
-        return existing_units
+        function = lambda S, I: S.data['exists'][I].tolist()
+        return list(self.__memoizeFiltered('exists', function, players, types, units, unit_filter))
+        
+    def getUnitData(self, players=None, types=None, units=None, unit_filter=None):
+        '''Gather the columns of the units that fit the criteria.
+        
+        Returns a structured array with the fields of UNIT_DTYPE, one row per
+        unit. Unlike lists of units it can be copied into an ObservationBuffer
+        or sent to another process without pickling each unit.
+        '''
+        snapshot, indices = self.__getUnitsFiltered(players, types, units, unit_filter)
+        
+        return snapshot.data[indices]
         
-    def getUnitIDs(self, players=None, types=None, units=None):
+    def getUnitIDs(self, players=None, types=None, units=None, unit_filter=None):
         '''Gather unit IDs based on criteria.'''
-        game_units = self.getUnits(players, types, units)
-        unit_ids = [u.getID() for u in game_units]
-        return unit_ids
+        function = lambda S, I: S.data['id'][I].tolist()
+        return list(self.__memoizeFiltered('id', function, players, types, units, unit_filter))
         
     def is_end(self):
-        '''Detect if the match has ended.'''
-        for e in self.events:
-            eventType = e.getType()
-            if eventType == cybw.EventType.MatchEnd:
-                return True
-        return False
+        '''Detect if the match ended during the last update.'''
+        MatchEnd = self.__backend.EventType.MatchEnd
+        return self.event_stream.happenedSince(MatchEnd, self.__update_start)
         
     def attack_position(self, unit_id, position):
         '''Attack a position with a given unit ID.'''
         X, Y = position
-        cybw_position = cybw.Position(X, Y)
+        cybw_position = self.__backend.Position(X, Y)
         unit = self.__Broodwar.getUnit(unit_id)
-        return unit.attack(cybw_position)
+        issued = unit.attack(cybw_position)
+        self.__recordCommand(unit_id, ATTACK, position, issued)
+        return issued
         
     def move_to_position(self, unit_id, position):
         '''Move a unit to a position given its ID.'''
         X, Y = position
-        cybw_position = cybw.Position(X, Y)
+        cybw_position = self.__backend.Position(X, Y)
         unit = self.__Broodwar.getUnit(unit_id)
-        return unit.move(cybw_position)
+        issued = unit.move(cybw_position)
+        self.__recordCommand(unit_id, MOVE, position, issued)
+        return issued
         
     def use_stim_pack(self, unit_id):
         '''Use a stim pack on units with the ability to do so.
@@ -356,17 +911,151 @@ class BroodwarInterface(object):
         This is a ability that a few unit types have, such as the marine.
         '''
         unit = self.__Broodwar.getUnit(unit_id)
-        return unit.useTech(cybw.TechTypes.Stim_Packs)
+        issued = unit.useTech(self.__backend.TechTypes.Stim_Packs)
+        self.__recordCommand(unit_id, STIM, (0, 0), issued)
+        return issued
+        
+    def __recordCommand(self, unit_id, action, position, issued):
+        if self.recorder is not None:
+            self.recorder.recordCommands([unit_id], [action], np.array([position]),
+                                         [COMMAND_ISSUED if issued else COMMAND_FAILED])
+        
+    def issue_commands(self, unit_ids, actions, positions=None, skip_redundant=True):
+        '''Issue commands to many units in one pass.
+        
+        unit_ids: An array of N unit IDs.
+        
+        actions: An array of N action codes, each one of ATTACK, MOVE or STIM.
+        
+        positions: An (N, 2) array of target positions. Only read for ATTACK
+        and MOVE commands and may be None if there are none.
+        
+        skip_redundant: Skip commands which the unit is already carrying out,
+        that is attacking or moving to the same position or already stimmed.
+        
+        Commands to units which do not exist and attacks or moves to positions
+        outside of the map fail without reaching BWAPI.
+        
+        Returns an array holding COMMAND_ISSUED, COMMAND_SKIPPED or
+        COMMAND_FAILED for each command.
+        '''
+        unit_ids, actions, positions = self.__checkCommands(unit_ids, actions, positions)
+        targeted = actions != STIM
+        
+        snapshot = self.getSnapshot()
+        rows = snapshot.rowsOf(unit_ids)
+        found = rows >= 0
+        valid = np.zeros(len(rows), dtype=bool)
+        valid[found] = snapshot.data['exists'][rows[found]]
+        width, height = self.get_map_dims()
+        in_map = np.all((positions >= 0) & (positions < (width, height)), axis=1)
+        valid &= ~targeted | in_map
+        
+        status = np.full(len(unit_ids), COMMAND_FAILED, dtype=np.int8)
+        orders = {ATTACK: self.__backend.Orders.AttackMove, MOVE: self.__backend.Orders.Move}
+        stim_packs = self.__backend.TechTypes.Stim_Packs
+        cybw_positions = {}
+        for i in np.flatnonzero(valid):
+            unit = snapshot.units[rows[i]]
+            action = actions[i]
+            if action == STIM:
+                if skip_redundant and unit.isStimmed():
+                    status[i] = COMMAND_SKIPPED
+                    continue
+                issued = unit.useTech(stim_packs)
+            else:
+                X, Y = positions[i].tolist()
+                if skip_redundant and unit.getOrder() == orders[action]:
+                    target = unit.getOrderTargetPosition()
+                    if target.x == X and target.y == Y:
+                        status[i] = COMMAND_SKIPPED
+                        continue
+                cybw_position = cybw_positions.get((X, Y))
+                if cybw_position is None:
+                    cybw_position = cybw_positions[(X, Y)] = self.__backend.Position(X, Y)
+                if action == ATTACK:
+                    issued = unit.attack(cybw_position)
+                else:
+                    issued = unit.move(cybw_position)
+            status[i] = COMMAND_ISSUED if issued else COMMAND_FAILED
+        if self.recorder is not None:
+            self.recorder.recordCommands(unit_ids, actions, positions, status)
+        return status
+        
+    def __checkCommands(self, unit_ids, actions, positions):
+        '''Convert commands to arrays, raising ValueError if they are malformed.'''
+        unit_ids = np.asarray(unit_ids, dtype=np.int64).reshape(-1)
+        actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+        if len(actions) != len(unit_ids):
+            raise ValueError('Expected {} actions but got {}'.format(len(unit_ids), len(actions)))
+        unknown = ~np.isin(actions, ACTIONS)
+        if np.any(unknown):
+            raise ValueError('Unknown action codes: {}'.format(np.unique(actions[unknown]).tolist()))
+        if positions is None:
+            if np.any(actions != STIM):
+                raise ValueError('Positions are required for attack and move commands.')
+            positions = np.zeros((len(unit_ids), 2), dtype=np.int64)
+        positions = np.asarray(positions).reshape((-1, 2))
+        if len(positions) != len(unit_ids):
+            raise ValueError('Expected {} positions but got {}'.format(len(unit_ids), len(positions)))
+        
+        return unit_ids, actions, positions.astype(np.int64)
+        
+    def queue_commands(self, unit_ids, actions, positions=None, priorities=0):
+        '''Queue commands to be issued by the following updates, see CommandQueue.
+        
+        The arguments are those of issue_commands, along with the priority
+        of each command or one priority for all of them. Every update first
+        flushes up to the budget given as command_budget, highest priority
+        first, and carries the rest over. A command supersedes any command
+        still queued for the same unit. Queued commands are dropped when a
+        new match starts.
+        '''
+        unit_ids, actions, positions = self.__checkCommands(unit_ids, actions, positions)
+        self.commands.push(unit_ids, actions, positions, priorities, self.event_stream.frame)
+        
+    def flush_commands(self):
+        '''Issue the queued commands which fit the budget now.
+        
+        Called by update. Returns the commands issued, with the fields of
+        QUEUED_COMMAND_DTYPE, and their status as returned by issue_commands.
+        '''
+        commands = self.commands.pop(self.event_stream.frame)
+        positions = np.stack([commands['x'], commands['y']], axis=1)
+        status = self.issue_commands(commands['unit_id'], commands['action'], positions)
+        
+        return commands, status
         
     def get_map_dims(self):
         '''Get the pixel width and pixel height of the current map.'''
-        width = self.__Broodwar.mapWidth()*32
-        height = self.__Broodwar.mapHeight()*32
+        width, height = self.__getMapSize()
+        
+        return width*32, height*32
         
-        return width, height
+    def __getMapSize(self):
+        '''Get the width and height of the map in tiles.
+        
+        They are read from BWAPI once per map, like the map data.
+        '''
+        if self.__map_size is None:
+            self.__map_size = (self.__Broodwar.mapWidth(), self.__Broodwar.mapHeight())
+        return self.__map_size
+        
+    def getMapData(self):
+        '''Get the static terrain of the current map, see MapData.
+        
+        It is read the first time it is needed after connect or after
+        set_map changed the map. Maps are cached in the directory given as
+        map_cache, or in the default directory of getDefaultCacheDirectory,
+        so that other processes load them from disk rather than from BWAPI.
+        A map_cache of False only keeps maps in memory.
+        '''
+        if self.__map_data is None:
+            self.__map_data = getMapData(self.__Broodwar, self.__map_cache)
+        return self.__map_data
         
     def set_viewbox_position(self, position):
         '''Set the current viewbox on a given position.'''
         X, Y = position
-        cybw_position = cybw.Position(X, Y)
+        cybw_position = self.__backend.Position(X, Y)
         self.__Broodwar.setScreenPosition(cybw_position)
\ No newline at end of file
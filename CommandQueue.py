@@ -0,0 +1,120 @@
+'''Spread unit commands over frames with a per-frame budget.
+
+Issuing hundreds of commands in one frame makes that frame slow and BWAPI
+drops or delays some of them. A CommandQueue holds commands until they are
+flushed, at most budget per frame, highest priority first and oldest first
+among equal priorities. The rest are carried over to the next frame.
+
+A command supersedes any command still queued for the same unit, so a unit
+ordered every frame only carries out its latest order. Stimming is kept
+apart from attacking and moving, as it does not replace the unit's order. A
+command which supersedes another keeps its place in line, so units which are
+ordered often are not starved by their own orders.
+
+The interface owns a queue and flushes it at the start of every update:
+
+    interface = BroodwarInterface(command_budget=64)
+    interface.queue_commands(unit_ids, actions, positions, priorities)
+    interface.update()
+    interface.commands.report()
+
+Every flush records the queue depth, the number of commands flushed and
+superseded, and the mean and largest latency of the flushed commands in
+frames, summarized by report.
+'''
+
+import numpy as np
+
+from BroodwarInterface.Actions import STIM
+from BroodwarInterface.FrameStepper import StepTimings, HISTORY
+
+QUEUED_COMMAND_DTYPE = np.dtype([('unit_id', np.int64),
+                                 ('action', np.int64),
+                                 ('x', np.int64),
+                                 ('y', np.int64),
+                                 ('priority', np.int64),
+                                 ('frame', np.int64),
+                                 ('sequence', np.int64)])
+
+
+def getCommandKeys(commands):
+    '''Get the key of each command which commands superseding it share.'''
+    return commands['unit_id'] * 2 + (commands['action'] == STIM)
+
+
+class CommandQueue(object):
+    '''Commands waiting to be issued, see the module documentation.
+
+    budget: The most commands flushed per frame, None for no limit.
+
+    history: The number of flushes kept for report.
+    '''
+
+    def __init__(self, budget=None, history=HISTORY):
+        self.budget = budget
+        self.stats = StepTimings(history)
+        self.pending = np.zeros(0, dtype=QUEUED_COMMAND_DTYPE)
+        self.__sequence = 0
+        self.__superseded = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def clear(self):
+        '''Drop every queued command, such as when a new match starts.'''
+        self.pending = np.zeros(0, dtype=QUEUED_COMMAND_DTYPE)
+
+    def push(self, unit_ids, actions, positions, priorities, frame):
+        '''Queue commands given as arrays like those of issue_commands.
+
+        priorities: The priority of each command or one for all of them.
+        Higher priorities are flushed first.
+
+        frame: The frame the commands are queued in, used for latency.
+        '''
+        count = len(unit_ids)
+        commands = np.empty(count, dtype=QUEUED_COMMAND_DTYPE)
+        commands['unit_id'] = unit_ids
+        commands['action'] = actions
+        commands['x'] = positions[:, 0]
+        commands['y'] = positions[:, 1]
+        commands['priority'] = np.broadcast_to(np.asarray(priorities, dtype=np.int64), (count,))
+        commands['frame'] = frame
+        commands['sequence'] = np.arange(self.__sequence, self.__sequence + count)
+        self.__sequence += count
+
+        # The last command of each key wins, keeping the place in line of
+        # the first one queued.
+        merged = np.concatenate([self.pending, commands])
+        keys = getCommandKeys(merged)
+        _, first = np.unique(keys, return_index=True)
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(merged) - 1 - last
+        kept = merged[last]
+        kept['frame'] = merged['frame'][first]
+        kept['sequence'] = merged['sequence'][first]
+        self.__superseded += len(merged) - len(kept)
+        self.pending = kept[np.argsort(kept['sequence'], kind='stable')]
+
+    def pop(self, frame):
+        '''Take the commands to flush in a frame and record the flush.
+
+        Returns the commands with the fields of QUEUED_COMMAND_DTYPE, in the
+        order they should be issued.
+        '''
+        pending = self.pending
+        order = np.lexsort((pending['sequence'], pending['frame'], -pending['priority']))
+        count = len(order) if self.budget is None else min(self.budget, len(order))
+        flushed = pending[order[:count]]
+        self.pending = pending[np.sort(order[count:])]
+        latency = frame - flushed['frame']
+        self.stats.finish(depth=len(pending), flushed=count, carried=len(self.pending),
+                          superseded=self.__superseded,
+                          latency_mean=float(latency.mean()) if count else 0.0,
+                          latency_max=int(latency.max()) if count else 0)
+        self.__superseded = 0
+        return flushed
+
+    def report(self, percentiles=(50, 90, 99)):
+        '''Summarize the recorded flushes, see StepTimings.report.'''
+        return self.stats.report(percentiles)
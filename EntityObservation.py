@@ -0,0 +1,120 @@
+'''Fixed shape arrays of unit features for entity based policies.
+
+An EntityObservation holds a preallocated (G, N, F) float32 array of F
+features for up to N units in each of G groups of units, such as the
+player's units and the enemy's units, along with a validity mask and the
+unit ID of every row. It is filled in place every frame:
+
+    observation = EntityObservation([UnitFilter(players=[0]), UnitFilter(players=[1])],
+                                    max_units=64, features=('x', 'y', 'hp_fraction'))
+    interface.fillEntityObservation(observation)
+    observation.features, observation.mask, observation.unit_ids
+
+A unit keeps its row for as long as it belongs to its group, so the same
+row describes the same unit from frame to frame. Rows of units which are
+gone are reused by new units, lowest row first. Units which do not fit are
+left out until a row frees up and are counted in overflow.
+
+Features are named columns computed from the snapshot rows of the units
+and the UnitTypeTable, see FEATURES. A (name, function) pair adds a feature
+computed by function(data, table).
+'''
+
+import numpy as np
+
+FEATURES = {
+    'x': lambda data, table: data['x'],
+    'y': lambda data, table: data['y'],
+    'hp': lambda data, table: data['hp'],
+    'shields': lambda data, table: data['shields'],
+    'hp_fraction': lambda data, table: table.getFractions(data, 'hp'),
+    'shield_fraction': lambda data, table: table.getFractions(data, 'shields'),
+    'type': lambda data, table: data['type'],
+    'player': lambda data, table: data['player'],
+    'max_hit_points': lambda data, table: table.max_hit_points[data['type']],
+    'ground_range': lambda data, table: table.ground_range[data['type']],
+    'air_range': lambda data, table: table.air_range[data['type']],
+    'top_speed': lambda data, table: table.top_speed[data['type']],
+}
+
+DEFAULT_FEATURES = ('x', 'y', 'hp_fraction', 'shield_fraction', 'type')
+
+
+class EntityObservation(object):
+    '''Unit features in stable rows, see the module documentation.
+
+    groups: A list of UnitFilters, one per group. None selects every unit.
+
+    max_units: The number of rows of each group.
+
+    features: A list of feature names from FEATURES or (name, function)
+    pairs, in the order of the feature columns.
+
+    features, mask, unit_ids: The (G, N, F) feature array, the (G, N)
+    validity mask and the (G, N) unit IDs, -1 in empty rows.
+
+    overflow: The number of units of each group left out in the last frame.
+    '''
+
+    def __init__(self, groups, max_units, features=DEFAULT_FEATURES, dtype=np.float32):
+        self.groups = list(groups)
+        self.max_units = max_units
+        self.feature_names = []
+        self.__functions = []
+        for feature in features:
+            if isinstance(feature, str):
+                if feature not in FEATURES:
+                    raise ValueError('Unknown feature: {}'.format(feature))
+                feature = (feature, FEATURES[feature])
+            self.feature_names.append(feature[0])
+            self.__functions.append(feature[1])
+        shape = (len(self.groups), max_units)
+        self.features = np.zeros(shape + (len(self.__functions),), dtype=dtype)
+        self.mask = np.zeros(shape, dtype=np.bool_)
+        self.unit_ids = np.full(shape, -1, dtype=np.int32)
+        self.overflow = np.zeros(len(self.groups), dtype=np.int64)
+        self.match = None
+
+    def clear(self):
+        '''Empty every row, such as when a new match starts.'''
+        self.features[...] = 0
+        self.mask[...] = False
+        self.unit_ids[...] = -1
+        self.overflow[...] = 0
+
+    def __assignRows(self, group, ids):
+        '''Free the rows of units which are gone and give rows to new units.'''
+        unit_ids = self.unit_ids[group]
+        gone = (unit_ids >= 0) & ~np.isin(unit_ids, ids)
+        unit_ids[gone] = -1
+        new = ids[~np.isin(ids, unit_ids)]
+        free = np.flatnonzero(unit_ids < 0)
+        self.overflow[group] = max(len(new) - len(free), 0)
+        unit_ids[free[:len(new)]] = new[:len(free)]
+
+    def update(self, snapshot, table, indices=None, match=None):
+        '''Fill the arrays from a snapshot.
+
+        table: The UnitTypeTable, which must know every type in snapshot.
+
+        indices: The snapshot rows of the units of each group. The rows
+        selected by each group's filter are used if None.
+
+        match: Any value identifying the current match. The rows are
+        cleared when it changes.
+        '''
+        if match != self.match:
+            self.clear()
+            self.match = match
+        if indices is None:
+            indices = [snapshot.select(unit_filter) for unit_filter in self.groups]
+        for group, rows in enumerate(indices):
+            self.__assignRows(group, snapshot.data['id'][rows])
+            occupied = self.unit_ids[group] >= 0
+            self.mask[group] = occupied
+            features = self.features[group]
+            features[~occupied] = 0
+            data = snapshot.data[snapshot.rowsOf(self.unit_ids[group][occupied])]
+            for column, function in enumerate(self.__functions):
+                features[occupied, column] = function(data, table)
+        return self
@@ -0,0 +1,97 @@
+'''A bounded history of BWAPI events tagged with the frame they happened in.
+
+BWAPI only hands out the events of the latest frame. The stream keeps the
+events of past frames in a ring buffer so that frames stepped through in a
+single update are not lost, and remembers the last frame each event type
+happened in so that questions such as "did the match end since frame N"
+are answered without scanning the history.
+
+Callbacks can subscribe to an event type, or to every event, and are called
+with the frame number and the event as events arrive.
+'''
+
+from collections import defaultdict, deque
+
+HISTORY = 4096
+
+
+class EventStream(object):
+    '''Events of past frames.
+
+    capacity: The number of events kept. The oldest events are dropped first.
+
+    frame: The number of the latest frame appended, counting from 0. It is -1
+    before any frame is appended.
+    '''
+
+    def __init__(self, capacity=HISTORY):
+        self.frame = -1
+        self.__events = deque(maxlen=capacity)
+        self.__last_frame = {}
+        self.__counts = defaultdict(int)
+        self.__subscribers = defaultdict(list)
+
+    def __len__(self):
+        return len(self.__events)
+
+    def append(self, events):
+        '''Append the events of the next frame. Returns its frame number.'''
+        self.frame += 1
+        frame = self.frame
+        for event in events:
+            event_type = event.getType()
+            self.__events.append((frame, event))
+            self.__last_frame[event_type] = frame
+            self.__counts[event_type] += 1
+            for callback in self.__subscribers.get(event_type, ()):
+                callback(frame, event)
+            for callback in self.__subscribers.get(None, ()):
+                callback(frame, event)
+        return frame
+
+    def lastFrame(self, event_type):
+        '''Get the last frame an event type happened in, -1 if it never did.'''
+        return self.__last_frame.get(event_type, -1)
+
+    def happenedSince(self, event_type, frame):
+        '''Check if an event type happened in the given frame or after it.'''
+        return self.__last_frame.get(event_type, -1) >= frame
+
+    def count(self, event_type):
+        '''Get the number of events of a type appended so far.'''
+        return self.__counts.get(event_type, 0)
+
+    def since(self, frame, event_types=None):
+        '''Get the events which happened in the given frame or after it.
+
+        event_types: Only get events of these types if given.
+
+        Events which have been dropped from the history are not returned.
+        '''
+        if event_types is not None and all(self.lastFrame(t) < frame for t in event_types):
+            return []
+        events = []
+        for event_frame, event in reversed(self.__events):
+            if event_frame < frame:
+                break
+            if event_types is None or event.getType() in event_types:
+                events.append(event)
+        events.reverse()
+        return events
+
+    def subscribe(self, callback, event_type=None):
+        '''Call callback(frame, event) for each new event of a type.
+
+        Every event is passed to the callback when event_type is None.
+        '''
+        self.__subscribers[event_type].append(callback)
+
+    def unsubscribe(self, callback, event_type=None):
+        '''Stop calling a callback subscribed with the same event type.'''
+        self.__subscribers[event_type].remove(callback)
+
+    def clear(self):
+        '''Forget the history. Subscribers are kept.'''
+        self.__events.clear()
+        self.__last_frame.clear()
+        self.__counts.clear()
@@ -0,0 +1,88 @@
+'''Render a stack of unit feature planes in a single pass.
+
+A feature plane is an image of a rectangular area of the map in which every
+cell holds a feature of the units inside it. Planes are rendered directly
+at a reduced resolution: each cell covers a scale by scale block of pixels
+and units are scattered into their cell with a single accumulation per
+channel rather than first drawing a full resolution image.
+
+Channels are described by a kind and an optional UnitFilter selecting which
+units are drawn on that channel. The kinds are:
+-presence: The number of units in the cell.
+-health: The sum of hit points and shields of the units in the cell.
+-type: The unit type ID plus one of a unit in the cell, zero if empty.
+-player: The player ID plus one of a unit in the cell, zero if empty.
+'''
+
+import numpy as np
+
+CHANNEL_KINDS = ('presence', 'health', 'type', 'player')
+
+
+def getPlaneShape(width, height, scale=1):
+    '''Get the height and width of a plane covering an area at a scale.'''
+    return -(-int(height) // scale), -(-int(width) // scale)
+
+
+def _channelValues(kind, data):
+    if kind == 'presence':
+        return None
+    elif kind == 'health':
+        return data['hp'] + data['shields']
+    elif kind == 'type':
+        return data['type'] + 1
+    elif kind == 'player':
+        return data['player'] + 1
+    raise ValueError('Unknown channel kind: {}'.format(kind))
+
+
+def renderFeaturePlanes(snapshot, indices, position, width, height, channels,
+                        scale=1, out=None, dtype=np.float32):
+    '''Render the units of a snapshot into a (C, H/scale, W/scale) array.
+
+    snapshot: The UnitSnapshot to draw.
+
+    indices: The rows of the units inside the area.
+
+    position: The top left corner of the area in pixels.
+
+    channels: A list of (kind, unit_filter) pairs, one per channel. The
+    filter may be None to draw every unit in indices, and a kind on its own
+    is the same as a pair with no filter.
+
+    scale: The number of pixels along each side of a cell.
+
+    out: An optional preallocated array to render into. It must have the
+    shape (C, H/scale, W/scale) and its dtype is used for the planes.
+    '''
+    plane_shape = getPlaneShape(width, height, scale)
+    shape = (len(channels),) + plane_shape
+    if out is None:
+        out = np.zeros(shape, dtype=dtype)
+    else:
+        if out.shape != shape:
+            raise ValueError('Expected an output buffer of shape {} but got {}'.format(shape, out.shape))
+        out[...] = 0
+
+    offsets = snapshot.positions[indices] - np.asarray(position)
+    rows = (offsets[:, 1] // scale).astype(np.intp)
+    columns = (offsets[:, 0] // scale).astype(np.intp)
+    cells = rows * plane_shape[1] + columns
+    data = snapshot.data[indices]
+    size = plane_shape[0] * plane_shape[1]
+
+    for plane, channel in zip(out, channels):
+        kind, unit_filter = (channel, None) if isinstance(channel, str) else channel
+        values = _channelValues(kind, data)
+        selected = slice(None)
+        if unit_filter is not None:
+            selected = unit_filter.mask(snapshot)[indices]
+            values = values[selected] if values is not None else None
+        if kind in ('presence', 'health'):
+            counts = np.bincount(cells[selected], weights=values, minlength=size)
+            plane += counts.reshape(plane_shape).astype(out.dtype, copy=False)
+        else:
+            np.maximum.at(plane, (rows[selected], columns[selected]),
+                          values.astype(out.dtype, copy=False))
+
+    return out
@@ -0,0 +1,173 @@
+'''What the player can see of the map, tile by tile.
+
+A FogOfWar keeps three (height, width) uint8 grids over the build tiles of
+the map, 1 where a tile is:
+-visible: Seen by one of the player's units in the latest update.
+-explored: Seen at any point since the match started, or since the first
+ update of the FogOfWar when it was created during a match.
+-creep: Covered by creep when it was last seen.
+
+Asking BWAPI about every tile of a 256 by 256 map takes 65536 calls per
+frame. Only the player's units see, so the grids are updated incrementally:
+the units are matched to the units of the previous update, and only the
+tiles within sight of units which appeared, disappeared, moved to another
+tile or changed their sight range are asked about. Every other tile keeps
+its visibility. Vision which does not come from units, such as scanner
+sweeps, is therefore only noticed where a unit's vision changes as well.
+Without a game to ask the grids are drawn from the units' sight ranges
+alone, ignoring the terrain.
+
+Enemy units on visible tiles are remembered in last_seen, one row per unit
+with its position and the frame it was last seen in, until it is destroyed.
+
+    fog = interface.getFogOfWar()
+    fog.visible, fog.explored, fog.packed('creep'), fog.hidden()
+'''
+
+import numpy as np
+
+from BroodwarInterface.FrameDiff import alignIDs
+from BroodwarInterface.Rasterize import rasterizeDiscs
+
+TILE_SIZE = 32
+GRIDS = ('visible', 'explored', 'creep')
+
+LAST_SEEN_DTYPE = np.dtype([('id', np.int32),
+                            ('player', np.int32),
+                            ('type', np.int32),
+                            ('x', np.int32),
+                            ('y', np.int32),
+                            ('frame', np.int32)])
+
+SOURCE_DTYPE = np.dtype([('id', np.int32),
+                         ('x', np.int32),
+                         ('y', np.int32),
+                         ('radius', np.int32)])
+
+
+class FogOfWar(object):
+    '''Visibility grids and enemy memory, see the module documentation.
+
+    width, height: The size of the map in build tiles.
+
+    margin: The number of tiles added to the sight range of units when
+    choosing the tiles to ask BWAPI about, which covers differences between
+    BWAPI's vision and a disc of tiles.
+
+    queries: The number of tiles asked about in the latest update.
+
+    last_seen: The enemy units seen so far with the fields of
+    LAST_SEEN_DTYPE, sorted by ID.
+    '''
+
+    def __init__(self, width, height, margin=1):
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.visible = np.zeros((height, width), dtype=np.uint8)
+        self.explored = np.zeros((height, width), dtype=np.uint8)
+        self.creep = np.zeros((height, width), dtype=np.uint8)
+        self.last_seen = np.zeros(0, dtype=LAST_SEEN_DTYPE)
+        self.queries = 0
+        self.frame = -1
+        self.match = None
+        self.__sources = np.zeros(0, dtype=SOURCE_DTYPE)
+
+    def clear(self):
+        '''Forget everything seen, such as when a new match starts.'''
+        for name in GRIDS:
+            getattr(self, name)[...] = 0
+        self.last_seen = np.zeros(0, dtype=LAST_SEEN_DTYPE)
+        self.__sources = np.zeros(0, dtype=SOURCE_DTYPE)
+
+    def packed(self, name):
+        '''Get a grid bit packed along rows, as MapData stores its grids.'''
+        return np.packbits(getattr(self, name), axis=1)
+
+    def hidden(self):
+        '''Get the rows of last_seen of units which were not seen in the latest update.'''
+        return self.last_seen[self.last_seen['frame'] < self.frame]
+
+    def __getTiles(self, data):
+        '''Get the tile of each unit as x and y columns, clipped to the map.'''
+        x = np.clip(data['x'] // TILE_SIZE, 0, self.width - 1)
+        y = np.clip(data['y'] // TILE_SIZE, 0, self.height - 1)
+        return x, y
+
+    def __getSources(self, friendly, table):
+        sources = np.empty(len(friendly), dtype=SOURCE_DTYPE)
+        sources['id'] = friendly['id']
+        sources['x'], sources['y'] = self.__getTiles(friendly)
+        sources['radius'] = table.sight_range[friendly['type']] // TILE_SIZE
+        return sources
+
+    def __getChangedSources(self, sources):
+        '''Get the previous and current sources whose vision may have changed.'''
+        previous = self.__sources
+        previous_rows, current_rows = alignIDs(previous['id'], sources['id'])
+        same = previous[previous_rows] == sources[current_rows]
+        keep_previous = np.ones(len(previous), dtype=bool)
+        keep_previous[previous_rows[same]] = False
+        keep_current = np.ones(len(sources), dtype=bool)
+        keep_current[current_rows[same]] = False
+        return np.concatenate([previous[keep_previous], sources[keep_current]])
+
+    def __draw(self, sources, margin):
+        centers = np.stack([sources['x'], sources['y']], axis=1)
+        return rasterizeDiscs(centers, sources['radius'] + margin, (self.height, self.width)) > 0
+
+    def __ask(self, method, rows, columns):
+        self.queries += len(rows)
+        answers = (method(int(x), int(y)) for x, y in zip(columns, rows))
+        return np.fromiter(answers, dtype=bool, count=len(rows)).astype(np.uint8)
+
+    def update(self, game, friendly, enemies, table, frame, destroyed_ids=(), match=None):
+        '''Update the grids and last_seen from the units of a frame.
+
+        game: The BWAPI game, asked about tiles with isVisible and hasCreep.
+        When None visibility is drawn from the sight ranges of the units and
+        creep is left unchanged.
+
+        friendly, enemies: Snapshot rows of the player's units, which see,
+        and of the units remembered when seen.
+
+        table: The UnitTypeTable, which must know every friendly type.
+
+        destroyed_ids: The IDs of units destroyed since the previous update,
+        which are forgotten.
+
+        match: Any value identifying the current match. Everything is
+        cleared when it changes.
+        '''
+        if match != self.match:
+            self.clear()
+            self.match = match
+        self.frame = frame
+        self.queries = 0
+        sources = self.__getSources(friendly, table)
+        if game is None:
+            self.visible[...] = self.__draw(sources, 0)
+        else:
+            changed = self.__getChangedSources(sources)
+            rows, columns = np.nonzero(self.__draw(changed, self.margin))
+            seen = self.__ask(game.isVisible, rows, columns)
+            self.visible[rows, columns] = seen
+            rows, columns = rows[seen > 0], columns[seen > 0]
+            self.creep[rows, columns] = self.__ask(game.hasCreep, rows, columns)
+        self.__sources = sources
+        self.explored |= self.visible
+        self.__remember(enemies, frame, destroyed_ids)
+        return self
+
+    def __remember(self, enemies, frame, destroyed_ids):
+        '''Update last_seen with the enemy units on visible tiles.'''
+        x, y = self.__getTiles(enemies)
+        seen = enemies[self.visible[y, x] > 0]
+        rows = np.empty(len(seen), dtype=LAST_SEEN_DTYPE)
+        for name in ('id', 'player', 'type', 'x', 'y'):
+            rows[name] = seen[name]
+        rows['frame'] = frame
+        forget = np.concatenate([seen['id'], np.asarray(destroyed_ids, dtype=np.int32).reshape(-1)])
+        kept = self.last_seen[~np.isin(self.last_seen['id'], forget)]
+        last_seen = np.concatenate([kept, rows])
+        self.last_seen = last_seen[np.argsort(last_seen['id'], kind='stable')]
@@ -0,0 +1,138 @@
+'''Changes in the units between two updates and rewards computed from them.
+
+A FrameDiff compares the units of an earlier snapshot with the current one.
+Units are matched by ID with a sort and a binary search, and the unit
+destroy events of every frame in between are used to tell units which died
+from units which are no longer visible. When several frames are stepped in
+one update the differences therefore cover all of them: a unit which died
+during a skipped frame is counted as lost, with all of the hit points and
+shields it had in the earlier snapshot counted as damage taken.
+
+Per player results are arrays indexed by player ID.
+
+A RewardSpec is a weighted sum of named terms of a FrameDiff:
+
+    spec = RewardSpec(damage_dealt=0.01, damage_taken=-0.01, units_killed=1, units_lost=-1)
+    reward = interface.getReward(spec)
+'''
+
+import numpy as np
+
+MAX_PLAYERS = 12
+
+
+def alignIDs(previous_ids, current_ids):
+    '''Find the IDs of current_ids which are also in previous_ids.
+
+    Returns the rows of the matching IDs in previous_ids and in current_ids.
+    '''
+    previous_ids = np.asarray(previous_ids)
+    current_ids = np.asarray(current_ids)
+    if len(previous_ids) == 0 or len(current_ids) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    order = np.argsort(previous_ids, kind='stable')
+    sorted_ids = previous_ids[order]
+    positions = np.minimum(np.searchsorted(sorted_ids, current_ids), len(sorted_ids) - 1)
+    found = sorted_ids[positions] == current_ids
+    return order[positions[found]], np.flatnonzero(found)
+
+
+class FrameDiff(object):
+    '''The difference between an earlier and the current state of the units.
+
+    previous, current: The rows of the two snapshots, with the fields of
+    UNIT_DTYPE.
+
+    destroyed_ids, destroyed_players: The IDs and owners of the units
+    destroyed in between.
+
+    unit_ids: The IDs of units in both snapshots, in the order of current.
+
+    hp_change, shield_change: The change in hit points and shields of each
+    unit in unit_ids.
+
+    damage_taken: The hit points and shields lost by the units of each
+    player, counting all that destroyed units had.
+
+    units_lost: The number of units of each player which were destroyed.
+    '''
+
+    def __init__(self, previous, current, destroyed_ids=(), destroyed_players=()):
+        self.previous = previous
+        self.current = current
+        self.destroyed_ids = np.asarray(destroyed_ids, dtype=np.int64).reshape(-1)
+        self.destroyed_players = np.asarray(destroyed_players, dtype=np.int64).reshape(-1)
+
+        previous_rows, current_rows = alignIDs(previous['id'], current['id'])
+        before = previous[previous_rows]
+        after = current[current_rows]
+        self.unit_ids = after['id']
+        self.hp_change = after['hp'].astype(np.int64) - before['hp']
+        self.shield_change = after['shields'].astype(np.int64) - before['shields']
+        lost = -np.minimum(self.hp_change + self.shield_change, 0)
+        damage = np.bincount(after['player'], weights=lost, minlength=MAX_PLAYERS)
+
+        # Destroyed units lose everything they had in the earlier snapshot.
+        destroyed_rows, found = alignIDs(previous['id'], self.destroyed_ids)
+        destroyed = previous[destroyed_rows]
+        remaining = destroyed['hp'].astype(np.int64) + destroyed['shields']
+        damage += np.bincount(destroyed['player'], weights=remaining, minlength=MAX_PLAYERS)
+        self.damage_taken = damage
+        self.units_lost = np.bincount(self.destroyed_players, minlength=MAX_PLAYERS)
+
+    @classmethod
+    def fromEvents(cls, previous, current, events, destroy_type):
+        '''Compute the difference given the events of the frames in between.
+
+        destroy_type: The event type of unit destruction.
+        '''
+        destroyed = [event.getUnit() for event in events if event.getType() == destroy_type]
+        ids = [unit.getID() for unit in destroyed]
+        # Prefer the owner in the earlier snapshot, units created and
+        # destroyed in between are read from BWAPI.
+        previous_rows, found = alignIDs(previous['id'], ids)
+        players = np.empty(len(ids), dtype=np.int64)
+        players[found] = previous['player'][previous_rows]
+        for i in np.setdiff1d(np.arange(len(ids)), found):
+            players[i] = destroyed[i].getPlayer().getID()
+        return cls(previous, current, ids, players)
+
+    def damageDealt(self, player):
+        '''Get the damage taken by every other player.'''
+        return self.damage_taken.sum() - self.damage_taken[player]
+
+    def unitsKilled(self, player):
+        '''Get the number of units of every other player destroyed.'''
+        return self.units_lost.sum() - self.units_lost[player]
+
+
+TERMS = {
+    'damage_dealt': lambda diff, player: diff.damageDealt(player),
+    'damage_taken': lambda diff, player: diff.damage_taken[player],
+    'units_killed': lambda diff, player: diff.unitsKilled(player),
+    'units_lost': lambda diff, player: diff.units_lost[player],
+    'step': lambda diff, player: 1,
+}
+
+
+class RewardSpec(object):
+    '''A reward which is a weighted sum of terms of a FrameDiff.
+
+    The keyword arguments give the weight of each term of TERMS. Terms which
+    are not given have a weight of 0.
+    '''
+
+    def __init__(self, **weights):
+        unknown = set(weights) - set(TERMS)
+        if unknown:
+            raise ValueError('Unknown reward terms: {}'.format(sorted(unknown)))
+        self.weights = weights
+
+    def evaluate(self, diff, player):
+        '''Get the reward of a player for a FrameDiff.'''
+        return float(sum(weight * TERMS[term](diff, player) for term, weight in self.weights.items()))
+
+    def terms(self, diff, player):
+        '''Get the weighted value of each term, such as for logging.'''
+        return {term: float(weight * TERMS[term](diff, player)) for term, weight in self.weights.items()}
@@ -0,0 +1,171 @@
+'''Pace an agent's decisions against the game and time where each step goes.
+
+A FrameStepper advances a BroodwarInterface between the agent's decisions in
+one of three ways:
+-Lockstep: Every step advances exactly frames_per_step frames.
+-Target rate: Steps happen at most decisions_per_second times a second of
+ wall clock time. When the agent and game are faster than that the stepper
+ sleeps until the next decision is due instead of polling the clock.
+-Adaptive: Each step advances as many frames as the game would have played
+ in real time since the previous step, at frames_per_second, so an agent
+ which falls behind skips more frames rather than slowing the game down.
+
+Every step is broken down into the time spent in client.update, fetching
+events, the agent's own phases such as building observations and issuing
+commands, and sleeping:
+
+    stepper = FrameStepper(interface, frames_per_step=4)
+    while not interface.is_end():
+        with stepper.phase('observation'):
+            observation = interface.createFeaturePlanes(...)
+        with stepper.phase('commands'):
+            interface.issue_commands(...)
+        stepper.step()
+    print(stepper.report())
+'''
+
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from time import perf_counter, sleep
+
+import numpy as np
+
+FASTEST_FRAMES_PER_SECOND = 1000 / 42
+HISTORY = 1024
+
+
+class StepTimings(object):
+    '''The time spent in each phase of recent steps.
+
+    capacity: The number of steps kept.
+    '''
+
+    def __init__(self, capacity=HISTORY):
+        self.current = defaultdict(float)
+        self.history = deque(maxlen=capacity)
+
+    def add(self, phase, seconds):
+        '''Add time spent in a phase of the current step.'''
+        self.current[phase] += seconds
+
+    def finish(self, **values):
+        '''End the current step, storing its timings with any extra values.'''
+        record = dict(self.current)
+        record.update(values)
+        self.history.append(record)
+        self.current = defaultdict(float)
+        return record
+
+    def report(self, percentiles=(50, 90, 99)):
+        '''Summarize each phase over the stored steps.
+
+        Returns a dictionary from phase to a dictionary holding the mean and
+        the percentiles of the phase in seconds.
+        '''
+        phases = sorted(set(phase for record in self.history for phase in record))
+        report = {}
+        for phase in phases:
+            values = np.array([record.get(phase, 0.0) for record in self.history])
+            summary = {'mean': float(np.mean(values))}
+            for percentile in percentiles:
+                summary['p{}'.format(percentile)] = float(np.percentile(values, percentile))
+            report[phase] = summary
+        return report
+
+
+class FrameStepper(object):
+    '''Step an interface between decisions, see the module documentation.
+
+    frames_per_step: The number of frames each step advances, or the
+    smallest number when adaptive.
+
+    decisions_per_second: The most steps allowed per second of wall clock
+    time. None to step as soon as the agent asks.
+
+    adaptive: Advance the frames played in real time since the last step.
+
+    max_frames_per_step: The largest number of frames an adaptive step
+    advances.
+
+    frames_per_second: The game speed an adaptive stepper keeps up with.
+    Broodwar's fastest speed plays 1000 / 42 frames per second.
+    '''
+
+    def __init__(self, interface, frames_per_step=1, decisions_per_second=None,
+                 adaptive=False, max_frames_per_step=24,
+                 frames_per_second=FASTEST_FRAMES_PER_SECOND, history=HISTORY):
+        if frames_per_step < 1:
+            raise ValueError('frames_per_step must be at least 1.')
+        self.interface = interface
+        self.frames_per_step = frames_per_step
+        self.decisions_per_second = decisions_per_second
+        self.adaptive = adaptive
+        self.max_frames_per_step = max(max_frames_per_step, frames_per_step)
+        self.frames_per_second = frames_per_second
+        self.timings = StepTimings(history)
+        self.steps = 0
+        self.__last_step = None
+        self.__next_decision = None
+        interface.timings = self.timings
+
+    def close(self):
+        '''Stop recording the interface's timings.'''
+        if self.interface.timings is self.timings:
+            self.interface.timings = None
+
+    @contextmanager
+    def phase(self, name):
+        '''Time the agent's own work, such as building an observation.'''
+        begin = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.add(name, perf_counter() - begin)
+
+    def __framesToStep(self, now):
+        if not self.adaptive or self.__last_step is None:
+            return self.frames_per_step
+        behind = int((now - self.__last_step) * self.frames_per_second)
+        return int(np.clip(behind, self.frames_per_step, self.max_frames_per_step))
+
+    def __waitForDecision(self):
+        '''Sleep until the next decision is due.'''
+        if self.decisions_per_second is None:
+            return 0.0
+        now = perf_counter()
+        interval = 1.0 / self.decisions_per_second
+        if self.__next_decision is None:
+            self.__next_decision = now
+        waited = 0.0
+        if self.__next_decision > now:
+            waited = self.__next_decision - now
+            sleep(waited)
+        # Do not try to catch up on decisions missed while falling behind.
+        self.__next_decision = max(self.__next_decision, now) + interval
+        return waited
+
+    def step(self):
+        '''Advance the game until the agent's next decision.
+
+        Returns the number of frames advanced, which is smaller than asked
+        for if the match ends.
+        '''
+        waited = self.__waitForDecision()
+        begin = perf_counter()
+        frames = self.__framesToStep(begin)
+        before = self.interface.event_stream.frame
+        self.interface.update(number_of_updates=frames)
+        end = perf_counter()
+        advanced = self.interface.event_stream.frame - before
+
+        step_time = end - begin
+        self.timings.add('wait', waited)
+        self.timings.add('step', step_time)
+        self.timings.finish(frames=advanced)
+        self.__last_step = end
+        self.steps += 1
+        return advanced
+
+    def report(self):
+        '''Summarize the timings of recent steps, see StepTimings.report.'''
+        return self.timings.report()
@@ -0,0 +1,167 @@
+'''The static terrain of a map, read from BWAPI once and cached.
+
+Reading the terrain takes one BWAPI call per walk tile or build tile, which
+adds up to over a million calls on large maps. MapData reads it once per
+map and keeps it in compact arrays:
+-walkable: Whether each 8 by 8 pixel walk tile is walkable, bit packed
+ along rows.
+-buildable: Whether each 32 by 32 pixel build tile is buildable, bit packed
+ along rows.
+-ground_height: The ground height of each build tile, from 0 to 5.
+-start_locations: The build tile of each start location as an (N, 2) array
+ of x and y.
+
+Loaded maps are kept in memory for the rest of the process. When given a
+cache directory they are also stored on disk, keyed by the map's path name
+and its hash, so that other processes and later runs memory map the arrays
+rather than reading them from BWAPI again. The default cache directory is
+set by the BROODWAR_MAP_CACHE environment variable, or is a directory in the
+user's cache directory otherwise.
+'''
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+CACHE_ENVIRONMENT_VARIABLE = 'BROODWAR_MAP_CACHE'
+ARRAYS = ('walkable', 'buildable', 'ground_height', 'start_locations')
+WALK_TILES_PER_TILE = 4
+
+_loaded = {}
+
+
+def getMapKey(map_name, map_hash):
+    '''Get the name a map is cached under.'''
+    digest = hashlib.sha1('{}\n{}'.format(map_name, map_hash).encode()).hexdigest()[:16]
+    base = os.path.splitext(map_name.replace('\\', '/').split('/')[-1])[0]
+    safe = ''.join(c if c.isalnum() or c in '-_' else '_' for c in base)
+    return '{}-{}'.format(safe, digest)
+
+
+def getDefaultCacheDirectory():
+    '''Get the cache directory set by BROODWAR_MAP_CACHE.
+
+    When it is unset maps are cached in the user's cache directory, given by
+    LOCALAPPDATA on Windows and XDG_CACHE_HOME or ~/.cache elsewhere.
+    '''
+    directory = os.environ.get(CACHE_ENVIRONMENT_VARIABLE)
+    if directory:
+        return directory
+    cache = (os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME')
+             or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache, 'BroodwarInterface', 'maps')
+
+
+class MapData(object):
+    '''The terrain of a map, see the module documentation.
+
+    width, height: The size of the map in build tiles.
+    '''
+
+    def __init__(self, key, width, height, walkable, buildable, ground_height, start_locations):
+        self.key = key
+        self.width = width
+        self.height = height
+        self.walkable = walkable
+        self.buildable = buildable
+        self.ground_height = ground_height
+        self.start_locations = start_locations
+        self.__unpacked = {}
+
+    @classmethod
+    def fromGame(cls, game, key):
+        '''Read the terrain of the current map from BWAPI.'''
+        width, height = game.mapWidth(), game.mapHeight()
+        walk_width, walk_height = width * WALK_TILES_PER_TILE, height * WALK_TILES_PER_TILE
+        walkable = np.array([[game.isWalkable(x, y) for x in range(walk_width)]
+                             for y in range(walk_height)], dtype=bool).reshape((walk_height, walk_width))
+        buildable = np.array([[game.isBuildable(x, y) for x in range(width)]
+                              for y in range(height)], dtype=bool).reshape((height, width))
+        ground_height = np.array([[game.getGroundHeight(x, y) for x in range(width)]
+                                  for y in range(height)], dtype=np.uint8).reshape((height, width))
+        start_locations = np.array([(tile.x, tile.y) for tile in game.getStartLocations()],
+                                   dtype=np.int32).reshape((-1, 2))
+        return cls(key, width, height, np.packbits(walkable, axis=1), np.packbits(buildable, axis=1),
+                   ground_height, start_locations)
+
+    @classmethod
+    def load(cls, path, key):
+        '''Memory map a map stored with save.'''
+        with open(os.path.join(path, 'map.json')) as metadata:
+            size = json.load(metadata)
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+        return cls(key, size['width'], size['height'], **arrays)
+
+    def save(self, path):
+        '''Store the map in a directory, which must not exist yet.
+
+        The arrays are written to a temporary directory first and moved into
+        place, so that processes caching the same map at once do not read a
+        partly written one.
+        '''
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        temporary = tempfile.mkdtemp(dir=parent, prefix='.' + os.path.basename(path))
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(temporary, name + '.npy'), getattr(self, name))
+            with open(os.path.join(temporary, 'map.json'), 'w') as metadata:
+                json.dump({'width': self.width, 'height': self.height}, metadata)
+            os.rename(temporary, path)
+        except OSError:
+            # Another process stored the map first.
+            shutil.rmtree(temporary, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+    def __unpack(self, name, width):
+        grid = self.__unpacked.get(name)
+        if grid is None:
+            grid = np.unpackbits(getattr(self, name), axis=1, count=width).astype(bool)
+            grid.flags.writeable = False
+            self.__unpacked[name] = grid
+        return grid
+
+    def getWalkability(self):
+        '''Get the walkability of every walk tile as a boolean (y, x) array.'''
+        return self.__unpack('walkable', self.width * WALK_TILES_PER_TILE)
+
+    def getBuildability(self):
+        '''Get the buildability of every build tile as a boolean (y, x) array.'''
+        return self.__unpack('buildable', self.width)
+
+    def getTileWalkability(self):
+        '''Get the fraction of walkable walk tiles in every build tile.'''
+        walkable = self.getWalkability().reshape((self.height, WALK_TILES_PER_TILE,
+                                                  self.width, WALK_TILES_PER_TILE))
+        return walkable.mean(axis=(1, 3))
+
+
+def getMapData(game, cache_directory=None):
+    '''Get the terrain of the game's current map.
+
+    The map is looked up in memory, then in the cache directory, and only
+    read from BWAPI if neither has it. A map read from BWAPI is stored in
+    the cache directory if one is given.
+    '''
+    key = getMapKey(game.mapPathName(), game.mapHash())
+    map_data = _loaded.get(key)
+    if map_data is not None:
+        return map_data
+    path = None if cache_directory is None else os.path.join(cache_directory, key)
+    if path is not None and os.path.isdir(path):
+        map_data = MapData.load(path, key)
+    else:
+        map_data = MapData.fromGame(game, key)
+        if path is not None:
+            try:
+                map_data.save(path)
+            except OSError:
+                # The cache only saves time, the map is still usable.
+                pass
+    _loaded[key] = map_data
+    return map_data
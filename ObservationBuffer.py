@@ -0,0 +1,169 @@
+'''A ring buffer of observations in shared memory.
+
+Sending observations to another process pickles and copies them. An
+ObservationBuffer instead lays out a fixed number of slots in a single
+multiprocessing.shared_memory block, each slot holding one array per field
+of a schema. The actor renders its observation straight into the next slot
+and the learner reads it back as NumPy views of the same memory:
+
+    schema = {
+        'units_map': ((1024, 1024), np.float64),
+        'units': ((512,), UNIT_DTYPE),
+        'unit_count': ((), np.int64),
+    }
+    buffer = ObservationBuffer(schema, capacity=8)
+
+    # In the actor.
+    with buffer.write() as slot:
+        interface.createUnitsMap(position, 1024, 1024, out=slot['units_map'])
+        units = interface.getUnitData()[:512]
+        slot['units'][:len(units)] = units
+        slot['unit_count'][...] = len(units)
+
+    # In the learner, given the buffer through a pipe or a process argument.
+    sequence = buffer.latest()
+    views = buffer.read(sequence)
+
+Every write is numbered with a sequence number starting at 0. The slot of a
+sequence number is reused capacity writes later, so a reader which holds on
+to views should check isCurrent after using them, or copy them first. Only a
+single process may write to a buffer.
+
+Pickling a buffer, such as when passing it to another process, pickles its
+name and schema and the unpickled buffer attaches to the same memory.
+'''
+
+import os
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+ALIGNMENT = 64
+
+
+def getLayout(schema, capacity):
+    '''Get the offset of every field and the total size of a buffer.
+
+    The header comes first, holding the number of writes followed by the
+    sequence number stored in each slot. Each field then holds the arrays
+    of every slot next to each other, starting on a 64 byte boundary.
+    '''
+    offset = (capacity + 1) * np.dtype(np.int64).itemsize
+    offsets = {}
+    for name, (shape, dtype) in schema.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        offsets[name] = offset
+        offset += capacity * int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    return offsets, max(offset, 1)
+
+
+def attachSharedMemory(name):
+    '''Attach to an existing block without tracking it as a resource.
+
+    From Python 3.13 an attached block is not tracked, so the resource
+    tracker of an unrelated process does not unlink it when that process
+    exits. Earlier versions always track it, which is harmless in processes
+    started by the creator since they share its resource tracker.
+    '''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class ObservationBuffer(object):
+    '''Slots of fixed shape arrays in shared memory, see the module documentation.
+
+    schema: A dictionary from field name to a (shape, dtype) pair.
+
+    capacity: The number of slots.
+
+    name: The name of the shared memory block to attach to. A new block is
+    created when None.
+    '''
+
+    def __init__(self, schema, capacity, name=None):
+        self.schema = {key: (tuple(shape) if isinstance(shape, (tuple, list)) else (shape,),
+                             np.dtype(dtype))
+                       for key, (shape, dtype) in schema.items()}
+        self.capacity = capacity
+        # The creating process, which forked children inherit the buffer from.
+        self.owner = os.getpid() if name is None else None
+        offsets, size = getLayout(self.schema, capacity)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = attachSharedMemory(name)
+        self.name = self.memory.name
+        self.__header = np.ndarray((capacity + 1,), np.int64, self.memory.buf)
+        self.__fields = {key: np.ndarray((capacity,) + shape, dtype, self.memory.buf, offsets[key])
+                         for key, (shape, dtype) in self.schema.items()}
+        if name is None:
+            self.__header[0] = 0
+            self.__header[1:] = -1
+
+    def __getstate__(self):
+        return {'schema': self.schema, 'capacity': self.capacity, 'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['schema'], state['capacity'], state['name'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    @contextmanager
+    def write(self):
+        '''Write the next slot, yielding a dictionary of writable views.
+
+        The slot is published when the block exits. Its previous contents
+        are left in place, so every field should be written.
+        '''
+        sequence = int(self.__header[0])
+        slot = sequence % self.capacity
+        self.__header[1 + slot] = -1
+        yield {key: field[slot, ...] for key, field in self.__fields.items()}
+        self.__header[1 + slot] = sequence
+        self.__header[0] = sequence + 1
+
+    def latest(self):
+        '''Get the sequence number of the latest write, -1 if none happened.'''
+        return int(self.__header[0]) - 1
+
+    def oldest(self):
+        '''Get the sequence number of the oldest write still in the buffer.'''
+        return max(int(self.__header[0]) - self.capacity, 0)
+
+    def isCurrent(self, sequence):
+        '''Check that a write is in the buffer and is not being overwritten.'''
+        return sequence >= 0 and int(self.__header[1 + sequence % self.capacity]) == sequence
+
+    def read(self, sequence):
+        '''Get read-only views of a write, None if it is not in the buffer.'''
+        if not self.isCurrent(sequence):
+            return None
+        slot = sequence % self.capacity
+        views = {}
+        for key, field in self.__fields.items():
+            view = field[slot, ...]
+            view.flags.writeable = False
+            views[key] = view
+        return views
+
+    def close(self):
+        '''Detach from the shared memory, unlinking it in the process which
+        created it.
+
+        Views returned by read and write must be released first.
+        '''
+        if self.memory is None:
+            return
+        self.__header = None
+        self.__fields = None
+        self.memory.close()
+        if self.owner == os.getpid():
+            self.memory.unlink()
+        self.memory = None
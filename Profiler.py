@@ -0,0 +1,215 @@
+'''Count and time every call from a BroodwarInterface into its backend.
+
+A Profiler given to a BroodwarInterface wraps the backend's client and game
+in proxies which time each call made through them. Objects handed back by
+the backend, such as units, players and positions, are wrapped as well, so
+unit.getPosition() is counted as a call to Unit.getPosition. Each call is
+attributed to the public interface method it was made from, the outermost
+one when they are nested, or to '(user)' for calls made directly on units
+returned by the interface:
+
+    profiler = Profiler()
+    interface = BroodwarInterface(profiler=profiler)
+    ...
+    for key, summary in profiler.top(10):
+        print(key, summary)
+
+A frame of the profile ends with every update. The number of calls and the
+seconds spent in each method and backend call are kept for the last history
+frames and summarized as percentiles by report, or handed to a callback as
+each frame ends.
+
+Without a Profiler nothing is wrapped, so profiling costs nothing when it
+is not used. With one every backend call pays for the proxy, so absolute
+timings are inflated, but the number of calls is exact.
+'''
+
+from collections import defaultdict
+from functools import wraps
+from time import perf_counter
+
+import numpy as np
+
+from BroodwarInterface.FrameStepper import StepTimings
+
+HISTORY = 1024
+OUTSIDE = '(user)'
+
+PRIMITIVES = (type(None), bool, int, float, complex, str, bytes, np.generic, np.ndarray)
+
+
+class Profiler(object):
+    '''Counts and times of backend calls per frame, see the module documentation.
+
+    history: The number of frames kept.
+
+    callback: A function called with the record of each frame as it ends.
+    The record maps keys such as 'getHealth > Unit.getHitPoints calls' to
+    the number of calls or seconds in the frame.
+    '''
+
+    def __init__(self, history=HISTORY, callback=None):
+        self.frames = StepTimings(history)
+        self.callback = callback
+        self.api = OUTSIDE
+        self.__depth = 0
+        self.__calls = defaultdict(int)
+        self.__seconds = defaultdict(float)
+
+    def wrapBackend(self, backend):
+        '''Get a backend whose client and game calls are profiled.'''
+        return ProfiledBackend(backend, self)
+
+    def instrument(self, interface):
+        '''Attribute backend calls to the public methods of an interface.'''
+        for name in dir(type(interface)):
+            if name.startswith('_') or not callable(getattr(type(interface), name)):
+                continue
+            setattr(interface, name, self.__wrapMethod(name, getattr(interface, name)))
+
+    def __wrapMethod(self, name, method):
+        ends_frame = name == 'update'
+
+        @wraps(method)
+        def profiled(*args, **kwargs):
+            outermost = self.__depth == 0
+            if outermost:
+                self.api = name
+            self.__depth += 1
+            begin = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.__depth -= 1
+                if outermost:
+                    self.add(name, None, perf_counter() - begin)
+                    self.api = OUTSIDE
+                if ends_frame:
+                    self.finishFrame()
+        return profiled
+
+    def add(self, api, call, seconds):
+        '''Count a call made from a public method, or the method itself if call is None.'''
+        key = api if call is None else '{} > {}'.format(api, call)
+        self.__calls[key] += 1
+        self.__seconds[key] += seconds
+
+    def finishFrame(self):
+        '''End the current frame, storing its counts and times.'''
+        for key, calls in self.__calls.items():
+            self.frames.add(key + ' calls', calls)
+            self.frames.add(key + ' seconds', self.__seconds[key])
+        record = self.frames.finish()
+        self.__calls.clear()
+        self.__seconds.clear()
+        if self.callback is not None:
+            self.callback(record)
+        return record
+
+    def report(self, percentiles=(50, 90, 99)):
+        '''Summarize every key over the stored frames, see StepTimings.report.'''
+        return self.frames.report(percentiles)
+
+    def top(self, n=10, statistic='mean', kind='calls'):
+        '''Get the n keys with the largest statistic of calls or seconds per frame.
+
+        Returns a list of (key, summary) pairs, largest first.
+        '''
+        suffix = ' ' + kind
+        summaries = [(key[:-len(suffix)], summary) for key, summary in self.report().items()
+                     if key.endswith(suffix)]
+        summaries.sort(key=lambda item: item[1][statistic], reverse=True)
+        return summaries[:n]
+
+
+def unwrap(value):
+    '''Get the backend object behind a proxy.'''
+    if isinstance(value, _Proxy):
+        return object.__getattribute__(value, '_target')
+    return value
+
+
+def wrap(value, profiler):
+    '''Wrap a value returned by the backend so that calls on it are profiled.'''
+    if isinstance(value, PRIMITIVES) or isinstance(value, _Proxy):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(wrap(item, profiler) for item in value)
+    return _Proxy(value, profiler)
+
+
+class _Proxy(object):
+    '''Profile the method calls of a backend object.'''
+
+    __slots__ = ('_target', '_profiler', '_name')
+
+    def __init__(self, target, profiler, name=None):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_name', name or type(target).__name__)
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+        profiler = self._profiler
+        call = '{}.{}'.format(self._name, name)
+
+        def profiled(*args, **kwargs):
+            args = [unwrap(arg) for arg in args]
+            begin = perf_counter()
+            result = attribute(*args, **kwargs)
+            profiler.add(profiler.api, call, perf_counter() - begin)
+            return wrap(result, profiler)
+        return profiled
+
+    def __eq__(self, other):
+        return self._target == unwrap(other)
+
+    def __ne__(self, other):
+        return self._target != unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    # Containers such as cybw's Unitset and Playerset stay containers, with
+    # their items wrapped as they are handed out.
+
+    def __iter__(self):
+        profiler = self._profiler
+        return (wrap(item, profiler) for item in self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __contains__(self, item):
+        return unwrap(item) in self._target
+
+    def __bool__(self):
+        return bool(self._target)
+
+    def __int__(self):
+        return int(self._target)
+
+    def __index__(self):
+        return self._target.__index__()
+
+    def __repr__(self):
+        return repr(self._target)
+
+
+class ProfiledBackend(object):
+    '''A backend whose client and game are profiled proxies.
+
+    The enumerations and the Position constructor are the backend's own.
+    '''
+
+    def __init__(self, backend, profiler):
+        self.__backend = backend
+        self.BWAPIClient = _Proxy(backend.BWAPIClient, profiler, 'Client')
+        self.Broodwar = _Proxy(backend.Broodwar, profiler, 'Game')
+
+    def __getattr__(self, name):
+        return getattr(self.__backend, name)
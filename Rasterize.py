@@ -0,0 +1,151 @@
+'''Rasterize unit footprints into images at several resolutions.
+
+Units are drawn covering their actual footprint, taken from the dimensions
+of their unit type, or as a Gaussian blob sized by that footprint. Both are
+computed for all units at once:
+
+-Footprints are drawn by scattering the four corners of every unit's
+ rectangle into a difference image and integrating it with two cumulative
+ sums.
+-Gaussians are separable, so the image is the product of the per unit row
+ and column profiles, computed with a single matrix multiplication.
+
+A pyramid is a list of images of the same area where each level divides
+the area into cells of scale by scale pixels. A cell of a footprint image
+holds the sum of the values of every unit whose footprint overlaps it.
+'''
+
+import numpy as np
+
+KERNELS = ('footprint', 'gaussian')
+
+
+def rasterizeFootprints(offsets, extents, values, shape, scale=1):
+    '''Draw the rectangular footprints of units.
+
+    offsets: An (N, 2) array of unit centers relative to the image corner.
+
+    extents: An (N, 4) array of the distance from each center to the left,
+    top, right and bottom edges of the footprint.
+
+    values: An (N,) array of the value drawn for each unit.
+
+    shape: The height and width of the image in cells.
+
+    scale: The number of pixels along each side of a cell.
+    '''
+    height, width = shape
+    x, y = offsets[:, 0], offsets[:, 1]
+    left = np.floor_divide(x - extents[:, 0], scale)
+    top = np.floor_divide(y - extents[:, 1], scale)
+    right = np.floor_divide(x + extents[:, 2], scale)
+    bottom = np.floor_divide(y + extents[:, 3], scale)
+    visible = (right >= 0) & (left < width) & (bottom >= 0) & (top < height)
+
+    left = np.clip(left[visible], 0, width - 1).astype(np.intp)
+    top = np.clip(top[visible], 0, height - 1).astype(np.intp)
+    right = np.clip(right[visible], 0, width - 1).astype(np.intp) + 1
+    bottom = np.clip(bottom[visible], 0, height - 1).astype(np.intp) + 1
+    values = np.asarray(values, dtype=np.float64)[visible]
+
+    stride = width + 1
+    corners = np.concatenate([top * stride + left, top * stride + right,
+                              bottom * stride + left, bottom * stride + right])
+    weights = np.concatenate([values, -values, -values, values])
+    difference = np.bincount(corners, weights=weights,
+                             minlength=(height + 1) * stride)
+    image = difference.reshape((height + 1, stride)).cumsum(axis=0).cumsum(axis=1)
+    return image[:height, :width]
+
+
+def rasterizeDiscs(centers, radii, shape):
+    '''Count the discs covering each cell of an image.
+
+    centers: An (N, 2) array of the cells at the discs' centers as x and y.
+
+    radii: An (N,) array of the radii of the discs in cells. A cell is
+    covered when its distance from the center is at most the radius.
+
+    shape: The height and width of the image in cells.
+
+    Every disc is drawn as one span per row, scattered into a difference
+    image which is integrated along the rows.
+    '''
+    height, width = shape
+    centers = np.asarray(centers, dtype=np.int64).reshape((-1, 2))
+    radii = np.asarray(radii, dtype=np.int64).reshape(-1)
+    stride = width + 1
+    if len(radii) == 0:
+        return np.zeros(shape, dtype=np.int64)
+    dy = np.arange(-radii.max(), radii.max() + 1)
+    squared = radii[:, np.newaxis] ** 2 - dy[np.newaxis, :] ** 2
+    half = np.floor(np.sqrt(np.maximum(squared, 0))).astype(np.int64)
+    rows = centers[:, 1, np.newaxis] + dy[np.newaxis, :]
+    left = centers[:, 0, np.newaxis] - half
+    right = centers[:, 0, np.newaxis] + half + 1
+    keep = (squared >= 0) & (rows >= 0) & (rows < height) & (right > 0) & (left < width)
+    rows = rows[keep]
+    left = np.clip(left[keep], 0, width)
+    right = np.clip(right[keep], 0, width)
+    ones = np.ones(len(rows), dtype=np.int64)
+    difference = np.bincount(np.concatenate([rows * stride + left, rows * stride + right]),
+                             weights=np.concatenate([ones, -ones]), minlength=height * stride)
+    return difference.reshape((height, stride)).cumsum(axis=1)[:, :width].astype(np.int64)
+
+
+def rasterizeGaussians(offsets, sigmas, values, shape, scale=1):
+    '''Draw a Gaussian blob with a peak of the unit's value for each unit.
+
+    sigmas: An (N,) array of the standard deviation of each blob in pixels.
+    '''
+    height, width = shape
+    sigmas = np.maximum(np.asarray(sigmas, dtype=np.float64), scale / 2)
+    centers_x = (np.arange(width) + 0.5) * scale
+    centers_y = (np.arange(height) + 0.5) * scale
+    denominator = 2 * sigmas[:, np.newaxis] ** 2
+    columns = np.exp(-(centers_x - offsets[:, 0:1]) ** 2 / denominator)
+    rows = np.exp(-(centers_y - offsets[:, 1:2]) ** 2 / denominator)
+    columns *= np.asarray(values, dtype=np.float64)[:, np.newaxis]
+    return rows.T @ columns
+
+
+def getSigmas(extents):
+    '''Get a Gaussian standard deviation matching each unit's footprint.'''
+    return np.maximum(extents[:, 0] + extents[:, 2], extents[:, 1] + extents[:, 3]) / 4
+
+
+def getMargin(extents, kernel='footprint'):
+    '''Get how far outside an area units can be and still be drawn in it.'''
+    if len(extents) == 0:
+        return 0
+    if kernel == 'gaussian':
+        return int(np.ceil(3 * getSigmas(extents).max()))
+    return int(extents.max())
+
+
+def rasterizePyramid(offsets, extents, values, width, height, scales=(1, 4, 16),
+                     kernel='footprint', dtype=np.float32):
+    '''Draw units at several resolutions.
+
+    width, height: The size of the area in pixels.
+
+    scales: The cell size in pixels of each level of the pyramid.
+
+    kernel: Either 'footprint' or 'gaussian'.
+
+    Returns a list with an image of shape (H/scale, W/scale) for each scale.
+    '''
+    offsets = np.asarray(offsets, dtype=np.float64).reshape((-1, 2))
+    if kernel == 'footprint':
+        draw = lambda shape, scale: rasterizeFootprints(offsets, extents, values, shape, scale)
+    elif kernel == 'gaussian':
+        sigmas = getSigmas(extents)
+        draw = lambda shape, scale: rasterizeGaussians(offsets, sigmas, values, shape, scale)
+    else:
+        raise ValueError('Unknown kernel: {}'.format(kernel))
+
+    pyramid = []
+    for scale in scales:
+        shape = (-(-int(height) // scale), -(-int(width) // scale))
+        pyramid.append(draw(shape, scale).astype(dtype, copy=False))
+    return pyramid
@@ -0,0 +1,120 @@
+'''A uniform grid over the map used to answer spatial queries on units.
+
+The map's pixel space is divided into square cells and the rows of a
+UnitSnapshot are bucketed by the cell containing their position. Rows are
+stored sorted by cell in row-major order, so every horizontal run of cells
+is a single contiguous slice. Rectangle, radius and nearest-neighbour
+queries only look at the units in the cells they overlap rather than at
+every unit on the map.
+
+All queries return row indices into the snapshot the grid was built from.
+'''
+
+import numpy as np
+
+CELL_SIZE = 128
+
+
+class UnitGrid(object):
+    '''Bucket the units of a snapshot into a uniform grid.
+
+    snapshot: The UnitSnapshot to index.
+
+    map_size: The width and height of the map in pixels.
+
+    cell_size: The width and height of a cell in pixels.
+    '''
+
+    def __init__(self, snapshot, map_size, cell_size=CELL_SIZE):
+        width, height = map_size
+        self.cell_size = cell_size
+        self.columns = max(1, -(-int(width) // cell_size))
+        self.rows = max(1, -(-int(height) // cell_size))
+        self.positions = snapshot.positions
+
+        cell_x, cell_y = self.__cellOf(self.positions[:, 0], self.positions[:, 1])
+        cells = cell_y * self.columns + cell_x
+        self.order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self.rows * self.columns)
+        self.starts = np.zeros(len(counts) + 1, dtype=np.intp)
+        np.cumsum(counts, out=self.starts[1:])
+
+    @classmethod
+    def fromSnapshot(cls, snapshot, map_size, cell_size=CELL_SIZE):
+        '''Get the grid of a snapshot, building it once per snapshot.'''
+        key = ('grid', tuple(int(s) for s in map_size), cell_size)
+        return snapshot.memoize(key, lambda: cls(snapshot, map_size, cell_size))
+
+    def __cellOf(self, x, y):
+        cell_x = np.clip(np.floor_divide(x, self.cell_size), 0, self.columns - 1)
+        cell_y = np.clip(np.floor_divide(y, self.cell_size), 0, self.rows - 1)
+        return cell_x.astype(np.intp), cell_y.astype(np.intp)
+
+    def __candidates(self, left, top, right, bottom):
+        '''Get the rows of all units in cells overlapping a rectangle.'''
+        (x0, x1), (y0, y1) = self.__cellOf(np.array([left, right]),
+                                           np.array([top, bottom]))
+        slices = [self.order[self.starts[y * self.columns + x0]:
+                             self.starts[y * self.columns + x1 + 1]]
+                  for y in range(y0, y1 + 1)]
+        if len(slices) == 1:
+            return slices[0]
+        return np.concatenate(slices)
+
+    def rect(self, position, width, height, mask=None):
+        '''Get the rows of units strictly inside a rectangle.
+
+        position: The top left corner of the rectangle.
+
+        mask: A boolean array over the snapshot rows. Only rows which are
+        True are returned.
+        '''
+        left, top = position
+        candidates = self.__candidates(left, top, left + width, top + height)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        difference = self.positions[candidates] - np.asarray(position)
+        inside = np.all((difference > 0) & (difference < (width, height)), axis=1)
+        return np.sort(candidates[inside])
+
+    def radius(self, position, radius, mask=None):
+        '''Get the rows of units within a distance of a position.
+
+        Rows are returned in snapshot order.
+        '''
+        candidates, _ = self.__withinRadius(position, radius, mask)
+        return np.sort(candidates)
+
+    def __withinRadius(self, position, radius, mask):
+        x, y = position
+        candidates = self.__candidates(x - radius, y - radius, x + radius, y + radius)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+        distances = np.hypot(*(self.positions[candidates] - np.asarray(position)).T)
+        within = distances <= radius
+        return candidates[within], distances[within]
+
+    def nearest(self, position, k, mask=None):
+        '''Get the rows of the k units closest to a position.
+
+        Rows are returned ordered by increasing distance. Fewer than k rows
+        are returned if there are not enough units.
+        '''
+        if k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        x, y = position
+        width, height = self.columns * self.cell_size, self.rows * self.cell_size
+        # Every unit is within the distance to the farthest corner of the
+        # map, which also holds for positions outside of the map.
+        farthest = np.hypot(max(abs(x), abs(x - width)), max(abs(y), abs(y - height)))
+        search = float(self.cell_size)
+        while True:
+            candidates, distances = self.__withinRadius(position, search, mask)
+            if len(candidates) >= k or search >= farthest:
+                break
+            search *= 2
+        if len(candidates) > k:
+            closest = np.argpartition(distances, k - 1)[:k]
+            candidates, distances = candidates[closest], distances[closest]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order]
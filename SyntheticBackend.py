@@ -0,0 +1,701 @@
+'''A deterministic stand-in for cybw which simulates Broodwar with NumPy.
+
+The synthetic backend implements the parts of the BWAPI client and game that
+BroodwarInterface uses so that the interface can be tested and benchmarked
+on machines without StarCraft. It is not a faithful simulation of Broodwar.
+Units move in straight lines, acquire the closest enemy within sight range
+and fire at it when it is within weapon range. Every match of a backend
+created with the same arguments plays out identically.
+
+The state of all units is kept in NumPy arrays and every frame is simulated
+with vectorized operations, so matches with thousands of units are cheap.
+The unit, player and event objects handed out are thin views onto that
+state.
+
+    backend = SyntheticBackend(spawns=[(0, 'Terran_Marine', 20),
+                                       (1, 'Zerg_Zergling', 30)])
+    interface = BroodwarInterface(backend=backend)
+    interface.connect()
+'''
+
+import hashlib
+import zlib
+
+import numpy as np
+from types import SimpleNamespace
+
+from BroodwarInterface.Rasterize import rasterizeDiscs
+
+SELF_ID = 0
+
+EventType = SimpleNamespace(MatchStart=0, MatchEnd=1, MatchFrame=2,
+                            MenuFrame=3, SendText=4, ReceiveText=5,
+                            PlayerLeft=6, NukeDetect=7, UnitDiscover=8,
+                            UnitEvade=9, UnitShow=10, UnitHide=11,
+                            UnitCreate=12, UnitDestroy=13, UnitMorph=14,
+                            UnitRenegade=15, SaveGame=16, UnitComplete=17,
+                            none=18)
+
+Flag = SimpleNamespace(CompleteMapInformation=0, UserInput=1)
+
+
+class Position(object):
+    '''A position in pixels.'''
+
+    def __init__(self, x, y):
+        self.x = int(x)
+        self.y = int(y)
+
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Position({}, {})'.format(self.x, self.y)
+
+
+class WeaponType(object):
+    '''The weapon of a unit type.'''
+
+    def __init__(self, damage, cooldown, max_range):
+        self.__damage = damage
+        self.__cooldown = cooldown
+        self.__max_range = max_range
+
+    def damageAmount(self):
+        return self.__damage
+
+    def damageCooldown(self):
+        return self.__cooldown
+
+    def maxRange(self):
+        return self.__max_range
+
+
+class UnitType(object):
+    '''A unit type with the statistics used by the simulation.'''
+
+    def __init__(self, type_id, name, hit_points, shields, dimensions,
+                 speed, weapon, sight):
+        self.__id = type_id
+        self.__name = name
+        self.__hit_points = hit_points
+        self.__shields = shields
+        self.__dimensions = dimensions
+        self.__speed = speed
+        self.__weapon = weapon
+        self.__sight = sight
+
+    def getID(self):
+        return self.__id
+
+    def getName(self):
+        return self.__name
+
+    def maxHitPoints(self):
+        return self.__hit_points
+
+    def maxShields(self):
+        return self.__shields
+
+    def dimensionLeft(self):
+        return self.__dimensions[0]
+
+    def dimensionUp(self):
+        return self.__dimensions[1]
+
+    def dimensionRight(self):
+        return self.__dimensions[2]
+
+    def dimensionDown(self):
+        return self.__dimensions[3]
+
+    def width(self):
+        return self.__dimensions[0] + self.__dimensions[2] + 1
+
+    def height(self):
+        return self.__dimensions[1] + self.__dimensions[3] + 1
+
+    def topSpeed(self):
+        return self.__speed
+
+    def groundWeapon(self):
+        return self.__weapon
+
+    def airWeapon(self):
+        return WeaponType(0, 0, 0)
+
+    def sightRange(self):
+        return self.__sight
+
+    def isFlyer(self):
+        return False
+
+    def __eq__(self, other):
+        return isinstance(other, UnitType) and other.getID() == self.__id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.__id)
+
+    def __repr__(self):
+        return self.__name
+
+
+UnitTypes = SimpleNamespace(
+    Terran_Marine=UnitType(0, 'Terran_Marine', 40, 0, (8, 9, 8, 10), 4.0,
+                           WeaponType(6, 15, 128), 224),
+    Zerg_Zergling=UnitType(37, 'Zerg_Zergling', 35, 0, (8, 4, 7, 11), 5.49,
+                           WeaponType(5, 8, 15), 160),
+    Protoss_Zealot=UnitType(65, 'Protoss_Zealot', 100, 60, (11, 5, 11, 13), 4.0,
+                            WeaponType(16, 22, 15), 224),
+    Special_Map_Revealer=UnitType(101, 'Special_Map_Revealer', 800, 0,
+                                  (13, 13, 13, 13), 0.0, WeaponType(0, 0, 0), 320))
+
+UNIT_TYPES = {t.getID(): t for t in vars(UnitTypes).values()}
+
+
+class TechType(object):
+
+    def __init__(self, tech_id, name):
+        self.__id = tech_id
+        self.__name = name
+
+    def getID(self):
+        return self.__id
+
+    def __eq__(self, other):
+        return isinstance(other, TechType) and other.getID() == self.__id
+
+    def __hash__(self):
+        return hash(self.__id)
+
+    def __repr__(self):
+        return self.__name
+
+
+TechTypes = SimpleNamespace(Stim_Packs=TechType(0, 'Stim_Packs'))
+
+
+class Order(TechType):
+    pass
+
+
+Orders = SimpleNamespace(Stop=Order(1, 'Stop'), PlayerGuard=Order(3, 'PlayerGuard'),
+                         Move=Order(6, 'Move'), AttackMove=Order(14, 'AttackMove'))
+
+STIM_FRAMES = 240
+STIM_COST = 10
+STIM_SPEED = 1.5
+
+IDLE, MOVE, ATTACK_MOVE = 0, 1, 2
+ORDERS = {IDLE: Orders.PlayerGuard, MOVE: Orders.Move, ATTACK_MOVE: Orders.AttackMove}
+
+DEFAULT_SPAWNS = ((SELF_ID, 'Terran_Marine', 20), (1, 'Zerg_Zergling', 30),
+                  (SELF_ID, 'Special_Map_Revealer', 1))
+
+
+class Player(object):
+
+    def __init__(self, player_id):
+        self.__id = player_id
+
+    def getID(self):
+        return self.__id
+
+    def getName(self):
+        return 'Player {}'.format(self.__id)
+
+    def __eq__(self, other):
+        return isinstance(other, Player) and other.getID() == self.__id
+
+    def __hash__(self):
+        return hash(self.__id)
+
+
+class Event(object):
+
+    def __init__(self, event_type, unit=None):
+        self.__type = event_type
+        self.__unit = unit
+
+    def getType(self):
+        return self.__type
+
+    def getUnit(self):
+        return self.__unit
+
+
+class Unit(object):
+    '''A view onto one row of the simulated unit state.'''
+
+    def __init__(self, game, row):
+        self.__game = game
+        self.__row = row
+
+    def getID(self):
+        return int(self.__game.state['id'][self.__row])
+
+    def getPlayer(self):
+        return self.__game.getPlayer(self.__game.state['player'][self.__row])
+
+    def getType(self):
+        return UNIT_TYPES[self.__game.state['type'][self.__row]]
+
+    def getPosition(self):
+        state = self.__game.state
+        return Position(state['x'][self.__row], state['y'][self.__row])
+
+    def getHitPoints(self):
+        return int(np.ceil(self.__game.state['hp'][self.__row]))
+
+    def getShields(self):
+        return int(np.ceil(self.__game.state['shields'][self.__row]))
+
+    def exists(self):
+        return bool(self.__game.state['alive'][self.__row])
+
+    def getOrder(self):
+        return ORDERS[self.__game.state['order'][self.__row]]
+
+    def getOrderTargetPosition(self):
+        state = self.__game.state
+        if state['order'][self.__row] == IDLE:
+            return Position(0, 0)
+        return Position(state['target_x'][self.__row], state['target_y'][self.__row])
+
+    def isStimmed(self):
+        return bool(self.__game.state['stim'][self.__row] > 0)
+
+    def attack(self, position):
+        return self.__game.order(self.__row, ATTACK_MOVE, position)
+
+    def move(self, position):
+        return self.__game.order(self.__row, MOVE, position)
+
+    def useTech(self, tech):
+        return self.__game.stim(self.__row, tech)
+
+
+class Client(object):
+    '''The BWAPI client, which steps the game on each update.'''
+
+    def __init__(self, game):
+        self.__game = game
+        self.__connected = False
+
+    def connect(self):
+        self.__connected = True
+        return True
+
+    def isConnected(self):
+        return self.__connected
+
+    def update(self):
+        if self.__connected:
+            self.__game.step()
+
+
+class Game(object):
+    '''The simulated Broodwar game.
+
+    spawns: A list of (player ID, unit type name, count) triples. Player 0 is
+    the player controlled through the interface and every other player is
+    its enemy.
+
+    map_size: The width and height of the map in tiles.
+
+    seed: The seed of the random spawn positions. Each match uses the seed
+    plus the number of matches played before it.
+
+    max_frames: End a match after this many frames if it has not ended.
+
+    enemy_attack: Whether enemy units attack move towards the player's
+    units at the start of a match.
+    '''
+
+    def __init__(self, spawns, map_size, seed, max_frames, enemy_attack):
+        self.spawns = spawns
+        self.map_size = map_size
+        self.seed = seed
+        self.max_frames = max_frames
+        self.enemy_attack = enemy_attack
+        self.map_name = ''
+        self.flags = set()
+        self.local_speed = None
+        self.frame_skip = None
+        self.screen_position = Position(0, 0)
+        self.matches = 0
+        self.in_game = False
+        self.frame = 0
+        self.__players = {}
+        self.__events = []
+        self.__pending = [EventType.MatchStart]
+        self.__units = []
+        self.__all_units = None
+        self.terrain_queries = 0
+        self.visibility_queries = 0
+        self.__vision = None
+        self.__createTerrain()
+        self.state = self.__spawn(np.random.RandomState(seed), [])
+
+    def __createTerrain(self):
+        '''Create the static terrain of the current map.
+
+        The terrain depends only on the map name and size. A band across the
+        middle of the map is high ground and a few square patches of tiles
+        are unwalkable. Creep covers a disc around the second start location.
+        '''
+        width, height = self.map_size
+        random = np.random.RandomState(zlib.crc32(self.map_name.encode()))
+        self.ground_height = np.zeros((height, width), dtype=np.uint8)
+        self.ground_height[height // 3:2 * height // 3] = 2
+        blocked = np.zeros((height, width), dtype=bool)
+        for _ in range(max(1, width * height // 256)):
+            x, y = random.randint(0, width - 2), random.randint(0, height - 2)
+            blocked[y:y + 2, x:x + 2] = True
+        self.walkable = np.repeat(np.repeat(~blocked, 4, axis=0), 4, axis=1)
+        self.buildable = ~blocked
+        self.start_locations = [Position(4, 4), Position(width - 8, height - 8)]
+        self.creep = rasterizeDiscs([(width - 8, height - 8)], [6], (height, width)) > 0
+
+    def getPlayer(self, player_id):
+        player_id = int(player_id)
+        if player_id not in self.__players:
+            self.__players[player_id] = Player(player_id)
+        return self.__players[player_id]
+
+    def __spawn(self, random, spawns):
+        '''Create the state of every unit in a new match.'''
+        width, height = self.map_size[0] * 32, self.map_size[1] * 32
+        counts = [count for _, _, count in spawns]
+        size = sum(counts)
+        state = {
+            'id': np.arange(size, dtype=np.int64),
+            'player': np.repeat([p for p, _, _ in spawns], counts).astype(np.int64),
+            'type': np.repeat([getattr(UnitTypes, t).getID() for _, t, _ in spawns],
+                              counts).astype(np.int64),
+            'alive': np.ones(size, dtype=np.bool_),
+            'order': np.full(size, IDLE, dtype=np.int64),
+            'target_x': np.zeros(size),
+            'target_y': np.zeros(size),
+            'cooldown': np.zeros(size, dtype=np.int64),
+            'stim': np.zeros(size, dtype=np.int64),
+        }
+        types = [UNIT_TYPES[t] for t in state['type']]
+        state['hp'] = np.array([t.maxHitPoints() for t in types], dtype=np.float64)
+        state['shields'] = np.array([t.maxShields() for t in types], dtype=np.float64)
+        state['speed'] = np.array([t.topSpeed() for t in types], dtype=np.float64)
+        state['damage'] = np.array([t.groundWeapon().damageAmount() for t in types], dtype=np.float64)
+        state['weapon_cooldown'] = np.array([t.groundWeapon().damageCooldown() for t in types], dtype=np.int64)
+        state['range'] = np.array([t.groundWeapon().maxRange() for t in types], dtype=np.float64)
+        state['sight'] = np.array([t.sightRange() for t in types], dtype=np.float64)
+        state['targetable'] = state['type'] != UnitTypes.Special_Map_Revealer.getID()
+
+        # Each player's units are spread around a point on the line
+        # through the middle of the map.
+        players = sorted(set(state['player'].tolist()))
+        centers = {p: ((i + 1) * width / (len(players) + 1), height / 2)
+                   for i, p in enumerate(players)}
+        spread = np.sqrt(np.maximum(size, 1)) * 16
+        state['x'] = np.zeros(size)
+        state['y'] = np.zeros(size)
+        for player in players:
+            rows = state['player'] == player
+            count = np.count_nonzero(rows)
+            state['x'][rows] = centers[player][0] + random.uniform(-spread, spread, count) / 2
+            state['y'][rows] = centers[player][1] + random.uniform(-spread, spread, count)
+        state['x'] = np.clip(np.round(state['x']), 0, width - 1)
+        state['y'] = np.clip(np.round(state['y']), 0, height - 1)
+
+        if self.enemy_attack and SELF_ID in centers:
+            enemies = (state['player'] != SELF_ID) & (state['range'] > 0)
+            state['order'][enemies] = ATTACK_MOVE
+            state['target_x'][enemies] = centers[SELF_ID][0]
+            state['target_y'][enemies] = centers[SELF_ID][1]
+        return state
+
+    def __startMatch(self):
+        self.state = self.__spawn(np.random.RandomState(self.seed + self.matches), self.spawns)
+        self.matches += 1
+        self.frame = 0
+        self.in_game = True
+        self.__units = [Unit(self, row) for row in range(len(self.state['id']))]
+        self.__events.append(Event(EventType.MatchStart))
+
+    def __endMatch(self):
+        self.in_game = False
+        self.__events.append(Event(EventType.MatchEnd))
+
+    def step(self):
+        '''Simulate one frame.'''
+        self.__events = []
+        self.__all_units = None
+        self.__vision = None
+        pending, self.__pending = self.__pending, []
+        if EventType.MatchEnd in pending and self.in_game:
+            self.__endMatch()
+        if EventType.MatchStart in pending:
+            if EventType.MatchEnd in pending:
+                self.__pending.append(EventType.MatchStart)
+            else:
+                self.__startMatch()
+            return
+        if not self.in_game:
+            return
+
+        self.frame += 1
+        self.__simulate()
+        state = self.state
+        players = set(state['player'][state['alive'] & state['targetable']].tolist())
+        if len(players) <= 1 or (self.max_frames is not None and self.frame >= self.max_frames):
+            self.__endMatch()
+
+    def __simulate(self):
+        state = self.state
+        alive = state['alive']
+        state['cooldown'] = np.maximum(state['cooldown'] - 1, 0)
+        state['stim'] = np.maximum(state['stim'] - 1, 0)
+
+        target, distance = self.__acquireTargets()
+        has_target = target >= 0
+        in_range = has_target & (distance <= state['range'] + 16)
+        chasing = has_target & ~in_range & (state['order'] != MOVE)
+
+        goal_x = np.where(chasing, state['x'][np.maximum(target, 0)], state['target_x'])
+        goal_y = np.where(chasing, state['y'][np.maximum(target, 0)], state['target_y'])
+        moving = alive & (chasing | ((state['order'] != IDLE) & ~(in_range & (state['order'] == ATTACK_MOVE))))
+        self.__move(moving, goal_x, goal_y)
+
+        firing = alive & in_range & (state['order'] != MOVE) & (state['cooldown'] == 0)
+        firing = np.flatnonzero(firing)
+        state['cooldown'][firing] = np.where(state['stim'][firing] > 0,
+                                             state['weapon_cooldown'][firing] // 2,
+                                             state['weapon_cooldown'][firing])
+        damage = np.bincount(target[firing], weights=state['damage'][firing],
+                             minlength=len(alive))
+        absorbed = np.minimum(damage, state['shields'])
+        state['shields'] -= absorbed
+        state['hp'] -= damage - absorbed
+
+        killed = np.flatnonzero(alive & (state['hp'] <= 0))
+        state['hp'][killed] = 0
+        alive[killed] = False
+        for row in killed:
+            self.__events.append(Event(EventType.UnitDestroy, self.__units[row]))
+
+    def __move(self, moving, goal_x, goal_y):
+        state = self.state
+        speed = state['speed'] * np.where(state['stim'] > 0, STIM_SPEED, 1.0)
+        dx = goal_x - state['x']
+        dy = goal_y - state['y']
+        length = np.hypot(dx, dy)
+        arrived = moving & (length <= speed)
+        step = np.where(length > 0, np.minimum(speed, length) / np.maximum(length, 1e-9), 0)
+        state['x'] = np.where(moving, np.round(state['x'] + dx * step), state['x'])
+        state['y'] = np.where(moving, np.round(state['y'] + dy * step), state['y'])
+        state['order'][arrived & (state['order'] == MOVE)] = IDLE
+        state['order'][arrived & (state['order'] == ATTACK_MOVE)] = IDLE
+
+    def __acquireTargets(self, candidates_per_cell=8):
+        '''Find the closest visible enemy of every unit.
+
+        Enemies are bucketed into a grid with cells as large as the longest
+        sight range and each unit checks a fixed number of enemies in the
+        nine cells around it, so the search is linear in the number of units.
+
+        Returns the row of each unit's target, -1 if it has none, and the
+        distance to it.
+        '''
+        state = self.state
+        size = len(state['alive'])
+        target = np.full(size, -1, dtype=np.int64)
+        best = np.full(size, np.inf)
+        if size == 0:
+            return target, best
+        cell_size = max(state['sight'].max(), 1.0)
+        columns = int(self.map_size[0] * 32 // cell_size) + 3
+        cell_x = (state['x'] // cell_size).astype(np.int64) + 1
+        cell_y = (state['y'] // cell_size).astype(np.int64) + 1
+        cells = cell_y * columns + cell_x
+        number_of_cells = (int(self.map_size[1] * 32 // cell_size) + 3) * columns
+
+        attackers_all = state['alive'] & (state['damage'] > 0)
+        for player in np.unique(state['player'][attackers_all]):
+            attackers = np.flatnonzero(attackers_all & (state['player'] == player))
+            enemies = np.flatnonzero(state['alive'] & state['targetable'] & (state['player'] != player))
+            if len(enemies) == 0:
+                continue
+            order = enemies[np.argsort(cells[enemies], kind='stable')]
+            starts = np.zeros(number_of_cells + 1, dtype=np.int64)
+            np.cumsum(np.bincount(cells[enemies], minlength=number_of_cells), out=starts[1:])
+
+            offsets = np.array([dy * columns + dx for dy in (-1, 0, 1) for dx in (-1, 0, 1)])
+            neighbours = cells[attackers][:, np.newaxis] + offsets
+            slots = starts[neighbours][:, :, np.newaxis] + np.arange(candidates_per_cell)
+            valid = slots < starts[neighbours + 1][:, :, np.newaxis]
+            slots = slots.reshape((len(attackers), -1))
+            valid = valid.reshape((len(attackers), -1))
+            candidates = order[np.minimum(slots, len(order) - 1)]
+
+            distance = np.hypot(state['x'][candidates] - state['x'][attackers, np.newaxis],
+                                state['y'][candidates] - state['y'][attackers, np.newaxis])
+            distance[~valid] = np.inf
+            distance[distance > state['sight'][attackers, np.newaxis]] = np.inf
+            closest = np.argmin(distance, axis=1)
+            closest_distance = distance[np.arange(len(attackers)), closest]
+            found = np.isfinite(closest_distance)
+            target[attackers[found]] = candidates[np.arange(len(attackers)), closest][found]
+            best[attackers[found]] = closest_distance[found]
+        return target, best
+
+    def order(self, row, order, position):
+        if not self.state['alive'][row]:
+            return False
+        self.state['order'][row] = order
+        self.state['target_x'][row] = position.x
+        self.state['target_y'][row] = position.y
+        return True
+
+    def stim(self, row, tech):
+        state = self.state
+        if tech != TechTypes.Stim_Packs or not state['alive'][row]:
+            return False
+        if state['type'][row] != UnitTypes.Terran_Marine.getID() or state['hp'][row] <= STIM_COST:
+            return False
+        state['hp'][row] -= STIM_COST
+        state['stim'][row] = STIM_FRAMES
+        return True
+
+    def __getVision(self):
+        '''Get the tiles seen by the player's units in the current frame.
+
+        Each unit sees the tiles within its sight range of its own tile,
+        regardless of the terrain.
+        '''
+        if self.__vision is None:
+            state = self.state
+            width, height = self.map_size
+            rows = np.flatnonzero(state['alive'] & (state['player'] == SELF_ID))
+            centers = np.stack([np.clip(state['x'][rows] // 32, 0, width - 1),
+                                np.clip(state['y'][rows] // 32, 0, height - 1)], axis=1)
+            radii = state['sight'][rows] // 32
+            self.__vision = rasterizeDiscs(centers, radii, (height, width)) > 0
+        return self.__vision
+
+    # The methods below mirror BWAPI's Game class.
+
+    def getAllUnits(self):
+        if self.__all_units is None:
+            self.__all_units = [self.__units[row] for row in np.flatnonzero(self.state['alive'])]
+        return self.__all_units
+
+    def getUnit(self, unit_id):
+        if 0 <= unit_id < len(self.__units):
+            return self.__units[unit_id]
+        return None
+
+    def getEvents(self):
+        return list(self.__events)
+
+    def self(self):
+        return self.getPlayer(SELF_ID)
+
+    def enemies(self):
+        players = sorted(set(p for p, _, _ in self.spawns) - {SELF_ID})
+        return [self.getPlayer(p) for p in players]
+
+    def isInGame(self):
+        return self.in_game
+
+    def getFrameCount(self):
+        return self.frame
+
+    def enableFlag(self, flag):
+        self.flags.add(flag)
+
+    def setLocalSpeed(self, speed):
+        self.local_speed = speed
+
+    def setFrameSkip(self, frame_skip):
+        self.frame_skip = frame_skip
+
+    def setScreenPosition(self, position):
+        self.screen_position = position
+
+    def setMap(self, map_name):
+        if isinstance(map_name, bytes):
+            map_name = map_name.decode()
+        self.map_name = map_name
+        self.__createTerrain()
+        return True
+
+    def mapPathName(self):
+        return self.map_name
+
+    def mapHash(self):
+        name = '{}:{}x{}'.format(self.map_name, *self.map_size)
+        return hashlib.sha1(name.encode()).hexdigest()
+
+    def mapFileName(self):
+        return self.map_name.replace('\\', '/').split('/')[-1]
+
+    def mapWidth(self):
+        return self.map_size[0]
+
+    def mapHeight(self):
+        return self.map_size[1]
+
+    def isWalkable(self, walk_x, walk_y):
+        self.terrain_queries += 1
+        return bool(self.walkable[walk_y, walk_x])
+
+    def isBuildable(self, tile_x, tile_y, include_buildings=False):
+        self.terrain_queries += 1
+        return bool(self.buildable[tile_y, tile_x])
+
+    def getGroundHeight(self, tile_x, tile_y):
+        self.terrain_queries += 1
+        return int(self.ground_height[tile_y, tile_x])
+
+    def isVisible(self, tile_x, tile_y):
+        self.visibility_queries += 1
+        return bool(self.__getVision()[tile_y, tile_x])
+
+    def hasCreep(self, tile_x, tile_y):
+        self.visibility_queries += 1
+        return bool(self.creep[tile_y, tile_x])
+
+    def getStartLocations(self):
+        return list(self.start_locations)
+
+    def restartGame(self):
+        if self.in_game:
+            self.__pending.append(EventType.MatchEnd)
+        self.__pending.append(EventType.MatchStart)
+
+    def leaveGame(self):
+        if self.in_game:
+            self.__pending.append(EventType.MatchEnd)
+
+
+class SyntheticBackend(object):
+    '''A backend which simulates Broodwar in process.
+
+    See Game for the arguments.
+    '''
+
+    EventType = EventType
+    Flag = Flag
+    UnitTypes = UnitTypes
+    TechTypes = TechTypes
+    Orders = Orders
+    Position = Position
+
+    def __init__(self, spawns=DEFAULT_SPAWNS, map_size=(64, 64), seed=0, max_frames=None, enemy_attack=True):
+        self.Broodwar = Game(list(spawns), map_size, seed, max_frames, enemy_attack)
+        self.BWAPIClient = Client(self.Broodwar)
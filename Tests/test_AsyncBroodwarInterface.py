@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from BroodwarInterface import AsyncBroodwarInterface, SyntheticBackend
+from BroodwarInterface.SyntheticBackend import EventType
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestAsyncBroodwarInterface(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = SyntheticBackend(enemy_attack=False)
+        self.game = AsyncBroodwarInterface(backend=self.backend)
+
+    def tearDown(self):
+        self.game.close()
+
+    def test_connect_and_step(self):
+        async def play():
+            await self.game.connect()
+            frame = self.game.frame
+            events = await self.game.step(3)
+            return frame, events
+        frame, events = run(play())
+        self.assertTrue(self.game.interface.isInGame())
+        self.assertEqual(self.game.frame, frame + 3)
+        self.assertEqual(events, self.game.interface.events)
+
+    def test_connect_timeout(self):
+        self.backend.BWAPIClient.connect = lambda: False
+        with self.assertRaises(asyncio.TimeoutError):
+            run(self.game.connect(timeout=0.1))
+        # The thread is free again after the interrupted connect.
+        self.assertEqual(run(self.game.call(lambda: 1, timeout=1)), 1)
+
+    def test_restart_timeout(self):
+        async def play():
+            await self.game.connect()
+            self.backend.Broodwar.restartGame = lambda: None
+            await self.game.restart(timeout=0.1)
+        with self.assertRaises(asyncio.TimeoutError):
+            run(play())
+
+    def test_restart(self):
+        async def play():
+            await self.game.connect()
+            await self.game.step(5)
+            await self.game.restart(timeout=5)
+        run(play())
+        self.assertEqual(self.backend.Broodwar.matches, 2)
+        self.assertTrue(self.game.interface.isInGame())
+
+    def test_cancel(self):
+        self.backend.BWAPIClient.connect = lambda: False
+        async def play():
+            task = asyncio.ensure_future(self.game.connect())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return await self.game.call(lambda: 2)
+        self.assertEqual(run(play()), 2)
+
+    def test_events_follow_steps(self):
+        async def play():
+            await self.game.connect()
+            await self.game.call(self.game.interface.restart)
+            received = []
+            async def consume():
+                async for event in self.game.events():
+                    received.append(event.getType())
+                    if event.getType() == EventType.MatchStart:
+                        return
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.sleep(0)
+            while not consumer.done():
+                await self.game.step()
+            return received
+        self.assertEqual(run(play()), [EventType.MatchEnd, EventType.MatchStart])
+
+    def test_events_step(self):
+        async def play():
+            await self.game.connect()
+            await self.game.call(self.game.interface.restart)
+            async for event in self.game.events(event_types=[EventType.MatchStart], step=True):
+                return event.getType()
+        self.assertEqual(run(play()), EventType.MatchStart)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.BroodwarEnvPool import BroodwarEnvPool
+from BroodwarInterface.BroodwarInterface import MOVE
+
+
+def create_interface():
+    spawns = [(0, 'Terran_Marine', 4), (1, 'Zerg_Zergling', 4)]
+    return BroodwarInterface(backend=SyntheticBackend(spawns=spawns, max_frames=10,
+                                                      enemy_attack=False))
+
+
+def observe_frame(interface):
+    return np.array([interface.event_stream.frame])
+
+
+def failing_interface():
+    raise ValueError('No game.')
+
+
+class TestBroodwarEnvPool(unittest.TestCase):
+
+    def create_pool(self, number_of_envs=3, **kwargs):
+        pool = BroodwarEnvPool(create_interface, number_of_envs, observe_frame,
+                               context='fork', **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_reset_and_step(self):
+        pool = self.create_pool(frames_per_step=2)
+        observations = pool.reset()
+        self.assertEqual(observations.shape, (3, 1))
+        stepped, dones = pool.step([None] * 3)
+        np.testing.assert_array_equal(stepped, observations + 2)
+        np.testing.assert_array_equal(dones, [False] * 3)
+
+    def test_auto_reset(self):
+        pool = self.create_pool(frames_per_step=4)
+        pool.reset()
+        dones = np.zeros(3, dtype=bool)
+        for _ in range(3):
+            _, dones = pool.step([None] * 3)
+        self.assertTrue(dones.all())
+        # The next step starts the new match without waiting on a restart.
+        _, dones = pool.step([None] * 3)
+        self.assertFalse(dones.any())
+        self.assertEqual(pool.call('isInGame'), [True] * 3)
+
+    def test_actions(self):
+        pool = self.create_pool(number_of_envs=2)
+        pool.reset()
+        unit_ids = pool.call('getUnitIDs', players=[0])
+        actions = [(ids, [MOVE] * len(ids), [[0, 0]] * len(ids)) for ids in unit_ids]
+        observations, dones = pool.step(actions)
+        self.assertEqual(observations.shape, (2, 1))
+        self.assertEqual(pool.call('getUnitIDs', players=[0]), unit_ids)
+
+    def test_wrong_number_of_actions(self):
+        pool = self.create_pool(number_of_envs=2)
+        with self.assertRaises(ValueError):
+            pool.step([None])
+
+    def test_worker_failure(self):
+        with self.assertRaises(RuntimeError):
+            BroodwarEnvPool(failing_interface, 2, observe_frame, context='fork')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,251 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, UnitFilter, SyntheticBackend
+from BroodwarInterface.BroodwarInterface import ATTACK, MOVE, STIM, COMMAND_ISSUED, COMMAND_SKIPPED, COMMAND_FAILED
+
+
+def create_interface(incremental=False, **kwargs):
+    interface = BroodwarInterface(incremental=incremental, backend=SyntheticBackend(**kwargs))
+    interface.connect()
+    return interface
+
+
+class TestBroodwarInterfaceSynthetic(unittest.TestCase):
+
+    def test_connect(self):
+        interface = create_interface()
+        self.assertTrue(interface.isInGame())
+        self.assertEqual(interface.getSelfID(), 0)
+        self.assertEqual(interface.getEnemiesID(), [1])
+
+    def test_special_units_excluded(self):
+        interface = create_interface()
+        self.assertEqual(len(interface.getUnitIDs()), 50)
+        self.assertEqual(len(interface.getUnitIDs(players=[0])), 20)
+
+    def test_getters_agree_with_units(self):
+        interface = create_interface()
+        units = interface.getUnits(players=[1])
+        self.assertEqual(interface.getUnitIDs(players=[1]), [u.getID() for u in units])
+        self.assertEqual(interface.getHealth(players=[1]), [u.getHitPoints() for u in units])
+        positions = [[u.getPosition().x, u.getPosition().y] for u in units]
+        self.assertEqual(np.array(interface.getPositions(players=[1])).tolist(), positions)
+        self.assertTrue(all(interface.is_visible(players=[1])))
+
+    def test_unit_filter(self):
+        interface = create_interface()
+        ids = interface.getUnitIDs(players=[0])[:5]
+        unit_filter = ~UnitFilter(units=ids)
+        self.assertEqual(interface.getUnitIDs(players=[0], unit_filter=unit_filter),
+                         interface.getUnitIDs(players=[0])[5:])
+
+    def test_results_are_memoized_per_frame(self):
+        interface = create_interface()
+        first = interface.getHealth()
+        first.append(None)
+        self.assertEqual(interface.getHealth(), first[:-1])
+        snapshot = interface.getSnapshot()
+        self.assertIs(interface.getSnapshot(), snapshot)
+        interface.update()
+        self.assertIsNot(interface.getSnapshot(), snapshot)
+
+    def test_positions_are_copies(self):
+        interface = create_interface()
+        expected = interface.getPositions()[0].tolist()
+        position = interface.getPositions()[0]
+        position -= 512
+        self.assertEqual(interface.getPositions()[0].tolist(), expected)
+
+    def test_spatial_queries(self):
+        interface = create_interface()
+        position = np.array(interface.getPositions(players=[0])[0])
+        in_rect = interface.getUnitsInRect(position - 100, 200, 200)
+        self.assertGreater(len(in_rect), 0)
+        nearest = interface.getNearestUnits(position, 3, players=[1])
+        distances = interface.getDistanceFromPositionToUnits(position, interface.getUnitIDs(players=[1]))
+        expected = np.sort(distances)[:3]
+        actual = [np.hypot(*(np.array([u.getPosition().x, u.getPosition().y]) - position)) for u in nearest]
+        np.testing.assert_allclose(actual, expected)
+        in_radius = interface.getUnitsInRadius(position, expected[-1], players=[1])
+        self.assertEqual(len(in_radius), 3)
+
+    def test_distance_matrix(self):
+        interface = create_interface()
+        allies, enemies = UnitFilter(players=[0]), UnitFilter(players=[1])
+        distances = interface.getDistanceMatrix(allies, enemies)
+        self.assertEqual(distances.shape, (20, 30))
+        ids, nearest = interface.getNearestTargets(allies, enemies, k=2)
+        self.assertEqual(ids.shape, (20, 2))
+        np.testing.assert_allclose(nearest[:, 0], distances.min(axis=1))
+        unit = interface.getUnits(players=[0])[0]
+        np.testing.assert_allclose(interface.getDistanceFromUnitToUnits(unit, interface.getUnitIDs(players=[1])),
+                                   distances[0])
+
+    def test_units_map_orientation(self):
+        interface = create_interface()
+        x, y = interface.getPositions(players=[0])[0]
+        area = interface.createUnitsMap([x - 10, y - 20], 64, 64)
+        self.assertEqual(area[20, 10], 1)
+
+    def test_units_map_out(self):
+        interface = create_interface()
+        position = [0, 0]
+        out = np.full((512, 256), 7.0, dtype=np.float32)
+        area = interface.createUnitsMapHealth(position, 256, 512, out=out)
+        self.assertIs(area, out)
+        np.testing.assert_array_equal(out, interface.createUnitsMapHealth(position, 256, 512))
+        with self.assertRaises(ValueError):
+            interface.createUnitsMap(position, 512, 256, out=out)
+
+    def test_unit_type_features(self):
+        interface = create_interface()
+        np.testing.assert_allclose(interface.getHealthFractions(players=[1]),
+                                   np.array(interface.getHealth(players=[1])) / 35.0)
+        self.assertTrue(np.all(interface.getShieldFractions() == 0))
+        in_range = interface.getInWeaponRange(UnitFilter(players=[0]), UnitFilter(players=[1]))
+        self.assertEqual(in_range.shape, interface.getDistanceMatrix(UnitFilter(players=[0]),
+                                                                     UnitFilter(players=[1])).shape)
+
+    def test_unit_data(self):
+        interface = create_interface()
+        data = interface.getUnitData(players=[1])
+        self.assertEqual(data['id'].tolist(), interface.getUnitIDs(players=[1]))
+        self.assertEqual(data['hp'].tolist(), interface.getHealth(players=[1]))
+
+    def test_feature_planes_match_units_map(self):
+        interface = create_interface()
+        position = np.array([0, 0])
+        dims = interface.get_map_dims()
+        planes = interface.createFeaturePlanes(position, dims[0], dims[1], ['presence'])
+        area = interface.createUnitsMap(position, dims[0], dims[1])
+        np.testing.assert_array_equal(planes[0] > 0, area > 0)
+
+    def test_pyramid(self):
+        interface = create_interface()
+        pyramid = interface.createUnitsPyramid([0, 0], 2048, 2048, scales=(4, 32))
+        self.assertEqual([level.shape for level in pyramid], [(512, 512), (64, 64)])
+        self.assertGreater(pyramid[1].sum(), 0)
+
+    def test_incremental_matches_full_scan(self):
+        full = create_interface()
+        incremental = create_interface(incremental=True)
+        for _ in range(150):
+            for interface in (full, incremental):
+                interface.update()
+            self.assertEqual(sorted(full.getUnitIDs()), sorted(incremental.getUnitIDs()))
+        ids = incremental.getUnitIDs()
+        self.assertEqual(sorted(zip(full.getUnitIDs(), full.getHealth())),
+                         sorted(zip(ids, incremental.getHealth())))
+        rows = [incremental.getUnitRow(i) for i in ids]
+        self.assertEqual(len(set(rows)), len(rows))
+
+    def test_issue_commands(self):
+        interface = create_interface(enemy_attack=False)
+        ids = interface.getUnitIDs(players=[0])[:3]
+        actions = [ATTACK, MOVE, STIM]
+        positions = [[100, 100], [200, 200], [0, 0]]
+        status = interface.issue_commands(ids, actions, positions)
+        self.assertEqual(status.tolist(), [COMMAND_ISSUED] * 3)
+        interface.update()
+        status = interface.issue_commands(ids, actions, positions)
+        self.assertEqual(status.tolist(), [COMMAND_SKIPPED] * 3)
+        status = interface.issue_commands(ids, [MOVE, MOVE, STIM], positions, skip_redundant=False)
+        self.assertEqual(status.tolist(), [COMMAND_ISSUED] * 3)
+
+    def test_issue_commands_invalid(self):
+        interface = create_interface()
+        unit_id = interface.getUnitIDs(players=[0])[0]
+        status = interface.issue_commands([unit_id, 10000, unit_id], [MOVE, MOVE, ATTACK],
+                                          [[10, 10], [10, 10], [-1, 5]])
+        self.assertEqual(status.tolist(), [COMMAND_ISSUED, COMMAND_FAILED, COMMAND_FAILED])
+        with self.assertRaises(ValueError):
+            interface.issue_commands([unit_id], [7], [[0, 0]])
+        with self.assertRaises(ValueError):
+            interface.issue_commands([unit_id], [MOVE])
+
+    def test_issue_commands_without_units(self):
+        interface = create_interface(spawns=[])
+        self.assertEqual(len(interface.getSnapshot()), 0)
+        status = interface.issue_commands([5], [ATTACK], [[10, 10]])
+        self.assertEqual(status.tolist(), [COMMAND_FAILED])
+        interface.queue_commands([5], [MOVE], [[10, 10]])
+        interface.update()
+        self.assertEqual(len(interface.commands), 0)
+
+    def test_multi_step_update_keeps_events(self):
+        interface = create_interface()
+        EventType = SyntheticBackend.EventType
+        destroyed = 0
+        while not interface.is_end():
+            interface.update(number_of_updates=25)
+            destroyed += sum(e.getType() == EventType.UnitDestroy for e in interface.events)
+        self.assertEqual(destroyed, 50 - len(interface.getUnitIDs()))
+        self.assertEqual(interface.event_stream.count(EventType.UnitDestroy), destroyed)
+        interface.update()
+        self.assertFalse(interface.is_end())
+
+    def test_set_map(self):
+        interface = create_interface()
+        interface.update(number_of_updates=10)
+        interface.set_map('test.scm')
+        self.assertTrue(interface.isInGame())
+        self.assertEqual(interface.get_map_name(), 'test.scm')
+        self.assertEqual(len(interface.getUnitIDs()), 50)
+
+    def test_reset_skips_redundant_setup(self):
+        backend = SyntheticBackend()
+        interface = BroodwarInterface(backend=backend)
+        interface.connect()
+        # Count the calls which setting up a match again would make.
+        calls = []
+        for name in ('setMap', 'setLocalSpeed', 'mapPathName', 'mapWidth'):
+            method = getattr(backend.Broodwar, name)
+            counted = lambda *args, method=method, name=name: calls.append(name) or method(*args)
+            setattr(backend.Broodwar, name, counted)
+        self.assertIn('connect', interface.reset_timings.history[-1])
+
+        record = interface.reset('test.scm')
+        self.assertEqual(calls.count('setMap'), 1)
+        self.assertIn('set_map', record)
+        # The map size is read while warming up, the terrain is not.
+        self.assertEqual(calls.count('mapWidth'), 1)
+        self.assertNotIn('mapPathName', calls)
+        interface.get_map_dims()
+        self.assertEqual(calls.count('mapWidth'), 1)
+        interface.update(number_of_updates=10)
+        calls[:] = []
+        record = interface.reset('test.scm')
+        record = interface.reset()
+        # The speed is set again for every match.
+        self.assertEqual(calls, ['setLocalSpeed', 'setLocalSpeed'])
+        self.assertTrue(interface.isInGame())
+        self.assertEqual(len(interface.getUnitIDs()), 50)
+        self.assertEqual(sorted(record), ['frames', 'in_game', 'match_start', 'restart', 'speed',
+                                          'total', 'warm'])
+        self.assertGreater(record['frames'], 0)
+        self.assertEqual(interface.reset(speedup=[10, 2])['frames'], record['frames'])
+        self.assertEqual((backend.Broodwar.local_speed, backend.Broodwar.frame_skip), (10, 2))
+        self.assertIn('restart', interface.reset_timings.report())
+
+    def test_connect_forgets_previous_game(self):
+        backend = SyntheticBackend(map_size=(32, 32))
+        interface = BroodwarInterface(backend=backend, map_cache=False)
+        interface.connect()
+        interface.set_map('test.scm')
+        self.assertEqual(interface.getMapData().width, 32)
+        # Start the game again on a smaller map without any settings.
+        game = backend.Broodwar
+        game.map_size = (16, 16)
+        game.setMap('')
+        game.local_speed = game.frame_skip = None
+        game.restartGame()
+        interface.connect(speedup=False)
+        self.assertEqual(interface.get_map_dims(), (512, 512))
+        self.assertEqual(interface.getMapData().width, 16)
+        self.assertEqual((game.local_speed, game.frame_skip), (167, 24))
+        interface.set_map('test.scm')
+        self.assertEqual(game.map_name, 'test.scm')
+
+if __name__ == '__main__':
+    unittest.main()
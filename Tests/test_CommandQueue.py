@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.BroodwarInterface import ATTACK, MOVE, STIM, COMMAND_ISSUED
+from BroodwarInterface.CommandQueue import CommandQueue
+
+
+class TestCommandQueue(unittest.TestCase):
+
+    def push(self, queue, unit_ids, actions, priorities=0, frame=0):
+        positions = np.array([[10 * i, 20 * i] for i in range(len(unit_ids))])
+        queue.push(np.array(unit_ids), np.array(actions), positions, priorities, frame)
+
+    def test_budget_and_priority(self):
+        queue = CommandQueue(budget=2)
+        self.push(queue, [1, 2, 3, 4], [MOVE] * 4, priorities=[0, 5, 0, 5])
+        self.assertEqual(queue.pop(0)['unit_id'].tolist(), [2, 4])
+        self.push(queue, [5], [MOVE], priorities=1, frame=1)
+        self.assertEqual(queue.pop(1)['unit_id'].tolist(), [5, 1])
+        self.assertEqual(len(queue), 1)
+        flushed = queue.pop(3)
+        self.assertEqual(flushed['unit_id'].tolist(), [3])
+        self.assertEqual(queue.stats.history[-1]['latency_max'], 3)
+        self.assertEqual([record['depth'] for record in queue.stats.history], [4, 3, 1])
+
+    def test_superseded(self):
+        queue = CommandQueue()
+        self.push(queue, [1, 2, 1], [MOVE, MOVE, STIM])
+        self.push(queue, [1, 3], [ATTACK, MOVE], frame=4)
+        flushed = queue.pop(5)
+        # The attack replaces the move of unit 1 and keeps its place, the
+        # stim is kept apart.
+        self.assertEqual(flushed[['unit_id', 'action', 'frame']].tolist(),
+                         [(1, ATTACK, 0), (2, MOVE, 0), (1, STIM, 0), (3, MOVE, 4)])
+        self.assertEqual(flushed['x'][0], 0)
+        self.assertEqual(queue.stats.history[-1]['superseded'], 1)
+        self.assertEqual(queue.report()['flushed']['mean'], 4)
+
+
+class TestInterfaceCommandQueue(unittest.TestCase):
+
+    def test_update_flushes_budget(self):
+        interface = BroodwarInterface(backend=SyntheticBackend(seed=1), command_budget=8)
+        interface.connect()
+        ids = interface.getUnitIDs(players=[0])
+        positions = [[100 + i, 200] for i in range(len(ids))]
+        interface.queue_commands(ids, [MOVE] * len(ids), positions, priorities=0)
+        interface.queue_commands(ids[-1:], [ATTACK], [[300, 300]], priorities=1)
+        commands, status = interface.flush_commands()
+        self.assertEqual(commands['unit_id'].tolist(), [ids[-1]] + ids[:7])
+        self.assertEqual(status.tolist(), [COMMAND_ISSUED] * 8)
+        interface.update()
+        self.assertEqual(len(interface.commands), len(ids) - 16)
+        while len(interface.commands) > 0:
+            interface.update()
+        report = interface.commands.report()
+        self.assertEqual(report['flushed']['p50'], 8)
+        self.assertGreater(report['latency_max']['mean'], 0)
+        with self.assertRaises(ValueError):
+            interface.queue_commands(ids, [STIM] * (len(ids) - 1))
+
+    def test_restart_drops_commands(self):
+        interface = BroodwarInterface(backend=SyntheticBackend(), command_budget=1)
+        interface.connect()
+        ids = interface.getUnitIDs(players=[0])
+        interface.queue_commands(ids, [STIM] * len(ids))
+        interface.restart(wait=True)
+        self.assertEqual(len(interface.commands), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, UnitFilter, SyntheticBackend
+from BroodwarInterface.EntityObservation import EntityObservation
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE
+from BroodwarInterface.UnitTypeTable import UnitTypeTable
+from BroodwarInterface.SyntheticBackend import UnitTypes
+
+MARINE = UnitTypes.Terran_Marine.getID()
+
+
+def create_snapshot(ids, hp=40):
+    data = np.zeros(len(ids), dtype=UNIT_DTYPE)
+    data['id'] = ids
+    data['type'] = MARINE
+    data['x'] = ids
+    data['hp'] = hp
+    data['exists'] = True
+    return UnitSnapshot(np.empty(len(ids), dtype=object), data)
+
+
+class TestEntityObservation(unittest.TestCase):
+
+    def setUp(self):
+        self.table = UnitTypeTable()
+        self.table.add(UnitTypes.Terran_Marine)
+
+    def test_rows_are_stable(self):
+        observation = EntityObservation([None], 4, features=('x', 'hp_fraction'))
+        observation.update(create_snapshot([5, 3, 9]), self.table)
+        rows = observation.unit_ids[0].tolist()
+        self.assertEqual(rows, [5, 3, 9, -1])
+        observation.update(create_snapshot([9, 7, 5], hp=20), self.table)
+        self.assertEqual(observation.unit_ids[0].tolist(), [5, 7, 9, -1])
+        self.assertEqual(observation.mask[0].tolist(), [True, True, True, False])
+        np.testing.assert_allclose(observation.features[0, :, 0], [5, 7, 9, 0])
+        np.testing.assert_allclose(observation.features[0, :3, 1], 0.5)
+
+    def test_overflow(self):
+        observation = EntityObservation([None], 2, features=('x',))
+        observation.update(create_snapshot([1, 2, 3]), self.table)
+        self.assertEqual(observation.overflow.tolist(), [1])
+        observation.update(create_snapshot([2, 3]), self.table)
+        self.assertEqual(observation.unit_ids[0].tolist(), [3, 2])
+        self.assertEqual(observation.overflow.tolist(), [0])
+
+    def test_buffers_are_reused(self):
+        observation = EntityObservation([None], 4)
+        features = observation.features
+        observation.update(create_snapshot([1]), self.table)
+        self.assertIs(observation.features, features)
+        self.assertEqual(features.dtype, np.float32)
+        self.assertEqual(features.shape, (1, 4, 5))
+
+    def test_custom_and_unknown_features(self):
+        observation = EntityObservation([None], 2, features=[('double_x', lambda data, table: 2 * data['x'])])
+        observation.update(create_snapshot([4]), self.table)
+        self.assertEqual(observation.features[0, 0, 0], 8)
+        with self.assertRaises(ValueError):
+            EntityObservation([None], 2, features=('nothing',))
+
+    def test_match_change_clears(self):
+        observation = EntityObservation([None], 2, features=('x',))
+        observation.update(create_snapshot([1, 2]), self.table, match=0)
+        observation.update(create_snapshot([2]), self.table, match=1)
+        self.assertEqual(observation.unit_ids[0].tolist(), [2, -1])
+
+    def test_interface_groups(self):
+        interface = BroodwarInterface(backend=SyntheticBackend(enemy_attack=False))
+        interface.connect()
+        observation = EntityObservation([UnitFilter(players=[0]), UnitFilter(players=[1])], 32,
+                                        features=('x', 'y', 'hp'))
+        interface.fillEntityObservation(observation)
+        self.assertEqual(observation.mask.sum(axis=1).tolist(), [20, 30])
+        self.assertEqual(sorted(observation.unit_ids[1][observation.mask[1]].tolist()),
+                         sorted(interface.getUnitIDs(players=[1])))
+        self.assertEqual(sorted(observation.features[0, :20, 2].tolist()),
+                         sorted(interface.getHealth(players=[0])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from BroodwarInterface.EventStream import EventStream
+
+
+class Event(object):
+
+    def __init__(self, event_type):
+        self.event_type = event_type
+
+    def getType(self):
+        return self.event_type
+
+
+class TestEventStream(unittest.TestCase):
+
+    def test_frames(self):
+        stream = EventStream()
+        self.assertEqual(stream.frame, -1)
+        self.assertEqual(stream.append([]), 0)
+        self.assertEqual(stream.append([Event('a')]), 1)
+        self.assertEqual(stream.lastFrame('a'), 1)
+        self.assertEqual(stream.lastFrame('b'), -1)
+
+    def test_happened_since(self):
+        stream = EventStream()
+        stream.append([Event('end')])
+        stream.append([])
+        self.assertTrue(stream.happenedSince('end', 0))
+        self.assertFalse(stream.happenedSince('end', 1))
+
+    def test_since(self):
+        stream = EventStream()
+        stream.append([Event('a'), Event('b')])
+        stream.append([Event('b')])
+        stream.append([Event('a')])
+        self.assertEqual([e.getType() for e in stream.since(1)], ['b', 'a'])
+        self.assertEqual([e.getType() for e in stream.since(0, ['a'])], ['a', 'a'])
+        self.assertEqual(stream.since(3), [])
+        self.assertEqual(stream.count('b'), 2)
+
+    def test_capacity(self):
+        stream = EventStream(capacity=3)
+        for _ in range(5):
+            stream.append([Event('a')])
+        self.assertEqual(len(stream), 3)
+        self.assertEqual(len(stream.since(0)), 3)
+        self.assertEqual(stream.lastFrame('a'), 4)
+
+    def test_subscribe(self):
+        stream = EventStream()
+        received = []
+        everything = []
+        callback = lambda frame, event: received.append((frame, event.getType()))
+        stream.subscribe(callback, 'a')
+        stream.subscribe(lambda frame, event: everything.append(event.getType()))
+        stream.append([Event('a'), Event('b')])
+        stream.unsubscribe(callback, 'a')
+        stream.append([Event('a')])
+        self.assertEqual(received, [(0, 'a')])
+        self.assertEqual(everything, ['a', 'b', 'a'])
+
+if __name__ == '__main__':
+    unittest.main()
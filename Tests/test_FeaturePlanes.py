@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE
+from BroodwarInterface.UnitFilter import UnitFilter
+from BroodwarInterface.FeaturePlanes import renderFeaturePlanes
+
+
+def create_test_snapshot():
+    data = np.array([(1, 0, 0, 10, 20, 40, 0, True),
+                     (2, 0, 0, 12, 22, 35, 0, True),
+                     (3, 1, 37, 50, 60, 30, 5, True)], dtype=UNIT_DTYPE)
+    units = np.empty(len(data), dtype=object)
+    return UnitSnapshot(units, data)
+
+
+class TestFeaturePlanes(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = create_test_snapshot()
+        self.indices = np.arange(len(self.snapshot))
+
+    def render(self, channels, scale=1, out=None):
+        return renderFeaturePlanes(self.snapshot, self.indices, (0, 0), 64, 64,
+                                   channels, scale, out)
+
+    def test_shape(self):
+        planes = self.render(['presence', 'health'], scale=16)
+        self.assertEqual(planes.shape, (2, 4, 4))
+        self.assertEqual(planes.dtype, np.float32)
+
+    def test_presence_accumulates(self):
+        planes = self.render(['presence'], scale=16)
+        self.assertEqual(planes[0, 1, 0], 2)
+        self.assertEqual(planes[0, 3, 3], 1)
+        self.assertEqual(planes.sum(), 3)
+
+    def test_rows_are_y(self):
+        planes = self.render(['presence'])
+        self.assertEqual(planes[0, 20, 10], 1)
+        self.assertEqual(planes[0, 10, 20], 0)
+
+    def test_health(self):
+        planes = self.render(['health'], scale=16)
+        self.assertEqual(planes[0, 1, 0], 75)
+        self.assertEqual(planes[0, 3, 3], 35)
+
+    def test_type_and_player(self):
+        planes = self.render(['type', 'player'], scale=32)
+        self.assertEqual(planes[0, 0, 0], 1)
+        self.assertEqual(planes[0, 1, 1], 38)
+        self.assertEqual(planes[1, 1, 1], 2)
+
+    def test_channel_filter(self):
+        planes = self.render([('presence', UnitFilter(players=[1]))], scale=16)
+        self.assertEqual(planes.sum(), 1)
+        self.assertEqual(planes[0, 3, 3], 1)
+
+    def test_out(self):
+        out = np.full((1, 2, 2), 7, dtype=np.uint8)
+        planes = self.render(['presence'], scale=32, out=out)
+        self.assertIs(planes, out)
+        self.assertEqual(out.tolist(), [[[2, 0], [0, 1]]])
+
+    def test_out_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.render(['presence'], scale=32, out=np.zeros((1, 4, 4)))
+
+if __name__ == '__main__':
+    unittest.main()
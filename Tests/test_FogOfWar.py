@@ -0,0 +1,133 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.FogOfWar import FogOfWar
+from BroodwarInterface.UnitSnapshot import UNIT_DTYPE
+from BroodwarInterface.UnitTypeTable import UnitTypeTable
+
+MARINE, ZERGLING = 0, 37
+
+
+def create_units(rows):
+    '''Create snapshot rows from (id, player, type, x, y) tuples.'''
+    data = np.zeros(len(rows), dtype=UNIT_DTYPE)
+    for i, (unit_id, player, unit_type, x, y) in enumerate(rows):
+        data[i] = (unit_id, player, unit_type, x, y, 40, 0, True)
+    return data
+
+
+class CountingGame(object):
+    '''Answers isVisible from a grid and counts the tiles asked about.'''
+
+    def __init__(self, visible, creep):
+        self.visible = visible
+        self.creep = creep
+        self.asked = []
+
+    def isVisible(self, x, y):
+        self.asked.append((x, y))
+        return bool(self.visible[y, x])
+
+    def hasCreep(self, x, y):
+        return bool(self.creep[y, x])
+
+
+class TestFogOfWar(unittest.TestCase):
+
+    def setUp(self):
+        self.table = UnitTypeTable()
+        self.table.addAll(SyntheticBackend.UnitTypes)
+        self.creep = np.zeros((32, 32), dtype=bool)
+        self.creep[5:8, 5:8] = True
+
+    def test_geometric(self):
+        fog = FogOfWar(32, 32)
+        friendly = create_units([(1, 0, MARINE, 5 * 32 + 10, 6 * 32)])
+        fog.update(None, friendly, friendly[:0], self.table, 1)
+        # A marine sees 7 tiles.
+        self.assertEqual(fog.visible[6, 5:13].tolist(), [1] * 8)
+        self.assertEqual(fog.visible[6, 13], 0)
+        self.assertEqual(fog.visible.sum(), fog.explored.sum())
+        self.assertEqual(fog.packed('visible').shape, (32, 4))
+        self.assertEqual(fog.queries, 0)
+
+    def test_incremental_queries(self):
+        first = create_units([(1, 0, MARINE, 160, 160), (2, 0, MARINE, 800, 800)])
+        geometric = FogOfWar(32, 32).update(None, first, first[:0], self.table, 1)
+        game = CountingGame(geometric.visible.astype(bool), self.creep)
+        fog = FogOfWar(32, 32)
+        fog.update(game, first, first[:0], self.table, 1)
+        self.assertEqual(fog.visible.tolist(), geometric.visible.tolist())
+        self.assertEqual(fog.creep[5:8, 5:8].sum(), 9)
+        self.assertGreater(fog.queries, 0)
+
+        # Nothing moved, so nothing is asked about.
+        game.asked = []
+        fog.update(game, first, first[:0], self.table, 2)
+        self.assertEqual(fog.queries, 0)
+        self.assertEqual(game.asked, [])
+
+        # Only the tiles around the unit which moved are asked about.
+        second = create_units([(1, 0, MARINE, 160, 160), (2, 0, MARINE, 700, 800)])
+        geometric.update(None, second, second[:0], self.table, 3)
+        game.visible = geometric.visible.astype(bool)
+        fog.update(game, second, second[:0], self.table, 3)
+        self.assertEqual(fog.visible.tolist(), geometric.visible.tolist())
+        self.assertTrue(all(x > 10 and y > 10 for x, y in game.asked))
+        self.assertEqual(fog.explored[25, 31], 1)
+        self.assertEqual(fog.visible[25, 31], 0)
+
+    def test_last_seen(self):
+        fog = FogOfWar(32, 32)
+        friendly = create_units([(1, 0, MARINE, 160, 160)])
+        enemies = create_units([(7, 1, ZERGLING, 200, 200), (8, 1, ZERGLING, 900, 900)])
+        fog.update(None, friendly, enemies, self.table, 1)
+        self.assertEqual(fog.last_seen['id'].tolist(), [7])
+
+        # Unit 7 is no longer seen and is remembered where it was.
+        moved = create_units([(7, 1, ZERGLING, 700, 700), (8, 1, ZERGLING, 210, 180)])
+        fog.update(None, friendly, moved, self.table, 5)
+        self.assertEqual(fog.last_seen[['id', 'x', 'frame']].tolist(), [(7, 200, 1), (8, 210, 5)])
+        self.assertEqual(fog.hidden()['id'].tolist(), [7])
+
+        fog.update(None, friendly, moved[1:], self.table, 6, destroyed_ids=[7])
+        self.assertEqual(fog.last_seen['id'].tolist(), [8])
+        fog.update(None, friendly, moved[:0], self.table, 7, match=1)
+        self.assertEqual(len(fog.last_seen), 0)
+        self.assertEqual(fog.explored.sum(), fog.visible.sum())
+
+
+class TestInterfaceFogOfWar(unittest.TestCase):
+
+    def test_matches_synthetic_vision(self):
+        backend = SyntheticBackend(seed=2, map_size=(48, 40))
+        interface = BroodwarInterface(backend=backend)
+        interface.connect()
+        table = interface.getUnitTypeTable()
+        geometric = FogOfWar(48, 40)
+        tiles = 48 * 40
+        queries = []
+        for _ in range(30):
+            backend.Broodwar.visibility_queries = 0
+            fog = interface.getFogOfWar()
+            self.assertIs(interface.getFogOfWar(), fog)
+            self.assertEqual(fog.visible.shape, tuple(interface.get_map_dimensions()))
+            data = interface.getSnapshot().data
+            geometric.update(None, data[data['player'] == 0], data[:0], table, 0)
+            self.assertEqual(fog.visible.tolist(), geometric.visible.tolist())
+            self.assertTrue(np.all(fog.explored >= fog.visible))
+            self.assertTrue(np.all(np.isin(fog.last_seen['player'], interface.getEnemiesID())))
+            queries.append(backend.Broodwar.visibility_queries)
+            interface.update(number_of_updates=3)
+            if interface.is_end():
+                break
+        self.assertGreater(len(fog.last_seen), 0)
+        # The map revealer does not move, so after the first frame only the
+        # tiles around moving units are asked about.
+        self.assertLess(max(queries[1:]), queries[0])
+        self.assertLess(queries[0], 2 * tiles)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.FrameDiff import FrameDiff, RewardSpec, alignIDs
+from BroodwarInterface.UnitSnapshot import UNIT_DTYPE
+
+
+def create_units(rows):
+    '''Create snapshot rows from (id, player, hp, shields) tuples.'''
+    data = np.zeros(len(rows), dtype=UNIT_DTYPE)
+    for i, (unit_id, player, hp, shields) in enumerate(rows):
+        data[i] = (unit_id, player, 0, 0, 0, hp, shields, True)
+    return data
+
+
+class TestFrameDiff(unittest.TestCase):
+
+    def test_align_ids(self):
+        previous_rows, current_rows = alignIDs([4, 1, 9], [9, 2, 4])
+        self.assertEqual(previous_rows.tolist(), [2, 0])
+        self.assertEqual(current_rows.tolist(), [0, 2])
+        self.assertEqual(len(alignIDs([], [1])[0]), 0)
+
+    def test_changes(self):
+        previous = create_units([(1, 0, 40, 0), (2, 0, 40, 0), (3, 1, 35, 10), (4, 1, 20, 0)])
+        current = create_units([(3, 1, 30, 0), (1, 0, 45, 0), (5, 1, 35, 0)])
+        # Unit 2 is destroyed, unit 4 is only hidden and unit 6 was created
+        # and destroyed between the two snapshots.
+        diff = FrameDiff(previous, current, destroyed_ids=[2, 6], destroyed_players=[0, 1])
+        self.assertEqual(diff.unit_ids.tolist(), [3, 1])
+        self.assertEqual(diff.hp_change.tolist(), [-5, 5])
+        self.assertEqual(diff.shield_change.tolist(), [-10, 0])
+        self.assertEqual(diff.damage_taken[:2].tolist(), [40, 15])
+        self.assertEqual(diff.units_lost[:2].tolist(), [1, 1])
+        self.assertEqual(diff.damageDealt(0), 15)
+        self.assertEqual(diff.unitsKilled(1), 1)
+
+    def test_reward_spec(self):
+        previous = create_units([(1, 0, 40, 0), (2, 1, 35, 0)])
+        current = create_units([(1, 0, 30, 0)])
+        diff = FrameDiff(previous, current, [2], [1])
+        spec = RewardSpec(damage_dealt=0.1, damage_taken=-0.1, units_killed=1, step=-0.5)
+        self.assertAlmostEqual(spec.evaluate(diff, 0), 3.5 - 1 + 1 - 0.5)
+        self.assertEqual(spec.terms(diff, 0)['units_killed'], 1)
+        with self.assertRaises(ValueError):
+            RewardSpec(gold=1)
+
+
+class TestInterfaceFrameDiff(unittest.TestCase):
+
+    def test_accumulates_over_skipped_frames(self):
+        interface = BroodwarInterface(backend=SyntheticBackend(seed=3))
+        interface.connect()
+        self.assertEqual(interface.getFrameDiff().damage_taken.sum(), 0)
+        lost = 0
+        for _ in range(40):
+            before = dict(zip(interface.getUnitIDs(), np.add(interface.getHealth(), interface.getShields())))
+            interface.update(number_of_updates=5)
+            after = dict(zip(interface.getUnitIDs(), np.add(interface.getHealth(), interface.getShields())))
+            diff = interface.getFrameDiff()
+            expected = sum(before[i] - after.get(i, 0) for i in before)
+            self.assertEqual(diff.damage_taken.sum(), expected)
+            self.assertEqual(diff.units_lost.sum(), len(set(before) - set(after)))
+            lost += diff.units_lost.sum()
+            if interface.is_end():
+                break
+        self.assertGreater(lost, 0)
+        self.assertIs(interface.getFrameDiff(), diff)
+        self.assertAlmostEqual(interface.getReward(RewardSpec(damage_taken=1)),
+                               diff.damage_taken[interface.getSelfID()])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from time import perf_counter, sleep
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.FrameStepper import FrameStepper, StepTimings
+
+
+def create_interface():
+    interface = BroodwarInterface(backend=SyntheticBackend(enemy_attack=False))
+    interface.connect()
+    return interface
+
+
+class TestStepTimings(unittest.TestCase):
+
+    def test_report(self):
+        timings = StepTimings()
+        for seconds in (1.0, 2.0, 3.0):
+            timings.add('a', seconds)
+            timings.finish(frames=1)
+        report = timings.report()
+        self.assertEqual(report['a']['mean'], 2.0)
+        self.assertEqual(report['a']['p50'], 2.0)
+        self.assertEqual(report['frames']['mean'], 1.0)
+
+
+class TestFrameStepper(unittest.TestCase):
+
+    def test_lockstep(self):
+        interface = create_interface()
+        stepper = FrameStepper(interface, frames_per_step=4)
+        frame = interface.event_stream.frame
+        self.assertEqual(stepper.step(), 4)
+        self.assertEqual(interface.event_stream.frame, frame + 4)
+
+    def test_phases_are_reported(self):
+        interface = create_interface()
+        stepper = FrameStepper(interface)
+        with stepper.phase('observation'):
+            interface.getPositions()
+        stepper.step()
+        report = stepper.report()
+        for phase in ('client_update', 'event_fetch', 'observation', 'step', 'wait'):
+            self.assertIn(phase, report)
+        stepper.close()
+        self.assertIsNone(interface.timings)
+
+    def test_target_rate(self):
+        interface = create_interface()
+        stepper = FrameStepper(interface, decisions_per_second=50)
+        begin = perf_counter()
+        for _ in range(6):
+            stepper.step()
+        self.assertGreaterEqual(perf_counter() - begin, 5 / 50.0)
+
+    def test_adaptive(self):
+        interface = create_interface()
+        stepper = FrameStepper(interface, adaptive=True, max_frames_per_step=10,
+                               frames_per_second=100)
+        self.assertEqual(stepper.step(), 1)
+        sleep(0.05)
+        self.assertGreaterEqual(stepper.step(), 5)
+        sleep(1)
+        self.assertEqual(stepper.step(), 10)
+
+    def test_invalid_frames_per_step(self):
+        with self.assertRaises(ValueError):
+            FrameStepper(create_interface(), frames_per_step=0)
+
+if __name__ == '__main__':
+    unittest.main()
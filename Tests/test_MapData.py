@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface import MapData as map_data_module
+from BroodwarInterface.MapData import getMapData, getMapKey
+
+
+class TestMapData(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        map_data_module._loaded.clear()
+        self.addCleanup(map_data_module._loaded.clear)
+
+    def test_read_from_game(self):
+        game = SyntheticBackend(map_size=(16, 12)).Broodwar
+        map_data = getMapData(game)
+        self.assertEqual((map_data.width, map_data.height), (16, 12))
+        np.testing.assert_array_equal(map_data.getWalkability(), game.walkable)
+        np.testing.assert_array_equal(map_data.getBuildability(), game.buildable)
+        np.testing.assert_array_equal(map_data.ground_height, game.ground_height)
+        self.assertEqual(map_data.start_locations.tolist(), [[4, 4], [8, 4]])
+        self.assertEqual(map_data.walkable.shape, (48, 8))
+        self.assertEqual(map_data.getTileWalkability().shape, (12, 16))
+
+    def test_memory_cache(self):
+        game = SyntheticBackend().Broodwar
+        first = getMapData(game)
+        queries = game.terrain_queries
+        self.assertIs(getMapData(game), first)
+        self.assertEqual(game.terrain_queries, queries)
+
+    def test_disk_cache(self):
+        game = SyntheticBackend().Broodwar
+        stored = getMapData(game, self.directory)
+        map_data_module._loaded.clear()
+        other = SyntheticBackend().Broodwar
+        loaded = getMapData(other, self.directory)
+        self.assertEqual(other.terrain_queries, 0)
+        self.assertIsInstance(loaded.walkable, np.memmap)
+        np.testing.assert_array_equal(loaded.getWalkability(), stored.getWalkability())
+        np.testing.assert_array_equal(loaded.start_locations, stored.start_locations)
+
+    def test_key_depends_on_hash(self):
+        self.assertNotEqual(getMapKey('maps\\a.scm', '1'), getMapKey('maps\\a.scm', '2'))
+        self.assertTrue(getMapKey('maps\\a b.scm', '1').startswith('a_b-'))
+
+    def test_interface_loads_map_on_set_map(self):
+        backend = SyntheticBackend(map_size=(32, 32))
+        interface = BroodwarInterface(backend=backend, map_cache=self.directory)
+        interface.connect()
+        # The terrain is only read once it is needed.
+        self.assertEqual(backend.Broodwar.terrain_queries, 0)
+        first = interface.getMapData()
+        self.assertEqual(interface.get_map_dims(), (1024, 1024))
+        interface.set_map('other.scm')
+        self.assertIsNot(interface.getMapData(), first)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_map_size_read_once(self):
+        backend = SyntheticBackend(map_size=(32, 32))
+        interface = BroodwarInterface(backend=backend, map_cache=False)
+        interface.connect()
+        calls = []
+        width = backend.Broodwar.mapWidth
+        backend.Broodwar.mapWidth = lambda: calls.append(1) or width()
+        interface.set_map('test.scm')
+        for _ in range(10):
+            self.assertEqual(interface.get_map_dims(), (1024, 1024))
+            self.assertEqual(interface.get_map_dimensions().tolist(), [32, 32])
+            interface.getUnitsInRect((0, 0), 512, 512)
+            interface.update()
+        self.assertEqual(len(calls), 1)
+        # A new map is read again.
+        backend.Broodwar.map_size = (16, 16)
+        interface.set_map('other.scm')
+        self.assertEqual(interface.get_map_dims(), (512, 512))
+        self.assertEqual(len(calls), 2)
+
+    def useCacheHome(self):
+        '''Point the default cache directory into the test's directory.'''
+        names = ('BROODWAR_MAP_CACHE', 'LOCALAPPDATA', 'XDG_CACHE_HOME')
+        saved = {name: os.environ.pop(name, None) for name in names}
+
+        def restore():
+            for name, value in saved.items():
+                os.environ.pop(name, None)
+                if value is not None:
+                    os.environ[name] = value
+        self.addCleanup(restore)
+        os.environ['XDG_CACHE_HOME'] = self.directory
+        return os.path.join(self.directory, 'BroodwarInterface', 'maps')
+
+    def test_default_cache_directory(self):
+        default = self.useCacheHome()
+        self.assertEqual(map_data_module.getDefaultCacheDirectory(), default)
+        os.environ['BROODWAR_MAP_CACHE'] = 'maps'
+        self.assertEqual(map_data_module.getDefaultCacheDirectory(), 'maps')
+        del os.environ['BROODWAR_MAP_CACHE']
+        interface = BroodwarInterface(backend=SyntheticBackend())
+        interface.connect()
+        interface.getMapData()
+        self.assertEqual(len(os.listdir(default)), 1)
+
+    def test_cache_disabled(self):
+        self.useCacheHome()
+        interface = BroodwarInterface(backend=SyntheticBackend(), map_cache=False)
+        interface.connect()
+        self.assertIsNotNone(interface.getMapData())
+        self.assertEqual(os.listdir(self.directory), [])
+
+if __name__ == '__main__':
+    unittest.main()
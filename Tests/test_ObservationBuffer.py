@@ -0,0 +1,78 @@
+import multiprocessing
+import pickle
+import unittest
+import numpy as np
+
+from BroodwarInterface.ObservationBuffer import ObservationBuffer, getLayout
+from BroodwarInterface.UnitSnapshot import UNIT_DTYPE
+
+SCHEMA = {
+    'units_map': ((4, 6), np.float64),
+    'units': ((3,), UNIT_DTYPE),
+    'unit_count': ((), np.int64),
+}
+
+
+def write_in_child(buffer, value):
+    with buffer.write() as slot:
+        slot['units_map'][...] = value
+        slot['units'][...] = np.zeros(3, dtype=UNIT_DTYPE)
+        slot['unit_count'][...] = 0
+    buffer.close()
+
+
+class TestObservationBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = ObservationBuffer(SCHEMA, capacity=2)
+        self.addCleanup(self.buffer.close)
+
+    def write(self, value):
+        with self.buffer.write() as slot:
+            slot['units_map'][...] = value
+            slot['units']['id'] = [value, value + 1, value + 2]
+            slot['unit_count'][...] = 3
+
+    def test_layout_is_aligned(self):
+        offsets, size = getLayout(self.buffer.schema, 2)
+        self.assertTrue(all(offset % 64 == 0 for offset in offsets.values()))
+        self.assertLessEqual(size, self.buffer.memory.size)
+
+    def test_write_and_read(self):
+        self.assertEqual(self.buffer.latest(), -1)
+        self.assertIsNone(self.buffer.read(0))
+        self.write(5)
+        self.assertEqual(self.buffer.latest(), 0)
+        views = self.buffer.read(0)
+        np.testing.assert_array_equal(views['units_map'], np.full((4, 6), 5.0))
+        self.assertEqual(views['units']['id'].tolist(), [5, 6, 7])
+        self.assertEqual(int(views['unit_count']), 3)
+        self.assertFalse(views['units_map'].flags.writeable)
+
+    def test_ring_overwrites_oldest(self):
+        for value in range(3):
+            self.write(value)
+        self.assertEqual(self.buffer.oldest(), 1)
+        self.assertFalse(self.buffer.isCurrent(0))
+        self.assertIsNone(self.buffer.read(0))
+        self.assertEqual(self.buffer.read(2)['units_map'][0, 0], 2)
+
+    def test_pickle_attaches(self):
+        self.write(3)
+        reader = pickle.loads(pickle.dumps(self.buffer))
+        self.assertIsNone(reader.owner)
+        self.assertEqual(reader.read(0)['units_map'][0, 0], 3)
+        reader.close()
+        # Closing a reader leaves the memory in place.
+        self.assertEqual(self.buffer.read(0)['units_map'][0, 0], 3)
+
+    def test_written_by_another_process(self):
+        process = multiprocessing.get_context('fork').Process(target=write_in_child,
+                                                              args=(self.buffer, 9))
+        process.start()
+        process.join()
+        self.assertEqual(self.buffer.latest(), 0)
+        self.assertEqual(self.buffer.read(0)['units_map'][3, 5], 9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.Profiler import Profiler, ProfiledBackend, unwrap
+
+
+def create_interface(profiler, incremental=False, backend=None):
+    spawns = [(0, 'Terran_Marine', 5), (1, 'Zerg_Zergling', 7)]
+    if backend is None:
+        backend = SyntheticBackend(spawns=spawns, enemy_attack=False)
+    interface = BroodwarInterface(incremental=incremental, profiler=profiler, backend=backend)
+    interface.connect()
+    return interface
+
+
+class Collection(object):
+    '''A container which is not a list, like cybw's Unitset and Playerset.'''
+
+    def __init__(self, items):
+        self.__items = list(items)
+
+    def __iter__(self):
+        return iter(self.__items)
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __contains__(self, item):
+        return item in self.__items
+
+
+def returnCollections(backend):
+    '''Make the game of a backend return its units, players and events as Collections.'''
+    game = backend.Broodwar
+    for name in ('getAllUnits', 'enemies', 'getEvents'):
+        method = getattr(game, name)
+        setattr(game, name, lambda method=method: Collection(method()))
+    return backend
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_calls_are_attributed(self):
+        records = []
+        profiler = Profiler(callback=records.append)
+        interface = create_interface(profiler)
+        interface.update()
+        interface.getHealth()
+        interface.update()
+        record = records[-1]
+        self.assertEqual(record['getHealth > Game.getAllUnits calls'], 1)
+        self.assertEqual(record['getHealth > Unit.getHitPoints calls'], 12)
+        self.assertEqual(record['update > Client.update calls'], 1)
+        self.assertEqual(record['getHealth calls'], 1)
+        self.assertGreater(record['getHealth seconds'], 0)
+
+    def test_nested_calls_count_towards_outermost(self):
+        profiler = Profiler()
+        create_interface(profiler)
+        report = profiler.report()
+        self.assertIn('connect > Client.connect calls', report)
+        self.assertNotIn('isInGame calls', report)
+
+    def test_user_calls(self):
+        profiler = Profiler()
+        interface = create_interface(profiler)
+        for unit in interface.getUnits():
+            unit.getPosition()
+        record = profiler.finishFrame()
+        self.assertEqual(record['(user) > Unit.getPosition calls'], 12)
+
+    def test_top(self):
+        profiler = Profiler()
+        interface = create_interface(profiler)
+        for _ in range(3):
+            interface.getPositions()
+            interface.update()
+        keys = [key for key, _ in profiler.top(3)]
+        self.assertEqual(len(keys), 3)
+        summaries = [summary['mean'] for _, summary in profiler.top(5)]
+        self.assertEqual(summaries, sorted(summaries, reverse=True))
+
+    def test_results_match_unprofiled(self):
+        profiled = create_interface(Profiler(), incremental=True)
+        plain = create_interface(None, incremental=True)
+        for interface in (profiled, plain):
+            interface.update(number_of_updates=3)
+        self.assertEqual(profiled.getUnitIDs(), plain.getUnitIDs())
+        self.assertEqual(profiled.getHealth(), plain.getHealth())
+
+    def test_proxies_compare_as_targets(self):
+        backend = SyntheticBackend()
+        wrapped = ProfiledBackend(backend, Profiler())
+        unit = wrapped.Broodwar.getUnit(0)
+        self.assertEqual(unit, backend.Broodwar.getUnit(0))
+        self.assertIs(unwrap(unit), backend.Broodwar.getUnit(0))
+        self.assertIs(wrapped.UnitTypes, backend.UnitTypes)
+
+    def test_containers(self):
+        spawns = [(0, 'Terran_Marine', 5), (1, 'Zerg_Zergling', 7)]
+        backend = returnCollections(SyntheticBackend(spawns=spawns, enemy_attack=False))
+        profiler = Profiler()
+        interface = create_interface(profiler, incremental=True, backend=backend)
+        interface.update()
+        self.assertEqual(interface.getEnemiesID(), [1])
+        self.assertEqual(len(interface.getUnitIDs()), 12)
+        units = ProfiledBackend(backend, profiler).Broodwar.getAllUnits()
+        self.assertEqual(len(units), 12)
+        self.assertIn(backend.Broodwar.getUnit(0), units)
+        for unit in units:
+            unit.getPosition()
+        record = profiler.finishFrame()
+        self.assertEqual(record['(user) > Unit.getPosition calls'], 12)
+
+    def test_disabled_leaves_interface_unwrapped(self):
+        interface = create_interface(None)
+        self.assertNotIn('update', vars(interface))
+
+if __name__ == '__main__':
+    unittest.main()
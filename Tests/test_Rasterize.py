@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.Rasterize import rasterizeDiscs, rasterizeFootprints, rasterizeGaussians, rasterizePyramid
+
+
+class TestRasterize(unittest.TestCase):
+
+    def setUp(self):
+        self.offsets = np.array([[10, 20], [40, 40]])
+        self.extents = np.array([[2, 3, 4, 5], [8, 8, 7, 7]])
+        self.values = np.array([1.0, 2.0])
+
+    def brute_force(self, shape, scale):
+        image = np.zeros(shape)
+        for (x, y), (left, up, right, down), value in zip(self.offsets, self.extents, self.values):
+            for row in range(shape[0]):
+                for column in range(shape[1]):
+                    overlaps_x = column * scale <= x + right and (column + 1) * scale > x - left
+                    overlaps_y = row * scale <= y + down and (row + 1) * scale > y - up
+                    if overlaps_x and overlaps_y:
+                        image[row, column] += value
+        return image
+
+    def test_footprints_full_resolution(self):
+        image = rasterizeFootprints(self.offsets, self.extents, self.values, (64, 64))
+        self.assertEqual(image[17, 8], 1)
+        self.assertEqual(image[25, 14], 1)
+        self.assertEqual(image[26, 14], 0)
+        self.assertEqual(image.sum(), 7 * 9 + 2 * 16 * 16)
+
+    def test_footprints_match_brute_force(self):
+        for scale in (1, 3, 8):
+            shape = (-(-50 // scale), -(-45 // scale))
+            image = rasterizeFootprints(self.offsets, self.extents, self.values, shape, scale)
+            np.testing.assert_allclose(image, self.brute_force(shape, scale))
+
+    def test_footprints_clipped(self):
+        offsets = np.array([[-3, 5], [100, 100]])
+        image = rasterizeFootprints(offsets, self.extents, self.values, (16, 16))
+        self.assertEqual(image[2:11, 0:2].tolist(), np.ones((9, 2)).tolist())
+        self.assertEqual(image.sum(), 18)
+
+    def test_discs_match_brute_force(self):
+        centers = np.array([[5, 6], [0, 18], [14, 3], [30, 30]])
+        radii = np.array([3, 4, 0, 2])
+        image = rasterizeDiscs(centers, radii, (20, 16))
+        rows, columns = np.mgrid[0:20, 0:16]
+        expected = sum(((columns - x) ** 2 + (rows - y) ** 2 <= r ** 2).astype(int)
+                       for (x, y), r in zip(centers, radii))
+        self.assertEqual(image.tolist(), expected.tolist())
+        self.assertEqual(rasterizeDiscs(np.zeros((0, 2)), [], (4, 4)).sum(), 0)
+
+    def test_gaussian_peak(self):
+        image = rasterizeGaussians(np.array([[10.5, 20.5]]), np.array([3.0]),
+                                   np.array([2.0]), (32, 32))
+        self.assertEqual(np.unravel_index(np.argmax(image), image.shape), (20, 10))
+        self.assertAlmostEqual(image.max(), 2.0)
+
+    def test_pyramid(self):
+        pyramid = rasterizePyramid(self.offsets, self.extents, self.values, 64, 64,
+                                   scales=(1, 4, 16))
+        self.assertEqual([level.shape for level in pyramid], [(64, 64), (16, 16), (4, 4)])
+        self.assertEqual(pyramid[0].dtype, np.float32)
+
+    def test_unknown_kernel(self):
+        with self.assertRaises(ValueError):
+            rasterizePyramid(self.offsets, self.extents, self.values, 64, 64, kernel='box')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE
+from BroodwarInterface.SpatialIndex import UnitGrid
+
+
+def create_random_snapshot(number_of_units, map_size, seed=0):
+    random = np.random.RandomState(seed)
+    data = np.zeros(number_of_units, dtype=UNIT_DTYPE)
+    data['id'] = np.arange(number_of_units)
+    data['player'] = random.randint(0, 2, number_of_units)
+    data['x'] = random.randint(0, map_size[0], number_of_units)
+    data['y'] = random.randint(0, map_size[1], number_of_units)
+    units = np.empty(number_of_units, dtype=object)
+    return UnitSnapshot(units, data)
+
+
+class TestUnitGrid(unittest.TestCase):
+
+    map_size = (2048, 1024)
+
+    def setUp(self):
+        self.snapshot = create_random_snapshot(500, self.map_size)
+        self.grid = UnitGrid(self.snapshot, self.map_size, cell_size=96)
+        self.positions = self.snapshot.positions
+
+    def test_rect(self):
+        position = np.array([300, 200])
+        indices = self.grid.rect(position, 400, 250)
+        difference = self.positions - position
+        expected = np.flatnonzero(np.all((difference > 0) & (difference < (400, 250)), axis=1))
+        self.assertEqual(indices.tolist(), expected.tolist())
+
+    def test_rect_mask(self):
+        mask = self.snapshot.data['player'] == 1
+        indices = self.grid.rect((0, 0), 2048, 1024, mask)
+        expected = np.flatnonzero(mask & np.all(self.positions > 0, axis=1))
+        self.assertEqual(indices.tolist(), expected.tolist())
+
+    def test_radius(self):
+        distances = np.hypot(*(self.positions - (1000, 500)).T)
+        indices = self.grid.radius((1000, 500), 220)
+        self.assertEqual(indices.tolist(), np.flatnonzero(distances <= 220).tolist())
+
+    def test_nearest(self):
+        distances = np.hypot(*(self.positions - (10, 1000)).T)
+        indices = self.grid.nearest((10, 1000), 7)
+        self.assertEqual(len(indices), 7)
+        self.assertTrue(np.all(np.diff(distances[indices]) >= 0))
+        self.assertAlmostEqual(distances[indices[-1]], np.sort(distances)[6])
+
+    def test_nearest_more_than_available(self):
+        mask = self.snapshot.data['id'] < 3
+        indices = self.grid.nearest((5000, 5000), 10, mask)
+        self.assertEqual(sorted(indices.tolist()), [0, 1, 2])
+
+    def test_nearest_outside_diagonally(self):
+        # The only unit is in the far corner, further than the map's
+        # diagonal plus the position's offset along either axis.
+        mask = np.all(self.positions > (1900, 900), axis=1)
+        indices = self.grid.nearest((-3000, -3000), 1, mask)
+        self.assertEqual(len(indices), 1)
+        self.assertTrue(mask[indices[0]])
+
+    def test_empty(self):
+        snapshot = UnitSnapshot.fromUnits([])
+        grid = UnitGrid(snapshot, self.map_size)
+        self.assertEqual(len(grid.rect((0, 0), 100, 100)), 0)
+        self.assertEqual(len(grid.nearest((0, 0), 3)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
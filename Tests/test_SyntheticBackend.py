@@ -0,0 +1,115 @@
+import unittest
+
+from BroodwarInterface.SyntheticBackend import SyntheticBackend, EventType, UnitTypes
+
+
+def event_types(game):
+    return [e.getType() for e in game.getEvents()]
+
+
+def start(backend):
+    backend.BWAPIClient.connect()
+    backend.BWAPIClient.update()
+    return backend.Broodwar
+
+
+class TestSyntheticBackend(unittest.TestCase):
+
+    def test_match_start(self):
+        backend = SyntheticBackend()
+        game = backend.Broodwar
+        self.assertFalse(game.isInGame())
+        start(backend)
+        self.assertIn(EventType.MatchStart, event_types(game))
+        self.assertTrue(game.isInGame())
+        self.assertEqual(len(game.getAllUnits()), 51)
+
+    def test_no_update_before_connect(self):
+        backend = SyntheticBackend()
+        backend.BWAPIClient.update()
+        self.assertFalse(backend.Broodwar.isInGame())
+
+    def test_players(self):
+        game = start(SyntheticBackend())
+        self.assertEqual(game.self().getID(), 0)
+        self.assertEqual([p.getID() for p in game.enemies()], [1])
+
+    def test_unit_interface(self):
+        game = start(SyntheticBackend(spawns=[(0, 'Protoss_Zealot', 1), (1, 'Zerg_Zergling', 1)]))
+        zealot = game.getUnit(0)
+        self.assertEqual(zealot.getType(), UnitTypes.Protoss_Zealot)
+        self.assertEqual(zealot.getHitPoints(), 100)
+        self.assertEqual(zealot.getShields(), 60)
+        self.assertTrue(zealot.exists())
+        self.assertEqual(zealot.getPlayer().getID(), 0)
+
+    def test_deterministic(self):
+        def positions(backend):
+            game = start(backend)
+            for _ in range(50):
+                backend.BWAPIClient.update()
+            return [(u.getPosition().x, u.getPosition().y, u.getHitPoints()) for u in game.getAllUnits()]
+        self.assertEqual(positions(SyntheticBackend(seed=3)), positions(SyntheticBackend(seed=3)))
+        self.assertNotEqual(positions(SyntheticBackend(seed=3)), positions(SyntheticBackend(seed=4)))
+
+    def test_move(self):
+        backend = SyntheticBackend(spawns=[(0, 'Terran_Marine', 1), (1, 'Zerg_Zergling', 1)],
+                                   enemy_attack=False)
+        game = start(backend)
+        marine = game.getUnit(0)
+        marine.move(backend.Position(100, 100))
+        for _ in range(1000):
+            backend.BWAPIClient.update()
+        self.assertEqual((marine.getPosition().x, marine.getPosition().y), (100, 100))
+
+    def test_stim(self):
+        backend = SyntheticBackend(spawns=[(0, 'Terran_Marine', 1), (1, 'Zerg_Zergling', 1)])
+        game = start(backend)
+        marine = game.getUnit(0)
+        self.assertTrue(marine.useTech(backend.TechTypes.Stim_Packs))
+        self.assertTrue(marine.isStimmed())
+        self.assertEqual(marine.getHitPoints(), 30)
+        self.assertFalse(game.getUnit(1).useTech(backend.TechTypes.Stim_Packs))
+
+    def test_match_ends_with_destroyed_units(self):
+        backend = SyntheticBackend(spawns=[(0, 'Terran_Marine', 5), (1, 'Zerg_Zergling', 30)])
+        game = start(backend)
+        destroyed = 0
+        for _ in range(5000):
+            backend.BWAPIClient.update()
+            types = event_types(game)
+            destroyed += types.count(EventType.UnitDestroy)
+            if EventType.MatchEnd in types:
+                break
+        self.assertIn(EventType.MatchEnd, types)
+        self.assertFalse(game.isInGame())
+        self.assertGreater(destroyed, 0)
+        self.assertEqual(len(game.getAllUnits()), 35 - destroyed)
+
+    def test_max_frames(self):
+        backend = SyntheticBackend(max_frames=10, enemy_attack=False)
+        game = start(backend)
+        for _ in range(10):
+            backend.BWAPIClient.update()
+        self.assertEqual(event_types(game), [EventType.MatchEnd])
+
+    def test_restart(self):
+        backend = SyntheticBackend()
+        game = start(backend)
+        game.restartGame()
+        backend.BWAPIClient.update()
+        self.assertEqual(event_types(game), [EventType.MatchEnd])
+        backend.BWAPIClient.update()
+        self.assertEqual(event_types(game), [EventType.MatchStart])
+        self.assertTrue(game.isInGame())
+        self.assertEqual(game.getFrameCount(), 0)
+
+    def test_many_units(self):
+        backend = SyntheticBackend(spawns=[(0, 'Terran_Marine', 2000), (1, 'Zerg_Zergling', 2000)],
+                                   map_size=(256, 256))
+        game = start(backend)
+        backend.BWAPIClient.update()
+        self.assertEqual(len(game.getAllUnits()), 4000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from BroodwarInterface import BroodwarInterface, SyntheticBackend
+from BroodwarInterface.BroodwarInterface import MOVE, COMMAND_ISSUED
+from BroodwarInterface.SyntheticBackend import EventType
+from BroodwarInterface.TrajectoryRecorder import TrajectoryRecorder, TrajectoryReader, EpisodeReader
+
+
+def render(interface):
+    return {'planes': interface.createFeaturePlanes([0, 0], 2048, 2048, ['presence'], scale=64)}
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def record(self, frames=10, compress=False, restart_after=None):
+        spawns = [(0, 'Terran_Marine', 4), (1, 'Zerg_Zergling', 6)]
+        interface = BroodwarInterface(backend=SyntheticBackend(spawns=spawns, enemy_attack=False))
+        interface.connect()
+        recorder = TrajectoryRecorder(self.path, render=render, chunk_frames=4, compress=compress)
+        interface.recorder = recorder
+        expected = []
+        for frame in range(frames):
+            if frame == restart_after:
+                interface.restart(wait=True)
+            ids = interface.getUnitIDs(players=[0])
+            if frame == 1:
+                interface.issue_commands(ids, [MOVE] * len(ids), [[100, 100]] * len(ids))
+            interface.update()
+            expected.append((interface.event_stream.frame, interface.getUnitIDs()))
+        recorder.close()
+        return expected, len(ids)
+
+    def test_round_trip(self):
+        expected, _ = self.record()
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader), 10)
+        self.assertEqual(len(reader.episodes[0].index['chunks']), 3)
+        batch, episodes, frames = reader.read(np.arange(10))
+        self.assertEqual(batch['frame'].tolist(), [frame for frame, _ in expected])
+        values, offsets = batch['units']
+        self.assertEqual(np.diff(offsets).tolist(), [10] * 10)
+        self.assertEqual(batch['planes'].shape, (10, 1, 32, 32))
+        self.assertEqual(episodes.tolist(), [0] * 10)
+
+    def test_commands_are_recorded(self):
+        _, number_of_commands = self.record()
+        batch, _, _ = TrajectoryReader(self.path).read([0, 1, 2])
+        values, offsets = batch['commands']
+        self.assertEqual(np.diff(offsets).tolist(), [0, number_of_commands, 0])
+        self.assertTrue(np.all(values['status'] == COMMAND_ISSUED))
+        self.assertTrue(np.all(values['x'] == 100))
+
+    def test_random_access_order(self):
+        self.record(compress=True)
+        reader = TrajectoryReader(self.path)
+        steps = [7, 0, 5, 5, 9]
+        batch, _, frames = reader.read(steps)
+        ordered, _, _ = reader.read(np.arange(10))
+        np.testing.assert_array_equal(batch['frame'], ordered['frame'][steps])
+        values, offsets = batch['units']
+        self.assertEqual(len(values), offsets[-1])
+
+    def test_restart_starts_episode(self):
+        self.record(restart_after=5)
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(len(reader.episodes), 2)
+        self.assertEqual(len(reader.episodes[0]), 6)
+        batch = reader.episodes[1].read([0], columns=['events'])
+        values, _ = batch['events']
+        self.assertIn(EventType.MatchStart, values['type'].tolist())
+
+    def test_batches_cover_recording(self):
+        self.record()
+        reader = TrajectoryReader(self.path)
+        seen = []
+        for batch, episodes, frames in reader.batches(3, seed=0, columns=['frame']):
+            self.assertEqual(list(batch), ['frame'])
+            seen.extend(frames.tolist())
+        self.assertEqual(sorted(seen), list(range(10)))
+
+    def test_episode_is_memory_mapped(self):
+        self.record()
+        episode = EpisodeReader(TrajectoryReader(self.path).episodes[0].path)
+        self.assertEqual(episode.read([9])['frame'].shape, (1,))
+        with self.assertRaises(IndexError):
+            episode.read([10])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE
+from BroodwarInterface.UnitFilter import UnitFilter
+
+
+def create_test_snapshot():
+    data = np.array([(1, 0, 0, 10, 20, 40, 0, True),
+                     (2, 0, 0, 30, 40, 35, 0, True),
+                     (3, 1, 37, 50, 60, 30, 5, True),
+                     (4, 1, 101, 70, 80, 1, 0, False),
+                     (5, 1, 37, 90, 10, 35, 0, True)], dtype=UNIT_DTYPE)
+    units = np.empty(len(data), dtype=object)
+    return UnitSnapshot(units, data)
+
+
+class TestUnitFilter(unittest.TestCase):
+
+    def test_empty_filter_selects_everything(self):
+        snapshot = create_test_snapshot()
+        self.assertTrue(np.all(UnitFilter().mask(snapshot)))
+
+    def test_players(self):
+        snapshot = create_test_snapshot()
+        mask = UnitFilter(players=[1]).mask(snapshot)
+        self.assertEqual(mask.tolist(), [False, False, True, True, True])
+
+    def test_all_criteria(self):
+        snapshot = create_test_snapshot()
+        unit_filter = UnitFilter(players=[0, 1], types=[0, 37], units=[2, 3, 4])
+        self.assertEqual(snapshot.select(unit_filter).tolist(), [1, 2])
+
+    def test_negation(self):
+        snapshot = create_test_snapshot()
+        unit_filter = ~UnitFilter(types=[101])
+        self.assertEqual(snapshot.select(unit_filter).tolist(), [0, 1, 2, 4])
+
+    def test_double_negation(self):
+        unit_filter = UnitFilter(types=[101])
+        self.assertEqual(~~unit_filter, unit_filter)
+
+    def test_enemies_not_of_type_within_ids(self):
+        snapshot = create_test_snapshot()
+        unit_filter = UnitFilter(players=[1], units=[3, 4, 5]) & ~UnitFilter(types=[101])
+        self.assertEqual(snapshot.select(unit_filter).tolist(), [2, 4])
+
+    def test_or(self):
+        snapshot = create_test_snapshot()
+        unit_filter = UnitFilter(units=[1]) | UnitFilter(types=[101])
+        self.assertEqual(snapshot.select(unit_filter).tolist(), [0, 3])
+
+    def test_equal_filters_share_masks(self):
+        snapshot = create_test_snapshot()
+        first = UnitFilter(players=[1, 0]).mask(snapshot)
+        second = UnitFilter(players=[0, 1]).mask(snapshot)
+        self.assertIs(first, second)
+
+    def test_empty_snapshot(self):
+        snapshot = UnitSnapshot.fromUnits([])
+        unit_filter = UnitFilter(players=[0]) & ~UnitFilter(types=[0])
+        self.assertEqual(snapshot.select(unit_filter).tolist(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE
+from BroodwarInterface.UnitFilter import UnitFilter
+
+
+def create_test_snapshot():
+    data = np.array([(1, 0, 0, 10, 20, 40, 0, True),
+                     (2, 0, 0, 30, 40, 35, 0, True),
+                     (3, 1, 37, 50, 60, 30, 5, True),
+                     (4, 1, 101, 70, 80, 1, 0, False)], dtype=UNIT_DTYPE)
+    units = np.array(['a', 'b', 'c', 'd'], dtype=object)
+    return UnitSnapshot(units, data)
+
+
+class TestUnitSnapshot(unittest.TestCase):
+
+    def test_positions(self):
+        snapshot = create_test_snapshot()
+        self.assertEqual(snapshot.positions.shape, (4, 2))
+        self.assertEqual(snapshot.positions[2].tolist(), [50, 60])
+
+    def test_select_all(self):
+        snapshot = create_test_snapshot()
+        self.assertEqual(snapshot.select().tolist(), [0, 1, 2, 3])
+
+    def test_select_filter(self):
+        snapshot = create_test_snapshot()
+        indices = snapshot.select(UnitFilter(players=[1]))
+        self.assertEqual(indices.tolist(), [2, 3])
+
+    def test_select_is_memoized(self):
+        snapshot = create_test_snapshot()
+        first = snapshot.select(UnitFilter(players=[0]))
+        self.assertIs(first, snapshot.select(UnitFilter(players=[0])))
+
+    def test_empty(self):
+        snapshot = UnitSnapshot.fromUnits([])
+        self.assertEqual(len(snapshot), 0)
+        self.assertEqual(snapshot.select(UnitFilter(players=[0])).tolist(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from BroodwarInterface.UnitTable import UnitTable, SlotAllocator
+
+
+class Position(object):
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Identified(object):
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+
+    def getID(self):
+        return self.identifier
+
+
+class FakeUnit(object):
+
+    def __init__(self, identifier, player=0, unit_type=0, x=0, y=0, hp=40):
+        self.identifier = identifier
+        self.player = player
+        self.unit_type = unit_type
+        self.x, self.y, self.hp = x, y, hp
+
+    def getID(self):
+        return self.identifier
+
+    def getPlayer(self):
+        return Identified(self.player)
+
+    def getType(self):
+        return Identified(self.unit_type)
+
+    def getPosition(self):
+        return Position(self.x, self.y)
+
+    def getHitPoints(self):
+        return self.hp
+
+    def getShields(self):
+        return 0
+
+    def exists(self):
+        return True
+
+
+class TestSlotAllocator(unittest.TestCase):
+
+    def test_allocate_is_stable(self):
+        slots = SlotAllocator()
+        self.assertEqual(slots.allocate('a'), 0)
+        self.assertEqual(slots.allocate('b'), 1)
+        self.assertEqual(slots.allocate('a'), 0)
+
+    def test_release_reuses(self):
+        slots = SlotAllocator()
+        slots.allocate('a')
+        slots.allocate('b')
+        self.assertEqual(slots.release('a'), 0)
+        self.assertEqual(slots.allocate('c'), 0)
+        self.assertEqual(slots.allocate('d'), 2)
+        self.assertIsNone(slots.release('z'))
+
+
+class TestUnitTable(unittest.TestCase):
+
+    def test_reset(self):
+        table = UnitTable()
+        table.reset([FakeUnit(5), FakeUnit(9, player=1)])
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.rowOf(9), 1)
+        self.assertEqual(table.snapshot().data['player'].tolist(), [0, 1])
+
+    def test_rows_are_stable(self):
+        table = UnitTable()
+        table.reset([FakeUnit(i) for i in range(4)])
+        table.remove(1)
+        self.assertEqual(table.rowOf(3), 3)
+        self.assertIsNone(table.rowOf(1))
+        self.assertEqual(table.add(FakeUnit(10)), 1)
+        snapshot = table.snapshot()
+        self.assertEqual(snapshot.data['id'].tolist(), [0, 10, 2, 3])
+        self.assertEqual(snapshot.slots.tolist(), [0, 1, 2, 3])
+
+    def test_grows(self):
+        table = UnitTable(capacity=2)
+        table.reset([FakeUnit(i) for i in range(5)])
+        self.assertEqual(len(table.snapshot()), 5)
+        self.assertGreaterEqual(len(table.data), 5)
+
+    def test_refresh_reads_dynamic_columns(self):
+        unit = FakeUnit(3, x=1, y=2, hp=40)
+        table = UnitTable()
+        table.reset([unit])
+        unit.x, unit.y, unit.hp, unit.player = 7, 8, 12, 4
+        table.refresh()
+        row = table.snapshot().data[0]
+        self.assertEqual((row['x'], row['y'], row['hp']), (7, 8, 12))
+        self.assertEqual(row['player'], 0)
+        table.add(unit)
+        self.assertEqual(table.snapshot().data['player'].tolist(), [4])
+
+    def test_refresh_empty(self):
+        table = UnitTable()
+        table.refresh()
+        self.assertEqual(len(table.snapshot()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
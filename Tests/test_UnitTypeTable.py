@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UNIT_DTYPE
+from BroodwarInterface.UnitTypeTable import UnitTypeTable
+from BroodwarInterface.SyntheticBackend import UnitTypes
+
+MARINE = UnitTypes.Terran_Marine.getID()
+ZEALOT = UnitTypes.Protoss_Zealot.getID()
+
+
+def create_units(rows):
+    '''Create snapshot rows from (type, x, y, hp, shields) tuples.'''
+    data = np.zeros(len(rows), dtype=UNIT_DTYPE)
+    for i, (unit_type, x, y, hp, shields) in enumerate(rows):
+        data[i] = (i, 0, unit_type, x, y, hp, shields, True)
+    return data
+
+
+class TestUnitTypeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = UnitTypeTable(size=8)
+        self.table.addAll(UnitTypes)
+
+    def test_add_all(self):
+        self.assertGreaterEqual(len(self.table), 102)
+        self.assertTrue(self.table.known[[MARINE, ZEALOT]].all())
+        self.assertEqual(self.table.max_hit_points[ZEALOT], 100)
+        self.assertEqual(self.table.max_shields[ZEALOT], 60)
+        self.assertEqual(self.table.ground_range[MARINE], 128)
+        self.assertEqual(self.table.top_speed[MARINE], 4.0)
+        np.testing.assert_array_equal(self.table.dimensions[MARINE], [8, 9, 8, 10])
+
+    def test_fractions(self):
+        data = create_units([(MARINE, 0, 0, 20, 0), (ZEALOT, 0, 0, 50, 15)])
+        np.testing.assert_allclose(self.table.getFractions(data), [0.5, 0.5])
+        np.testing.assert_allclose(self.table.getFractions(data, 'shields'), [0.0, 0.25])
+
+    def test_gap_distances(self):
+        # The footprints span x - 8 to x + 8, so they touch at 17 pixels apart.
+        origins = create_units([(MARINE, 0, 0, 40, 0)])
+        targets = create_units([(MARINE, 17, 0, 40, 0), (MARINE, 27, 0, 40, 0), (MARINE, 5, 5, 40, 0)])
+        np.testing.assert_allclose(self.table.getGapDistances(origins, targets), [[0, 10, 0]])
+
+    def test_in_weapon_range(self):
+        origins = create_units([(MARINE, 0, 0, 40, 0), (ZEALOT, 0, 0, 100, 60)])
+        targets = create_units([(MARINE, 17 + 128, 0, 40, 0), (MARINE, 18 + 128, 0, 40, 0)])
+        np.testing.assert_array_equal(self.table.getInWeaponRange(origins, targets),
+                                      [[True, False], [False, False]])
+
+if __name__ == '__main__':
+    unittest.main()
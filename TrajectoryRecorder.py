@@ -0,0 +1,399 @@
+'''Record every step of a game to disk and read the recordings back.
+
+A TrajectoryRecorder attached to a BroodwarInterface records a row for each
+update with the columns:
+-frame: The frame number after the update, see EventStream.
+-units: The units of the frame, with the fields of UNIT_DTYPE.
+-events: The events of the frames stepped through, see EVENT_DTYPE.
+-commands: The commands issued before the update, see COMMAND_DTYPE.
+-Any arrays returned by the render function, such as feature planes.
+
+    recorder = TrajectoryRecorder('recordings', render=lambda interface: {
+        'planes': interface.createFeaturePlanes([0, 0], 2048, 2048, ['presence'], scale=16)})
+    interface.recorder = recorder
+    ...
+    recorder.close()
+
+The rows are handed to a background thread which writes them, so the game
+loop only pays for copying the units. A new episode starts whenever a match
+starts and ends when the match ends.
+
+Each episode is a directory of chunks of chunk_frames rows. A chunk holds
+one .npy file per column, or a single compressed .npz file when compress is
+set. Columns with a different number of entries per row, such as units,
+store the entries of every row one after another along with an offsets
+array, where the entries of row i are values[offsets[i]:offsets[i + 1]].
+The index.json file of an episode lists its columns and chunks and is
+rewritten after every chunk, so a recording cut short can still be read.
+
+TrajectoryReader memory maps the chunks of uncompressed episodes and only
+loads the chunks it is asked for, so recordings larger than memory can be
+sampled from at random.
+'''
+
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UNIT_DTYPE
+
+EVENT_DTYPE = np.dtype([('type', np.int32), ('unit', np.int32)])
+
+COMMAND_DTYPE = np.dtype([('unit', np.int32),
+                          ('action', np.int8),
+                          ('x', np.int32),
+                          ('y', np.int32),
+                          ('status', np.int8)])
+
+RAGGED_COLUMNS = {'units': UNIT_DTYPE, 'events': EVENT_DTYPE, 'commands': COMMAND_DTYPE}
+
+CHUNK_FRAMES = 1024
+INDEX = 'index.json'
+
+
+def readEvents(events):
+    '''Convert BWAPI events into an array of EVENT_DTYPE.
+
+    The unit of events without one is -1.
+    '''
+    rows = []
+    for event in events:
+        unit = event.getUnit()
+        rows.append((int(event.getType()), -1 if unit is None else unit.getID()))
+    return np.array(rows, dtype=EVENT_DTYPE)
+
+
+class _EpisodeWriter(object):
+    '''Gather the rows of an episode into chunks and write them.'''
+
+    def __init__(self, path, chunk_frames, compress):
+        os.makedirs(path)
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.rows = []
+        self.index = {'frames': 0, 'compressed': compress, 'columns': {}, 'chunks': []}
+
+    def append(self, row):
+        if not self.index['columns']:
+            self.index['columns'] = {name: {'dtype': np.lib.format.dtype_to_descr(value.dtype),
+                                            'shape': None if name in RAGGED_COLUMNS else list(value.shape),
+                                            'ragged': name in RAGGED_COLUMNS}
+                                     for name, value in row.items()}
+        self.rows.append(row)
+        if len(self.rows) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = {}
+        for name, column in self.index['columns'].items():
+            values = [row[name] for row in self.rows]
+            if column['ragged']:
+                arrays[name], arrays[name + '.offsets'] = joinRows(values, values[0].dtype)
+            else:
+                arrays[name] = np.stack(values)
+
+        number = len(self.index['chunks'])
+        if self.compress:
+            chunk = 'chunk_{:06d}.npz'.format(number)
+            np.savez_compressed(os.path.join(self.path, chunk), **arrays)
+        else:
+            chunk = 'chunk_{:06d}'.format(number)
+            os.makedirs(os.path.join(self.path, chunk))
+            for name, array in arrays.items():
+                np.save(os.path.join(self.path, chunk, name + '.npy'), array)
+
+        start = self.index['frames']
+        self.index['frames'] += len(self.rows)
+        self.index['chunks'].append({'path': chunk, 'start': start, 'stop': self.index['frames']})
+        self.rows = []
+        temporary = os.path.join(self.path, INDEX + '.tmp')
+        with open(temporary, 'w') as index:
+            json.dump(self.index, index)
+        os.replace(temporary, os.path.join(self.path, INDEX))
+
+
+class TrajectoryRecorder(object):
+    '''Write the steps of a BroodwarInterface to disk, see the module documentation.
+
+    path: The directory to write episodes into. Episodes already in it are
+    kept and new ones are numbered after them.
+
+    render: An optional function of an interface returning a dictionary of
+    arrays to record with each step. Each array must keep its shape and
+    dtype throughout an episode.
+
+    chunk_frames: The number of steps in each chunk.
+
+    compress: Compress chunks. Compressed chunks cannot be memory mapped and
+    are decompressed a chunk at a time when read.
+
+    max_pending: The most steps waiting to be written before record blocks,
+    0 for no limit.
+    '''
+
+    def __init__(self, path, render=None, chunk_frames=CHUNK_FRAMES, compress=False, max_pending=0):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.render = render
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.episodes = len(listEpisodes(path))
+        self.recording = False
+        self.__commands = []
+        self.__queue = queue.Queue(max_pending)
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__write, name='TrajectoryRecorder', daemon=True)
+        self.__thread.start()
+
+    def __write(self):
+        '''Write rows handed over by the game loop until closed.'''
+        episode = None
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    if episode is not None:
+                        episode.flush()
+                    return
+                if self.__error is not None:
+                    continue
+                command, argument = item
+                if command == 'begin':
+                    episode = _EpisodeWriter(argument, self.chunk_frames, self.compress)
+                elif command == 'row':
+                    episode.append(argument)
+                elif command == 'end':
+                    episode.flush()
+                    episode = None
+            except Exception as error:
+                self.__error = error
+
+    def __put(self, item):
+        if self.__error is not None:
+            raise RuntimeError('Writing the trajectory failed.') from self.__error
+        self.__queue.put(item)
+
+    def beginEpisode(self):
+        '''Start a new episode, ending the current one.'''
+        self.endEpisode()
+        path = os.path.join(self.path, 'episode_{:06d}'.format(self.episodes))
+        self.episodes += 1
+        self.recording = True
+        self.__put(('begin', path))
+
+    def endEpisode(self):
+        '''End the current episode, if any.'''
+        if self.recording:
+            self.recording = False
+            self.__put(('end', None))
+
+    def recordCommands(self, unit_ids, actions, positions, status):
+        '''Keep commands to record with the next step.'''
+        commands = np.zeros(len(unit_ids), dtype=COMMAND_DTYPE)
+        commands['unit'] = unit_ids
+        commands['action'] = actions
+        commands['x'] = positions[:, 0]
+        commands['y'] = positions[:, 1]
+        commands['status'] = status
+        self.__commands.append(commands)
+
+    def record(self, interface):
+        '''Record the current step of an interface.'''
+        if not self.recording:
+            self.beginEpisode()
+        row = {'frame': np.int64(interface.event_stream.frame),
+               'units': interface.getSnapshot().data.copy(),
+               'events': readEvents(interface.events),
+               'commands': np.concatenate(self.__commands) if self.__commands else
+                           np.zeros(0, dtype=COMMAND_DTYPE)}
+        self.__commands = []
+        if self.render is not None:
+            for name, value in self.render(interface).items():
+                row[name] = np.array(value)
+        self.__put(('row', row))
+
+    def close(self):
+        '''Write the remaining steps and stop the background thread.'''
+        if not self.__thread.is_alive():
+            return
+        self.endEpisode()
+        self.__queue.put(None)
+        self.__thread.join()
+        if self.__error is not None:
+            raise RuntimeError('Writing the trajectory failed.') from self.__error
+
+
+def joinRows(rows, dtype):
+    '''Join rows of different lengths into a values array and an offsets array.'''
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=offsets[1:])
+    values = np.concatenate(rows) if rows else np.zeros(0, dtype=dtype)
+    return values, offsets
+
+
+def listEpisodes(path):
+    '''Get the episode directories of a recording in order.'''
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith('episode_'))
+
+
+class EpisodeReader(object):
+    '''Read the steps of a recorded episode.
+
+    Chunks are opened as they are needed and the most recently used
+    cache_chunks of them are kept open.
+    '''
+
+    def __init__(self, path, cache_chunks=4):
+        with open(os.path.join(path, INDEX)) as index:
+            self.index = json.load(index)
+        self.path = path
+        self.columns = self.index['columns']
+        self.starts = np.array([chunk['start'] for chunk in self.index['chunks']], dtype=np.int64)
+        self.cache_chunks = cache_chunks
+        self.__chunks = {}
+
+    def __len__(self):
+        return self.index['frames']
+
+    def __getChunk(self, number):
+        chunk = self.__chunks.pop(number, None)
+        if chunk is None:
+            path = os.path.join(self.path, self.index['chunks'][number]['path'])
+            if self.index['compressed']:
+                chunk = _CompressedChunk(np.load(path))
+            else:
+                chunk = _MappedChunk(path)
+            if len(self.__chunks) >= self.cache_chunks:
+                del self.__chunks[next(iter(self.__chunks))]
+        self.__chunks[number] = chunk
+        return chunk
+
+    def read(self, frames, columns=None):
+        '''Read a batch of steps.
+
+        frames: The indices of the steps within the episode.
+
+        columns: The names of the columns to read, every column if None.
+
+        Returns a dictionary from column name to the stacked rows of fixed
+        columns, or to a (values, offsets) pair for the other columns where
+        the entries of the ith step are values[offsets[i]:offsets[i + 1]].
+        '''
+        frames = np.asarray(frames, dtype=np.int64).reshape(-1)
+        if np.any((frames < 0) | (frames >= len(self))):
+            raise IndexError('Frames out of range of an episode of {} frames.'.format(len(self)))
+        if columns is None:
+            columns = list(self.columns)
+        dtypes = {name: np.lib.format.descr_to_dtype(self.columns[name]['dtype']) for name in columns}
+        batch = {}
+        ragged = {}
+        for name in columns:
+            if self.columns[name]['ragged']:
+                ragged[name] = [None] * len(frames)
+            else:
+                batch[name] = np.empty([len(frames)] + self.columns[name]['shape'], dtype=dtypes[name])
+
+        chunks = np.searchsorted(self.starts, frames, side='right') - 1
+        for number in np.unique(chunks):
+            chunk = self.__getChunk(int(number))
+            selected = np.flatnonzero(chunks == number)
+            rows = frames[selected] - self.starts[number]
+            for name in columns:
+                if name in ragged:
+                    values, offsets = chunk[name], chunk[name + '.offsets']
+                    for i, row in zip(selected, rows):
+                        ragged[name][i] = values[offsets[row]:offsets[row + 1]]
+                else:
+                    batch[name][selected] = chunk[name][rows]
+        for name, rows in ragged.items():
+            batch[name] = joinRows(rows, dtypes[name])
+        return batch
+
+
+class _MappedChunk(object):
+    '''The memory mapped columns of an uncompressed chunk.'''
+
+    def __init__(self, path):
+        self.path = path
+        self.arrays = {}
+
+    def __getitem__(self, name):
+        array = self.arrays.get(name)
+        if array is None:
+            array = self.arrays[name] = np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+        return array
+
+
+class _CompressedChunk(object):
+    '''The columns of a compressed chunk, decompressed on first use.'''
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.arrays = {}
+
+    def __getitem__(self, name):
+        array = self.arrays.get(name)
+        if array is None:
+            array = self.arrays[name] = self.archive[name]
+        return array
+
+
+class TrajectoryReader(object):
+    '''Read the episodes of a recording as one sequence of steps.'''
+
+    def __init__(self, path, cache_chunks=4):
+        self.episodes = [EpisodeReader(episode, cache_chunks) for episode in listEpisodes(path)
+                         if os.path.exists(os.path.join(episode, INDEX))]
+        self.starts = np.cumsum([0] + [len(episode) for episode in self.episodes])
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def read(self, steps, columns=None):
+        '''Read a batch of steps given their indices across every episode.
+
+        Returns the columns as EpisodeReader.read does, along with the
+        episode number and the index within the episode of each step.
+        '''
+        steps = np.asarray(steps, dtype=np.int64).reshape(-1)
+        if np.any((steps < 0) | (steps >= len(self))):
+            raise IndexError('Steps out of range of a recording of {} steps.'.format(len(self)))
+        episodes = np.searchsorted(self.starts, steps, side='right') - 1
+        frames = steps - self.starts[episodes]
+        batch = {}
+        ragged = {}
+        for number in np.unique(episodes):
+            selected = np.flatnonzero(episodes == number)
+            part = self.episodes[number].read(frames[selected], columns)
+            for name, value in part.items():
+                if isinstance(value, tuple):
+                    values, offsets = value
+                    rows = ragged.setdefault(name, ([None] * len(steps), values.dtype))[0]
+                    for i, start, stop in zip(selected, offsets[:-1], offsets[1:]):
+                        rows[i] = values[start:stop]
+                else:
+                    if name not in batch:
+                        batch[name] = np.empty((len(steps),) + value.shape[1:], dtype=value.dtype)
+                    batch[name][selected] = value
+        for name, (rows, dtype) in ragged.items():
+            batch[name] = joinRows(rows, dtype)
+        return batch, episodes, frames
+
+    def batches(self, batch_size, shuffle=True, seed=None, columns=None):
+        '''Yield batches of steps covering the recording once.
+
+        Each batch is returned as read returns it.
+        '''
+        steps = np.arange(len(self))
+        if shuffle:
+            np.random.RandomState(seed).shuffle(steps)
+        for start in range(0, len(steps), batch_size):
+            yield self.read(steps[start:start + batch_size], columns)
@@ -0,0 +1,114 @@
+'''Composable unit filters which compile to boolean masks over a snapshot.
+
+A filter describes which units to select, for example the units of certain
+players or of certain types. Filters are combined with the &, | and ~
+operators:
+
+    enemies = UnitFilter(players=enemy_ids, units=unit_ids)
+    not_marines = ~UnitFilter(types=[cybw.UnitTypes.Terran_Marine])
+    enemy_non_marines = enemies & not_marines
+
+Evaluating a filter against a UnitSnapshot produces a boolean mask with one
+entry per unit. The mask is memoized on the snapshot by the structure of the
+filter, so equal filters built independently share the work within a frame.
+'''
+
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import getTypeID
+
+
+class UnitFilter(object):
+    '''Select units which match all of the given criteria.
+
+    players: A list of player IDs used to select units belonging to one of
+    the players.
+
+    types: A list of unit types or unit type IDs used to select units of a
+    particular type.
+
+    units: A list of unit IDs used to select particular units.
+
+    Criteria which are None are not checked.
+    '''
+
+    def __init__(self, players=None, types=None, units=None):
+        self.__players = _compile([int(p) for p in players]) if players is not None else None
+        self.__types = _compile([getTypeID(t) for t in types]) if types is not None else None
+        self.__units = _compile([int(u) for u in units]) if units is not None else None
+        self.key = ('where', _asKey(self.__players), _asKey(self.__types),
+                    _asKey(self.__units))
+
+    def _evaluate(self, snapshot):
+        data = snapshot.data
+        mask = np.ones(len(data), dtype=np.bool_)
+        for column, values in (('player', self.__players),
+                               ('type', self.__types),
+                               ('id', self.__units)):
+            if values is not None:
+                mask &= np.isin(data[column], values)
+        return mask
+
+    def mask(self, snapshot):
+        '''Get the boolean mask of units in the snapshot matching the filter.'''
+        def evaluate():
+            mask = self._evaluate(snapshot)
+            mask.flags.writeable = False
+            return mask
+        return snapshot.memoize(('mask', self.key), evaluate)
+
+    def __and__(self, other):
+        return _Combined('and', self, other)
+
+    def __or__(self, other):
+        return _Combined('or', self, other)
+
+    def __invert__(self):
+        return _Inverted(self)
+
+    def __eq__(self, other):
+        return isinstance(other, UnitFilter) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return 'UnitFilter{}'.format(self.key)
+
+
+class _Combined(UnitFilter):
+    '''The conjunction or disjunction of two filters.'''
+
+    def __init__(self, operator, left, right):
+        self.__operator = np.logical_and if operator == 'and' else np.logical_or
+        self.__left = left
+        self.__right = right
+        self.key = (operator, left.key, right.key)
+
+    def _evaluate(self, snapshot):
+        return self.__operator(self.__left.mask(snapshot),
+                               self.__right.mask(snapshot))
+
+
+class _Inverted(UnitFilter):
+    '''The negation of a filter.'''
+
+    def __init__(self, inner):
+        self.__inner = inner
+        self.key = ('not', inner.key)
+
+    def _evaluate(self, snapshot):
+        return np.logical_not(self.__inner.mask(snapshot))
+
+    def __invert__(self):
+        return self.__inner
+
+
+def _compile(values):
+    return np.unique(np.array(values, dtype=np.int64))
+
+
+def _asKey(values):
+    if values is None:
+        return None
+    return tuple(values.tolist())
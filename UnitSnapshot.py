@@ -0,0 +1,134 @@
+'''A columnar snapshot of every unit in the game for a single frame.
+
+Every call into cybw crosses the Python/C++ boundary, so gathering a
+property such as a unit's position costs a few calls per unit. The snapshot
+pays that cost once per frame by reading every unit into a NumPy structured
+array. Queries are then answered with vectorized masks over the columns
+instead of walking Broodwar.getAllUnits() again.
+
+Columns:
+-id: The unit ID.
+-player: The ID of the player that owns the unit.
+-type: The ID of the unit's type.
+-x, y: The center position of the unit in pixels.
+-hp: The unit's hit points.
+-shields: The unit's shield points.
+-exists: Whether the unit is currently accessible to the player.
+'''
+
+import numpy as np
+
+UNIT_DTYPE = np.dtype([('id', np.int32),
+                       ('player', np.int32),
+                       ('type', np.int32),
+                       ('x', np.int32),
+                       ('y', np.int32),
+                       ('hp', np.int32),
+                       ('shields', np.int32),
+                       ('exists', np.bool_)])
+
+
+def getTypeID(unit_type):
+    '''Get the integer ID of a unit type.
+
+    Accepts either a BWAPI unit type or an integer ID.
+    '''
+    if isinstance(unit_type, (int, np.integer)):
+        return int(unit_type)
+    return unit_type.getID()
+
+
+def readUnit(unit):
+    '''Read a single unit into a tuple matching UNIT_DTYPE.'''
+    position = unit.getPosition()
+    return (unit.getID(), unit.getPlayer().getID(), unit.getType().getID(),
+            position.x, position.y, unit.getHitPoints(), unit.getShields(),
+            unit.exists())
+
+
+class UnitSnapshot(object):
+    '''The state of all units for one frame.
+
+    data: A structured array with one row per unit, see UNIT_DTYPE.
+
+    units: An object array holding the unit interface of each row.
+
+    slots: The UnitTable row of each unit when the snapshot was taken from a
+    UnitTable, otherwise None.
+    '''
+
+    def __init__(self, units, data, slots=None):
+        self.units = units
+        self.data = data
+        self.slots = slots
+        self.__positions = None
+        self.__cache = {}
+
+    @classmethod
+    def fromUnits(cls, all_units):
+        '''Build a snapshot by reading every unit once.'''
+        all_units = list(all_units)
+        units = np.empty(len(all_units), dtype=object)
+        rows = []
+        for i, unit in enumerate(all_units):
+            units[i] = unit
+            rows.append(readUnit(unit))
+        data = np.array(rows, dtype=UNIT_DTYPE)
+        return cls(units, data)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def positions(self):
+        '''The unit positions as an (N, 2) array of x, y pairs.'''
+        if self.__positions is None:
+            positions = np.empty((len(self.data), 2), dtype=np.int32)
+            positions[:, 0] = self.data['x']
+            positions[:, 1] = self.data['y']
+            self.__positions = positions
+        return self.__positions
+
+    def rowsOf(self, unit_ids):
+        '''Get the rows of unit IDs, with -1 for IDs not in the snapshot.'''
+        ids = self.data['id']
+        order = self.memoize('id_order', lambda: np.argsort(ids, kind='stable'))
+        unit_ids = np.asarray(unit_ids, dtype=np.int64).reshape(-1)
+        if len(ids) == 0:
+            return np.full(len(unit_ids), -1, dtype=np.intp)
+        sorted_ids = ids[order]
+        positions = np.minimum(np.searchsorted(sorted_ids, unit_ids), len(ids) - 1)
+        found = sorted_ids[positions] == unit_ids
+        return np.where(found, order[positions], -1)
+
+    def memoize(self, key, function):
+        '''Get a value computed from this snapshot, computing it only once.
+
+        key: A hashable value identifying the result.
+
+        function: A function taking no arguments which produces the result.
+        '''
+        try:
+            return self.__cache[key]
+        except KeyError:
+            value = self.__cache[key] = function()
+            return value
+
+    def select(self, unit_filter=None):
+        '''Get the row indices of units which match a UnitFilter.
+
+        All units are selected when no filter is given.
+        '''
+        if unit_filter is None:
+            return self.memoize(('select', None), self.__selectAll)
+
+        def select():
+            indices = np.flatnonzero(unit_filter.mask(self))
+            indices.flags.writeable = False
+            return indices
+        return self.memoize(('select', unit_filter.key), select)
+
+    def __selectAll(self):
+        indices = np.arange(len(self.data))
+        indices.flags.writeable = False
+        return indices
@@ -0,0 +1,148 @@
+'''A persistent table of units maintained from BWAPI unit events.
+
+Reading every unit from Broodwar.getAllUnits() each frame costs a few calls
+per unit even though most frames only change positions and hit points. The
+table instead keeps one row per unit for the whole match. Rows are added and
+removed as BWAPI reports units appearing and disappearing, and each frame
+only the dynamic columns of live rows are read again.
+
+A unit keeps the same row for as long as it is in the table, so per unit
+arrays can be laid out by row across an episode. Rows of removed units are
+put on a free list and reused.
+'''
+
+import numpy as np
+
+from BroodwarInterface.UnitSnapshot import UnitSnapshot, UNIT_DTYPE, readUnit
+
+INITIAL_CAPACITY = 64
+
+
+class SlotAllocator(object):
+    '''Assign stable integer slots to keys, reusing slots which are released.
+
+    Released slots are handed out again in last in, first out order.
+    '''
+
+    def __init__(self):
+        self.slot_of = {}
+        self.free = []
+        self.size = 0
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def __contains__(self, key):
+        return key in self.slot_of
+
+    def allocate(self, key):
+        '''Get the slot of a key, assigning it a slot if it does not have one.'''
+        slot = self.slot_of.get(key)
+        if slot is None:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                slot = self.size
+                self.size += 1
+            self.slot_of[key] = slot
+        return slot
+
+    def release(self, key):
+        '''Free the slot of a key. Returns the slot or None if it had none.'''
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            self.free.append(slot)
+        return slot
+
+    def clear(self):
+        self.slot_of.clear()
+        del self.free[:]
+        self.size = 0
+
+
+class UnitTable(object):
+    '''Units stored in stable rows, see UNIT_DTYPE for the columns.
+
+    live: Whether each row currently holds a unit.
+
+    units: The unit interface held in each row.
+    '''
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.__slots = SlotAllocator()
+        self.data = np.zeros(capacity, dtype=UNIT_DTYPE)
+        self.units = np.empty(capacity, dtype=object)
+        self.live = np.zeros(capacity, dtype=np.bool_)
+
+    def __len__(self):
+        return len(self.__slots)
+
+    def __grow(self, capacity):
+        data = np.zeros(capacity, dtype=UNIT_DTYPE)
+        units = np.empty(capacity, dtype=object)
+        live = np.zeros(capacity, dtype=np.bool_)
+        data[:len(self.data)] = self.data
+        units[:len(self.units)] = self.units
+        live[:len(self.live)] = self.live
+        self.data, self.units, self.live = data, units, live
+
+    def rowOf(self, unit_id):
+        '''Get the row of a unit ID or None if the unit is not in the table.'''
+        return self.__slots.slot_of.get(unit_id)
+
+    def clear(self):
+        '''Remove every unit.'''
+        self.__slots.clear()
+        self.units[:] = None
+        self.live[:] = False
+
+    def reset(self, all_units):
+        '''Replace the contents of the table with the given units.'''
+        self.clear()
+        for unit in all_units:
+            self.add(unit)
+
+    def add(self, unit):
+        '''Add a unit, or read all of its columns again if already present.'''
+        row = self.__slots.allocate(unit.getID())
+        if row >= len(self.data):
+            self.__grow(2 * len(self.data))
+        self.data[row] = readUnit(unit)
+        self.units[row] = unit
+        self.live[row] = True
+        return row
+
+    def remove(self, unit_id):
+        '''Remove a unit, freeing its row for reuse.'''
+        row = self.__slots.release(unit_id)
+        if row is not None:
+            self.units[row] = None
+            self.live[row] = False
+        return row
+
+    def refresh(self):
+        '''Read the dynamic columns of every live row.
+
+        The dynamic columns are the position, hit points, shields and whether
+        the unit exists. The unit ID, player and type only change through
+        events and are left as is.
+        '''
+        rows = np.flatnonzero(self.live)
+        values = []
+        for unit in self.units[rows]:
+            position = unit.getPosition()
+            values.append((position.x, position.y, unit.getHitPoints(),
+                           unit.getShields(), unit.exists()))
+        if len(values) == 0:
+            return
+        columns = np.array(values, dtype=np.int64).T
+        for name, column in zip(('x', 'y', 'hp', 'shields', 'exists'), columns):
+            self.data[name][rows] = column
+
+    def snapshot(self):
+        '''Get a snapshot of the live rows ordered by row.
+
+        The snapshot's slots hold the table row of each of its units.
+        '''
+        rows = np.flatnonzero(self.live)
+        return UnitSnapshot(self.units[rows], self.data[rows], slots=rows)
@@ -0,0 +1,171 @@
+'''Constants of unit types stored in arrays indexed by unit type ID.
+
+Unit type properties such as a unit's dimensions never change, so they are
+read from BWAPI once per type and kept in NumPy arrays. The property of
+every unit in a UnitSnapshot can then be gathered with a single fancy index
+such as table.dimensions[snapshot.data['type']].
+'''
+
+import numpy as np
+
+TABLE_SIZE = 256
+
+# The name, dtype and shape of each table after the type ID axis.
+COLUMNS = (('known', np.bool_, ()),
+           ('dimensions', np.int32, (4,)),
+           ('max_hit_points', np.int32, ()),
+           ('max_shields', np.int32, ()),
+           ('top_speed', np.float64, ()),
+           ('sight_range', np.int32, ()),
+           ('ground_range', np.int32, ()),
+           ('ground_damage', np.int32, ()),
+           ('ground_cooldown', np.int32, ()),
+           ('air_range', np.int32, ()),
+           ('air_damage', np.int32, ()),
+           ('air_cooldown', np.int32, ()),
+           ('flyer', np.bool_, ()))
+
+
+def readUnitType(unit_type):
+    '''Read the properties of a BWAPI unit type, one value per column.'''
+    ground = unit_type.groundWeapon()
+    air = unit_type.airWeapon()
+    return {'known': True,
+            'dimensions': (unit_type.dimensionLeft(), unit_type.dimensionUp(),
+                           unit_type.dimensionRight(), unit_type.dimensionDown()),
+            'max_hit_points': unit_type.maxHitPoints(),
+            'max_shields': unit_type.maxShields(),
+            'top_speed': unit_type.topSpeed(),
+            'sight_range': unit_type.sightRange(),
+            'ground_range': ground.maxRange(),
+            'ground_damage': ground.damageAmount(),
+            'ground_cooldown': ground.damageCooldown(),
+            'air_range': air.maxRange(),
+            'air_damage': air.damageAmount(),
+            'air_cooldown': air.damageCooldown(),
+            'flyer': unit_type.isFlyer()}
+
+
+class UnitTypeTable(object):
+    '''Lookup tables of unit type properties.
+
+    known: Whether the properties of a type ID have been read.
+
+    dimensions: The distance in pixels from a unit's center to the left,
+    top, right and bottom edges of its footprint.
+
+    max_hit_points, max_shields: The most hit points and shields of a unit.
+
+    top_speed: The speed of a unit in pixels per frame.
+
+    sight_range: How far a unit sees in pixels.
+
+    ground_range, air_range: The range in pixels of a unit's weapons
+    against ground and air units, 0 without a weapon.
+
+    ground_damage, air_damage, ground_cooldown, air_cooldown: The damage of
+    a unit's weapons and the number of frames between attacks.
+
+    flyer: Whether a unit is an air unit.
+    '''
+
+    def __init__(self, size=TABLE_SIZE):
+        for name, dtype, shape in COLUMNS:
+            setattr(self, name, np.zeros((size,) + shape, dtype=dtype))
+
+    def __len__(self):
+        return len(self.known)
+
+    def __grow(self, size):
+        for name, _, _ in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros((size,) + column.shape[1:], dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def add(self, unit_type):
+        '''Read the properties of a BWAPI unit type into the tables.'''
+        type_id = unit_type.getID()
+        if type_id >= len(self):
+            self.__grow(max(type_id + 1, 2 * len(self)))
+        for name, value in readUnitType(unit_type).items():
+            getattr(self, name)[type_id] = value
+
+    def addAll(self, unit_types):
+        '''Read every unit type of a namespace such as the backend's UnitTypes.'''
+        for name in dir(unit_types):
+            unit_type = getattr(unit_types, name)
+            if not name.startswith('_') and hasattr(unit_type, 'getID') and hasattr(unit_type, 'groundWeapon'):
+                self.add(unit_type)
+
+    def update(self, snapshot):
+        '''Read the properties of any unit types in a snapshot not seen yet.'''
+        types = snapshot.data['type']
+        if len(types) == 0:
+            return
+        if types.max() >= len(self):
+            self.__grow(max(int(types.max()) + 1, 2 * len(self)))
+        for type_id in np.unique(types[~self.known[types]]):
+            row = np.argmax(types == type_id)
+            self.add(snapshot.units[row].getType())
+
+    def getFractions(self, data, column='hp'):
+        '''Get each unit's hit points or shields as a fraction of the most.
+
+        data: Rows of a snapshot, with the fields of UNIT_DTYPE.
+
+        column: Either 'hp' or 'shields'.
+
+        Units whose type has no shields have a shield fraction of 0.
+        '''
+        most = self.max_hit_points if column == 'hp' else self.max_shields
+        most = most[data['type']]
+        fractions = np.zeros(len(data))
+        np.divide(data[column], most, out=fractions, where=most > 0)
+        return fractions
+
+    def getGapDistances(self, origins, targets):
+        '''Get the distance between the footprints of every pair of units.
+
+        Like BWAPI's getDistance, this is the distance from the edge of one
+        unit's footprint to the edge of the other's, 0 when they overlap.
+
+        Returns an (M, N) array for M origin rows and N target rows of a
+        snapshot.
+        '''
+        origin_boxes = self.__getBoxes(origins)
+        target_boxes = self.__getBoxes(targets)
+        gaps = []
+        for low, high in ((0, 2), (1, 3)):
+            before = target_boxes[np.newaxis, :, low] - origin_boxes[:, np.newaxis, high] - 1
+            after = origin_boxes[:, np.newaxis, low] - target_boxes[np.newaxis, :, high] - 1
+            gaps.append(np.maximum(np.maximum(before, after), 0))
+        return np.hypot(*gaps)
+
+    def __getBoxes(self, data):
+        '''Get the left, top, right and bottom edges of units' footprints.'''
+        dimensions = self.dimensions[data['type']].astype(np.int64)
+        x = data['x'].astype(np.int64)
+        y = data['y'].astype(np.int64)
+        return np.stack([x - dimensions[:, 0], y - dimensions[:, 1],
+                         x + dimensions[:, 2], y + dimensions[:, 3]], axis=1)
+
+    def getInWeaponRange(self, origins, targets):
+        '''Check which targets are within weapon range of each origin unit.
+
+        The air weapon of an origin is used against flying targets and its
+        ground weapon against the others. Units without a weapon against a
+        target are never in range of it.
+
+        Returns an (M, N) boolean array for M origin rows and N target rows
+        of a snapshot.
+        '''
+        origin_types = origins['type']
+        flying = self.flyer[targets['type']]
+        ranges = np.where(flying[np.newaxis, :],
+                          self.air_range[origin_types][:, np.newaxis],
+                          self.ground_range[origin_types][:, np.newaxis])
+        armed = np.where(flying[np.newaxis, :],
+                         self.air_damage[origin_types][:, np.newaxis],
+                         self.ground_damage[origin_types][:, np.newaxis]) > 0
+        return armed & (self.getGapDistances(origins, targets) <= ranges)
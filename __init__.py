@@ -1 +1,4 @@
-from BroodwarInterface.BroodwarInterface import BroodwarInterface
\ No newline at end of file
+from BroodwarInterface.BroodwarInterface import BroodwarInterface
+from BroodwarInterface.UnitFilter import UnitFilter
+from BroodwarInterface.SyntheticBackend import SyntheticBackend
+from BroodwarInterface.AsyncBroodwarInterface import AsyncBroodwarInterface
\ No newline at end of file